@@ -0,0 +1,77 @@
+""" storage engine microbenchmark
+
+python -m bench.backend [-b leveldb,memory,lmdb] [-n keys] [-s value size] [-d dir]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from gbrick.db.backend import BACKENDS
+from gbrick.db.base import DB
+
+
+def run(backend, path, count=20000, value_size=100):
+    """ random 32-byte keys, like trie node hashes
+    :return: dict of us per key
+    """
+    keys = [os.urandom(32) for _ in range(count)]
+    value = os.urandom(value_size)
+    db = DB(path, backend=backend)
+    try:
+        result = {}
+        started = time.perf_counter()
+        with db.write_batch() as batch:
+            for key in keys:
+                batch.put(key, value)
+        result['batch_put'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for key in keys:
+            db.get(key)
+        result['get'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in db.iter():
+            pass
+        result['scan'] = time.perf_counter() - started
+
+        # prefix scans, 1/256 of the keys each
+        started = time.perf_counter()
+        for prefix in range(256):
+            for _ in db.iter(bytes([prefix]), bytes([prefix + 1]) if prefix < 255 else None):
+                pass
+        result['range_scan'] = time.perf_counter() - started
+    finally:
+        db.close()
+    return {name: elapsed / count * 1e6 for name, elapsed in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='storage engine microbenchmark')
+    parser.add_argument('-b', '--backends', type=str, default=','.join(BACKENDS))
+    parser.add_argument('-n', '--keys', type=int, default=20000)
+    parser.add_argument('-s', '--value_size', type=int, default=100)
+    parser.add_argument('-d', '--dir', type=str, default=None, help="scratch directory")
+    arguments = parser.parse_args()
+
+    root = tempfile.mkdtemp(dir=arguments.dir)
+    try:
+        print('{} keys, {}-byte values, us per key'.format(arguments.keys, arguments.value_size))
+        print('  {:8}{:>10}{:>10}{:>10}{:>12}'.format('', 'batch put', 'get', 'scan', 'range scan'))
+        for backend in arguments.backends.split(','):
+            try:
+                result = run(backend, os.path.join(root, backend), arguments.keys, arguments.value_size)
+            except ImportError as err:
+                print('  {:8}skipped: {}'.format(backend, err))
+                continue
+            print('  {:8}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.2f}'.format(
+                backend, result['batch_put'], result['get'], result['scan'], result['range_scan']
+            ))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+""" block codec microbenchmark
+
+python -m bench.codec [-n transactions] [-r rounds]
+"""
+import argparse
+import time
+
+from gbrick.types.deserializer import deserialize_block
+from gbrick.types.prepare import prepare_block, prepare_header, prepare_transaction
+
+
+def make_block(count):
+    transactions = [
+        prepare_transaction(num_version=1,
+                            type_transaction='transfer',
+                            address_sender=b'gBx' + b'a' * 40,
+                            address_recipient=b'gBx' + b'b' * 40,
+                            amount_value=i,
+                            amount_fee=1,
+                            message={'k': 'v'},
+                            timestamp=1.5 + i,
+                            tx_hash=b'f' * 64,
+                            signature=b'e' * 130)
+        for i in range(count)
+    ]
+    header = prepare_header(hash_prev_block=b'a',
+                            num_height=1,
+                            address_creator=b'c' * 43,
+                            num_version=1,
+                            chain_id=1)
+    return prepare_block(header=header, list_transactions=transactions)
+
+
+def measure(fn, rounds):
+    """
+    :return: fastest call in ms, after one warm up call
+    """
+    fn()
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='block codec microbenchmark')
+    parser.add_argument('-n', '--transactions', type=int, default=10000)
+    parser.add_argument('-r', '--rounds', type=int, default=5)
+    arguments = parser.parse_args()
+
+    block = make_block(arguments.transactions)
+    dict_obj = block.to_dict()
+    assert deserialize_block(dict_obj).to_dict() == dict_obj
+
+    print('block of {} transactions, ms per call'.format(arguments.transactions))
+    print('  to_dict:           {:.1f}'.format(measure(block.to_dict, arguments.rounds)))
+    print('  deserialize_block: {:.1f}'.format(
+        measure(lambda: deserialize_block(dict_obj), arguments.rounds)
+    ))
+
+
+if __name__ == '__main__':
+    main()
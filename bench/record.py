@@ -0,0 +1,41 @@
+""" chain record format microbenchmark, against the legacy pickle records
+
+python -m bench.record [-n transactions] [-r rounds]
+"""
+import argparse
+import pickle
+
+from bench.codec import measure
+from bench.wire import make_block
+from gbrick.db import record
+from gbrick.types.deserializer import deserialize_block
+
+
+def main():
+    parser = argparse.ArgumentParser(description='chain record format microbenchmark')
+    parser.add_argument('-n', '--transactions', type=int, default=1000)
+    parser.add_argument('-r', '--rounds', type=int, default=20)
+    arguments = parser.parse_args()
+
+    block = make_block(arguments.transactions)
+    rounds = arguments.rounds
+    legacy = pickle.dumps(block.to_dict())
+    raw = record.encode_block(block)
+    assert record.decode_block(raw).to_dict() == block.to_dict()
+
+    print('block of {} transactions, ms per call (fastest of {})'.format(arguments.transactions, rounds))
+    print('  {:8}{:>10}{:>10}{:>10}'.format('', 'bytes', 'write', 'read'))
+    print('  {:8}{:>10}{:>10.2f}{:>10.2f}'.format(
+        'pickle', len(legacy),
+        measure(lambda: pickle.dumps(block.to_dict()), rounds),
+        measure(lambda: deserialize_block(pickle.loads(legacy)), rounds)
+    ))
+    print('  {:8}{:>10}{:>10.2f}{:>10.2f}'.format(
+        'record', len(raw),
+        measure(lambda: record.encode_block(block), rounds),
+        measure(lambda: record.decode_block(raw), rounds)
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+""" gossip wire format microbenchmark
+
+python -m bench.wire [-n transactions] [-r rounds]
+"""
+import argparse
+import hashlib
+
+from bench.codec import measure
+from gbrick.types import wire
+from gbrick.types.deserializer import deserialize_block
+from gbrick.types.prepare import prepare_block, prepare_header, prepare_transaction, prepare_vote
+
+
+def _hash(i):
+    return hashlib.sha3_256(str(i).encode()).hexdigest().encode()
+
+
+def make_block(count):
+    transactions = [
+        prepare_transaction(num_version=1,
+                            type_transaction='transfer',
+                            address_sender=b'gBx' + _hash(i)[:40],
+                            address_recipient=b'gBx' + _hash(-i)[:40],
+                            amount_value=i * 10 ** 8,
+                            amount_fee=10 ** 6,
+                            message={},
+                            timestamp=1550000000.123 + i,
+                            tx_hash=_hash(i),
+                            signature=_hash(i) + _hash(i + 1) + b'1b')
+        for i in range(count)
+    ]
+    votes = [
+        prepare_vote(num_version=1,
+                     num_block_height=5,
+                     hash_candidate_block=_hash(1),
+                     address_creator=b'gBx' + _hash(i)[:40],
+                     vote_hash=_hash(i),
+                     signature=_hash(i) + _hash(2))
+        for i in range(4)
+    ]
+    header = prepare_header(hash_prev_block=_hash(0),
+                            num_height=5,
+                            address_creator=b'gBx' + _hash(9)[:40],
+                            num_version=1,
+                            chain_id=1,
+                            hash_transaction_root=_hash(3),
+                            timestamp=1550000000.5,
+                            signature=_hash(4) + _hash(5))
+    return prepare_block(header=header, list_transactions=transactions, list_vote=votes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='gossip wire format microbenchmark')
+    parser.add_argument('-n', '--transactions', type=int, default=1000)
+    parser.add_argument('-r', '--rounds', type=int, default=10)
+    arguments = parser.parse_args()
+
+    block = make_block(arguments.transactions)
+    rounds = arguments.rounds
+    print('block of {} transactions, 4 votes, ms per call'.format(arguments.transactions))
+    print('  {:8}{:>10}{:>10}{:>10}{:>22}'.format('', 'bytes', 'encode', 'decode', 'decode+deserialize'))
+    for fmt in (wire.JSON, wire.BINARY):
+        body = wire.dumps(block, wire.BLOCK, fmt)
+        if isinstance(body, str):
+            body = body.encode()
+        assert deserialize_block(wire.loads(body)).to_dict() == block.to_dict()
+        print('  {:8}{:>10}{:>10.2f}{:>10.2f}{:>22.2f}'.format(
+            fmt, len(body),
+            measure(lambda: wire.dumps(block, wire.BLOCK, fmt), rounds),
+            measure(lambda: wire.loads(body), rounds),
+            measure(lambda: deserialize_block(wire.loads(body)), rounds)
+        ))
+
+
+if __name__ == '__main__':
+    main()
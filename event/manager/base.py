@@ -1,10 +1,31 @@
 
 from abc import ABC, abstractmethod
+from gbrick.types import wire
 
 
 class BaseManager(ABC):
     _channel = None
     _evt = None
+    _wire_kind = None
+    _wire_format = wire.JSON
+
+    @classmethod
+    def set_wire_format(cls, fmt):
+        """ outgoing message format, incoming format is detected per message.
+        every node decodes binary, switch it on only once all reps run
+        a release that does; until then binary is receive-only.
+        :param str fmt: 'json' or 'binary'
+        """
+        if fmt not in (wire.JSON, wire.BINARY):
+            raise ValueError("unexpected wire format: {}".format(fmt))
+        cls._wire_format = fmt
+
+    def encode(self, obj):
+        return wire.dumps(obj, self._wire_kind, self._wire_format)
+
+    @staticmethod
+    def decode(body):
+        return wire.loads(body)
 
     def get(self, key):
         return self.storage.get(key)
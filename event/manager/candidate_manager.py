@@ -1,11 +1,11 @@
 
 import aioamqp
-import json
 import asyncio
 import time
 
 from utils.storage import Storage
 from event.manager.base import BaseManager
+from gbrick.types import wire
 from gbrick.types.deserializer import deserialize_block
 from gbrick.validation import validate_candidate
 from utils.exceptions import RoundError
@@ -15,6 +15,7 @@ from utils.config import MQ_HOST, MQ_SEED, MQ_PORT, MQ_USER, CD_EXCHANGE, EVENT_
 
 
 class CandidateManager(BaseManager):
+    _wire_kind = wire.BLOCK
     _rep_count = 4
     _terms_consent = 3
 
@@ -72,14 +73,14 @@ class CandidateManager(BaseManager):
         :param properties:
         :return:
         """
-        dict_obj = json.loads(body)
+        dict_obj = self.decode(body)
         candidate = deserialize_block(dict_obj)
         await validate_candidate(candidate)
         self.storage[(candidate.height, candidate.creator)] = candidate
         await asyncio.sleep(0)
 
     async def send(self, obj):
-        await self._channel.basic_publish(obj.to_json(),
+        await self._channel.basic_publish(self.encode(obj),
                                           exchange_name=CD_EXCHANGE,
                                           routing_key='')
 
@@ -1,6 +1,5 @@
 
 import aioamqp
-import json
 import asyncio
 import time
 
@@ -8,12 +7,14 @@ from utils.crypto.hash import sha3_hex
 from utils.crypto.ec import verify
 from utils.storage import Storage
 from event.manager.base import BaseManager
+from gbrick.types import wire
 from utils.exceptions import RoundError
 
 from utils.config import MQ_HOST, MQ_SEED, MQ_PORT, MQ_USER, CM_EXCHANGE, EVENT_NAME
 
 
 class ConfirmManager(BaseManager):
+    _wire_kind = wire.CONFIRM
     _rep_count = 4
     _terms_consent = 3
 
@@ -64,7 +65,7 @@ class ConfirmManager(BaseManager):
 
     async def process_event(self, channel, body, envelope, properties):
         # TODO: sender in validators. how to check validators?
-        obj = json.loads(body)
+        obj = self.decode(body)
         height, sender, blk_hash, sig = obj
         confirm_set = [height, sender, blk_hash]
         confirm_hash = sha3_hex(','.join(confirm_set))
@@ -73,7 +74,7 @@ class ConfirmManager(BaseManager):
         self.storage[(int(height), sender.encode())] = blk_hash.encode()
 
     async def send(self, obj):
-        await self._channel.basic_publish(json.dumps(obj),
+        await self._channel.basic_publish(self.encode(obj),
                                           exchange_name=CM_EXCHANGE,
                                           routing_key='')
 
@@ -1,17 +1,18 @@
 
 import aioamqp
-import json
 import asyncio
 
 from gbrick.types.deserializer import deserialize_block
 from gbrick.validation import validate_finalize
 from utils.exceptions import FinalizeError
 from event.manager.base import BaseManager
+from gbrick.types import wire
 
 from utils.config import MQ_HOST, MQ_SEED, MQ_PORT, MQ_USER, FN_EXCHANGE, EVENT_NAME
 
 
 class FinalizeManager(BaseManager):
+    _wire_kind = wire.BLOCK
 
     def __init__(self, name):
         self.name = name
@@ -55,13 +56,13 @@ class FinalizeManager(BaseManager):
                 transport.close()
 
     async def process_event(self, channel, body, envelope, properties):
-        dict_obj = json.loads(body)
+        dict_obj = self.decode(body)
         block = deserialize_block(dict_obj)
         await validate_finalize(block)
         self.storage.append(block)
 
     async def send(self, obj):
-        await self._channel.basic_publish(obj.to_json(),
+        await self._channel.basic_publish(self.encode(obj),
                                           exchange_name=FN_EXCHANGE,
                                           routing_key='')
 
@@ -0,0 +1,153 @@
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils.logger import getLogger
+
+THREAD_POOL = 'thread'
+PROCESS_POOL = 'process'
+
+# queue full policy
+SHED = 'shed'   # reject without requeue, message is dropped
+NACK = 'nack'   # negative ack with requeue, broker delivers it again
+
+
+class IngressPipeline:
+    """ bounded ingress pipeline
+    decode queue -> verification worker pool -> admission
+
+    decode runs on the worker pool (thread or process),
+    admit runs on the event loop, so storage is touched by one thread only.
+    """
+    _logger = None
+
+    def __init__(self, decode, admit, concurrency=4, queue_size=4096, pool=THREAD_POOL):
+        """
+        :param decode: callable(payload) -> result, must be picklable on process pool
+        :param admit: coroutine function(tag, result, error)
+        :param int concurrency: verification worker count
+        :param int queue_size: decode queue bound
+        :param str pool: 'thread' or 'process'
+        """
+        if pool not in (THREAD_POOL, PROCESS_POOL):
+            raise ValueError("unexpected ingress pool: {}".format(pool))
+        self._decode = decode
+        self._admit = admit
+        self._concurrency = concurrency
+        self._queue_size = queue_size
+        self._pool = pool
+        self._queue = None
+        self._executor = None
+        self._workers = []
+
+        self.accepted = 0
+        self.shed = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.peak_depth = 0
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            self._logger = getLogger('ingress')
+        return self._logger
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @property
+    def capacity(self):
+        return self._queue_size
+
+    @property
+    def depth(self):
+        if self._queue is None:
+            return 0
+        return self._queue.qsize()
+
+    @property
+    def is_running(self):
+        return len(self._workers) > 0
+
+    def start(self):
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        if self._pool == PROCESS_POOL:
+            self._executor = ProcessPoolExecutor(max_workers=self._concurrency)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self._concurrency)
+        self._workers = [
+            asyncio.ensure_future(self._worker())
+            for _ in range(self._concurrency)
+        ]
+
+    def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def offer(self, payload, tag=None) -> bool:
+        """ put payload on decode queue without waiting
+        :return: False if the queue is full, caller applies shed policy
+        """
+        try:
+            self._queue.put_nowait((tag, payload))
+        except asyncio.QueueFull:
+            self.shed += 1
+            return False
+        self.accepted += 1
+        if self.depth > self.peak_depth:
+            self.peak_depth = self.depth
+        return True
+
+    async def _worker(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            tag, payload = await self._queue.get()
+            self.in_flight += 1
+            result, error = None, None
+            try:
+                result = await loop.run_in_executor(self._executor, self._decode, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                error = err
+
+            if error is None and result is not None:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+
+            try:
+                await self._admit(tag, result, error)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                # e.g. ack on a closed channel, the worker keeps running
+                self.failed += 1
+                self.logger.error("admit failed, tag={}: {!r}".format(tag, err))
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'capacity': self.capacity,
+            'peak_depth': self.peak_depth,
+            'in_flight': self.in_flight,
+            'concurrency': self.concurrency,
+            'accepted': self.accepted,
+            'shed': self.shed,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'failed': self.failed
+        }
@@ -1,26 +1,91 @@
 
 import aioamqp
-import json
 import asyncio
 
 from utils.storage import Storage
 from utils.util import time_distance
 from event.manager.base import BaseManager
-from gbrick.validation import validate_transaction
+from gbrick.types import wire
+from event.manager.ingress import IngressPipeline, THREAD_POOL, SHED, NACK
+from gbrick.validation import verify_transaction
 from gbrick.types.deserializer import deserialize_transaction
-from weakref import WeakSet
 
 from utils.config import MQ_HOST, MQ_SEED, MQ_PORT, MQ_USER, TX_EXCHANGE, EVENT_NAME
 
 
+TRANSACTION_EXPIRE = 600
+
+
+def decode_transaction(body):
+    """ decode and verify transaction body,
+    runs on the ingress worker pool
+    :param body: tx-data
+    :return: transaction, None if expired
+    """
+    dict_obj = wire.loads(body)
+    transaction = deserialize_transaction(dict_obj)
+    if time_distance(transaction.timestamp) >= TRANSACTION_EXPIRE:
+        return None
+    verify_transaction(transaction)
+    return transaction
+
+
 class TransactionManager(BaseManager):
     """ Transaction MQ Manager
     """
+    _wire_kind = wire.TRANSACTION
+    _concurrency = 4
+    _queue_size = 4096
+    _pool = THREAD_POOL
+    _policy = SHED
+    # broker prefetch, None: twice queue + workers.
+    # it has to exceed queue + workers, otherwise the broker holds the
+    # excess and the queue full policy never applies.
+    _prefetch = None
 
     def __init__(self, name):
         self.name = name
-        self._task = WeakSet()
         self._event_storage = Storage()
+        self._ingress = IngressPipeline(decode_transaction,
+                                        self._admit,
+                                        concurrency=self._concurrency,
+                                        queue_size=self._queue_size,
+                                        pool=self._pool)
+
+    @classmethod
+    def set_ingress(cls, concurrency=None, queue_size=None, pool=None, policy=None, prefetch=None):
+        """ ingress config, applies to managers created afterwards
+        :param int concurrency: verification worker count
+        :param int queue_size: decode queue bound
+        :param str pool: 'thread' or 'process'
+        :param str policy: 'shed' or 'nack', applied when the queue is full
+        :param int prefetch: unacked messages the broker delivers
+        """
+        if policy is not None and policy not in (SHED, NACK):
+            raise ValueError("unexpected ingress policy: {}".format(policy))
+        if concurrency is not None:
+            cls._concurrency = concurrency
+        if queue_size is not None:
+            cls._queue_size = queue_size
+        if pool is not None:
+            cls._pool = pool
+        if policy is not None:
+            cls._policy = policy
+        if prefetch is not None:
+            cls._prefetch = prefetch
+
+    @property
+    def prefetch(self):
+        if self._prefetch is not None:
+            return self._prefetch
+        return 2 * (self._ingress.capacity + self._ingress.concurrency)
+
+    @property
+    def ingress(self):
+        return self._ingress
+
+    def stats(self):
+        return self._ingress.stats()
 
     @property
     def storage(self):
@@ -54,33 +119,41 @@ class TransactionManager(BaseManager):
                                            queue_name=EVENT_NAME(self.name),
                                            routing_key='')
 
+            # deliveries beyond queue + workers hit the queue full policy,
+            # the broker keeps the rest.
+            await self._channel.basic_qos(prefetch_count=self.prefetch)
+
+            self._ingress.start()
+
             await self._channel.basic_consume(self.process_event,
                                               queue_name=EVENT_NAME(self.name),
-                                              no_ack=True)
+                                              no_ack=False)
         except (aioamqp.ChannelClosed, aioamqp.AmqpClosedConnection):
             if not transport.is_closing():
                 transport.close()
 
     async def process_event(self, channel, body, envelope, properties):
-        self._task.add(asyncio.ensure_future(self._process_event(body)))
-
-    async def _process_event(self, body):
-        """ transaction data processing
-        :param body: tx-data
-        """
-        dict_obj = json.loads(body)
-        try:
-            transaction = deserialize_transaction(dict_obj)
-        except ValueError:
+        if self._ingress.offer(body, envelope.delivery_tag):
             return
+
+        # decode queue is full.
+        if self._policy == NACK:
+            await channel.basic_client_nack(envelope.delivery_tag, requeue=True)
         else:
-            if time_distance(transaction.timestamp) < 600:
-                await validate_transaction(transaction)
-                self.storage[transaction.hash] = transaction  # pending.
-                await asyncio.sleep(0.0001)
+            await channel.basic_reject(envelope.delivery_tag, requeue=False)
+
+    async def _admit(self, delivery_tag, transaction, error):
+        """ mempool admission, runs on the event loop
+        :param delivery_tag: amqp delivery tag
+        :param transaction: verified transaction, None if expired or invalid
+        :param error: decode or verification error
+        """
+        if error is None and transaction is not None:
+            self.storage[transaction.hash] = transaction  # pending.
+        await self._channel.basic_client_ack(delivery_tag)
 
     async def send(self, obj):
-        await self._channel.basic_publish(obj.to_json(),
+        await self._channel.basic_publish(self.encode(obj),
                                           exchange_name=TX_EXCHANGE,
                                           routing_key='')
 
@@ -1,10 +1,10 @@
 import aioamqp
-import json
 import asyncio
 import time
 
 from utils.storage import Storage
 from event.manager.base import BaseManager
+from gbrick.types import wire
 from gbrick.types.deserializer import deserialize_vote
 from gbrick.validation import validate_vote
 from utils.logger import getLogger
@@ -15,6 +15,7 @@ from utils.config import MQ_HOST, MQ_SEED, MQ_PORT, MQ_USER, VT_EXCHANGE, EVENT_
 
 
 class VoteManager(BaseManager):
+    _wire_kind = wire.VOTE
     _rep_count = 4
     _terms_consent = 3
 
@@ -66,13 +67,13 @@ class VoteManager(BaseManager):
         # except ValidationError:
 
     async def process_event(self, channel, body, envelope, properties):
-        dict_obj = json.loads(body)
+        dict_obj = self.decode(body)
         vote = deserialize_vote(dict_obj)
         await validate_vote(vote)
         self.storage[(vote.num_block_height, vote.address_creator)] = vote
 
     async def send(self, obj):
-        await self._channel.basic_publish(obj.to_json(),
+        await self._channel.basic_publish(self.encode(obj),
                                           exchange_name=VT_EXCHANGE,
                                           routing_key='')
 
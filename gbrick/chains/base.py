@@ -88,11 +88,12 @@ class BaseChain(ABC):
         raise NotImplementedError('chain: method not implement')
 
     @abstractmethod
-    def validate_header(self, permit_header, block):
+    def validate_header(self, permit_header, block, trusted=False):
         """ validate header
 
         :param permit_header: header class
         :param block: block class
+        :param trusted: skip the creator signature
         :return: None
 
         :raise: ValidationError, FinalizeError
@@ -112,10 +113,11 @@ class BaseChain(ABC):
         raise NotImplementedError('chain: method not implement')
 
     @abstractmethod
-    def validate_block(self, block):
+    def validate_block(self, block, trusted=False):
         """ validate block
 
         :param block: block class
+        :param trusted: skip signatures and votes
         :return: None
 
         :raise: ValidationError, FinalizeError
@@ -127,7 +129,7 @@ class BaseChain(ABC):
         raise NotImplementedError('chain: method not implement')
 
     @abstractmethod
-    def finalize(self, block):
+    def finalize(self, block, trusted=False):
         raise NotImplementedError('chain: method not implement')
 
     @abstractmethod
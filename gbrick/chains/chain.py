@@ -1,6 +1,7 @@
 
 import time
 import asyncio
+import itertools
 
 from utils.singleton import singleton
 from utils.logger import getLogger
@@ -11,6 +12,7 @@ from utils.config import MainConstant as Constant
 from utils.trie.prepare import make_hash_root
 
 from gbrick.chains.base import BaseChain
+from gbrick.db.record import HISTORY_SENT, HISTORY_RECEIVED
 from gbrick.wagon.wagon import Wagon
 from gbrick.wagon.state import State
 from gbrick.types.prepare import prepare_block, prepare_header
@@ -85,6 +87,12 @@ class Chain(BaseChain):
     def get_event_loop(self) -> asyncio.AbstractEventLoop:
         return self._loop
 
+    def io_monitor_run(self):
+        asyncio.ensure_future(self._db_context.loop_lag.run())
+
+    def io_stats(self):
+        return self._db_context.io_stats()
+
     def block_from_genesis(self):
         constant = Constant
         if constant.block_hash in self._db_context.chain:
@@ -103,7 +111,7 @@ class Chain(BaseChain):
         wagon = self.prepare_wagon(None)
         genesis_block = wagon.genesis_declare(genesis_block, constant)
 
-        genesis_block.header.hash_block = genesis_block.hash
+        genesis_block = genesis_block.copy(header=genesis_block.header.seal())
         self._link_block(genesis_block, wagon, self._start_at)
         return True
 
@@ -159,6 +167,28 @@ class Chain(BaseChain):
     def get_receipt(self, tx_hash):
         return self._db_context.chain.get_receipt(tx_hash)
 
+    def get_account_history(self, address, limit=20, before=None):
+        """ transaction history of address, newest first
+        :param bytes address: account address
+        :param int limit: page size
+        :param tuple before: (height, index) cursor returned by the previous page
+        :return: (entries, cursor of the next page or None)
+        """
+        history = self._db_context.chain.iter_history(address, before)
+        entries = []
+        for height, index, tx_hash, flags in itertools.islice(history, limit):
+            entries.append({
+                'height': height,
+                'index': index,
+                'tx_hash': tx_hash,
+                'sent': bool(flags & HISTORY_SENT),
+                'received': bool(flags & HISTORY_RECEIVED)
+            })
+        cursor = None
+        if len(entries) == limit:
+            cursor = (entries[-1]['height'], entries[-1]['index'])
+        return entries, cursor
+
     def get_block_from_hash(self, b_hash) -> BaseBlock:
         return self._db_context.chain.get_block_from_hash(b_hash)
 
@@ -191,7 +221,7 @@ class Chain(BaseChain):
     def make_signature(self, hash_data):
         return self._signer(hash_data)
 
-    async def validate_header(self, permit_header: BaseHeader, block: BaseBlock):
+    async def validate_header(self, permit_header: BaseHeader, block: BaseBlock, trusted=False):
         header = block.header
         if self.chain_id != header.chain_id:
             raise ValidationError(
@@ -201,9 +231,10 @@ class Chain(BaseChain):
                 )
             )
         validate_header_slots(header.to_dict())
-        await verify(header.hash,
-                     header.byte_signature,
-                     header.address_creator)
+        if not trusted:
+            await verify(header.hash,
+                         header.byte_signature,
+                         header.address_creator)
 
         if permit_header.num_height + 1 != header.num_height:
             raise FinalizeError(
@@ -265,11 +296,12 @@ class Chain(BaseChain):
                     )
                 )
 
-    async def validate_block(self, block: BaseBlock) -> None:
+    async def validate_block(self, block: BaseBlock, trusted=False) -> None:
         validate_block_slots(block.to_dict())
-        permit_block = self.get_block_from_hash(block.previous)
-        await self.validate_header(permit_block.header, block)
-        await self.validate_vote(block.header, block.list_vote)
+        permit_header = await self._db_context.async_chain.get_header_from_hash(block.previous)
+        await self.validate_header(permit_header, block, trusted)
+        if not trusted:
+            await self.validate_vote(block.header, block.list_vote)
 
         # prev reps list hash -> current header rep_hash
 
@@ -288,38 +320,43 @@ class Chain(BaseChain):
     async def make_finalize_from_confirm(self, confirm_block: BaseBlock, vt_list) -> BaseBlock:
         tx_trie = make_hash_root(confirm_block.list_transactions)
 
-        permit_header = self.get_header_from_hash(confirm_block.previous)
+        permit_header = await self._db_context.async_chain.get_header_from_hash(confirm_block.previous)
 
         wagon = self.prepare_wagon(permit_header)
 
         if confirm_block.header.hash_transaction_root != tx_trie.root:
             raise ValidationError("tx root not matched")
 
-        confirm_block.list_vote.extend(vt_list)
-
         vt_trie = make_hash_root(vt_list)
 
-        confirm_block.header.hash_vote_root = vt_trie.root
+        confirm_block = confirm_block.copy(
+            header=confirm_block.header.copy(hash_vote_root=vt_trie.root),
+            list_vote=confirm_block.list_vote + list(vt_list)
+        )
 
         block = await wagon.execute_transactions(self.version, confirm_block)
 
-        block.header.hash_vote_root = vt_trie.root
+        header = block.header.finalize(time.time(), hash_vote_root=vt_trie.root)
 
-        block.header.timestamp_finalize = time.time()
-
-        signature = self.make_signature(block.hash)
+        signature = self.make_signature(header.hash)
 
         wagon.clear()
 
-        return block.copy(header=block.header.copy(hash_block=block.hash,
-                                                   byte_signature=signature),
+        return block.copy(header=header.seal(signature),
                           list_vote=vt_list)
 
     def validate_chains(self, block: BaseBlock):
         pass
 
-    async def finalize(self, block: BaseBlock) -> None:
-        await self.validate_block(block)
+    async def finalize(self, block: BaseBlock, trusted=False) -> None:
+        """
+        :param BaseBlock block: next block
+        :param bool trusted: below a trusted checkpoint (import),
+                             header signature and vote checks are skipped.
+                             slots, chain id, linkage, height, timestamp,
+                             tx/vote roots, execution and the block hash still run.
+        """
+        await self.validate_block(block, trusted)
         wagon = self.get_wagon()
         start_at = time.time()
         block = await wagon.execute_transactions(self.version, block)
@@ -331,14 +368,21 @@ class Chain(BaseChain):
                     block.header.hash_block, block.hash
                 ))
         # fully executed transaction.
-        self._link_block(block, wagon, start_at)
+        if block.height == 0 and block.previous == b'':
+            self._from_genesis(block)
+            return None
+        await wagon.finalize_async(block)
+        self._log_link(block, start_at)
 
     def _link_block(self, block, wagon, start_at) -> None:
         if block.height == 0 and block.previous == b'':
             self._from_genesis(block)
             return None
-        permit_header = self.get_header_from_hash(block.previous)
         wagon.finalize(block)
+        self._log_link(block, start_at)
+
+    def _log_link(self, block, start_at):
+        permit_header = self.get_header_from_hash(block.previous)
         e_time = time.time() - start_at
         self.logger.debug(
             "new link {} -> {}: {}, "
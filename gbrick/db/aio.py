@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import LatencyMeter, CoverageMeter
+
+# async facade over chain / state db.
+# plyvel reads and commits run on a dedicated i/o pool,
+# cache hits stay on the loop. at most max_pending calls are queued on the pool,
+# later callers wait on the loop instead of piling up behind a slow compaction.
+
+IO_WORKERS = 4
+MAX_PENDING = 64
+
+
+class AsyncDB:
+    _executor = None
+
+    def __init__(self, db, max_pending=MAX_PENDING):
+        """
+        :param db: ChainDB or StateDB
+        :param int max_pending: calls queued on the i/o pool at most
+        """
+        self._db = db
+        self._max_pending = max_pending
+        self._pending = None
+        # time spent on the loop (cache hits) / waiting for the pool
+        self.blocking = LatencyMeter()
+        self.offloaded = LatencyMeter()
+
+    @staticmethod
+    def executor():
+        if AsyncDB._executor is None:
+            AsyncDB._executor = ThreadPoolExecutor(IO_WORKERS, thread_name_prefix='db-io')
+        return AsyncDB._executor
+
+    @property
+    def db(self):
+        return self._db
+
+    async def run(self, fn, *args):
+        """ run fn(*args) on the i/o pool
+        """
+        if self._pending is None:
+            self._pending = asyncio.Semaphore(self._max_pending)
+        start = time.perf_counter()
+        async with self._pending:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(self.executor(), fn, *args)
+        self.offloaded.observe(time.perf_counter() - start)
+        return result
+
+    def on_loop(self, fn, *args):
+        """ run fn(*args) on the loop, for calls served from memory
+        """
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.blocking.observe(time.perf_counter() - start)
+
+    def stats(self):
+        return {
+            'blocking': self.blocking.stats(),
+            'offloaded': self.offloaded.stats()
+        }
+
+    def __getattr__(self, name):
+        # everything else is the plain sync db
+        return getattr(self._db, name)
+
+
+class AsyncChainDB(AsyncDB):
+
+    async def get_header_from_hash(self, block_hash):
+        if block_hash in self._db._header_by_hash:
+            return self.on_loop(self._db.get_header_from_hash, block_hash)
+        return await self.run(self._db.get_header_from_hash, block_hash)
+
+    async def get_header_from_height(self, height):
+        if height in self._db._header_by_height:
+            return self.on_loop(self._db.get_header_from_height, height)
+        return await self.run(self._db.get_header_from_height, height)
+
+    async def get_block_from_hash(self, block_hash):
+        return await self.run(self._db.get_block_from_hash, block_hash)
+
+    async def get_block_from_height(self, height):
+        return await self.run(self._db.get_block_from_height, height)
+
+    async def get_transaction_from_lookup(self, tx_hash):
+        return await self.run(self._db.get_transaction_from_lookup, tx_hash)
+
+    async def get_receipt(self, tx_hash):
+        return await self.run(self._db.get_receipt, tx_hash)
+
+    async def commit(self, block, tries=(), state=None, receipts=None):
+        """ state writes are copied out on the loop, only the batches go to the pool.
+        state may be read meanwhile, it must not be written until the commit returns
+        """
+        prepared = None if state is None else self.on_loop(state.prepare_commit)
+        await self.run(self._db.write_block, block, tries, receipts, state, prepared)
+        self._db.finish_block(block, tries, state, prepared)
+        await self.run(self._db.freeze)
+
+
+class AsyncStateDB(AsyncDB):
+
+    def __init__(self, db, max_pending=MAX_PENDING):
+        super().__init__(db, max_pending)
+        self.coverage = CoverageMeter()
+
+    async def prefetch(self, addresses):
+        """ read accounts on the i/o pool, split over IO_WORKERS.
+        workers only read, their results are merged into the caches here on the loop.
+        :return: number of accounts read from the trie
+        """
+        cache = self._db._cache
+        addresses = [address for address in dict.fromkeys(addresses) if address not in cache]
+        if not addresses:
+            return 0
+        chunks = [addresses[worker::IO_WORKERS] for worker in range(IO_WORKERS)]
+        results = await asyncio.gather(*(self.run(self._db.prefetch, chunk)
+                                         for chunk in chunks if chunk))
+        return sum(self._db.merge_prefetch(result) for result in results)
+
+    async def _call(self, fn, address):
+        if address in self._db._cache:
+            return self.on_loop(fn, address)
+        return await self.run(fn, address)
+
+    async def get_account(self, address):
+        return await self._call(self._db.get_account, address)
+
+    async def get_balance(self, address):
+        return await self._call(self._db.get_balance, address)
+
+    async def get_nonce(self, address):
+        return await self._call(self._db.get_nonce, address)
+
+    async def commit(self, sync=False):
+        prepared = self.on_loop(self._db.prepare_commit)
+        await self.run(self._db.write_commit, prepared, sync)
+        self._db.finish_commit(prepared)
@@ -0,0 +1,358 @@
+import bisect
+import threading
+
+from abc import ABC, abstractmethod
+
+# storage engines behind BaseDB.
+# engine :: get, put, delete, write_batch, snapshot, iterator, get_property, close
+# batch  :: put, delete, context manager, nothing is written if the block raises
+# snapshot :: get, iterator(start, stop, reverse), close
+# iterators yield (key, value) in key order (descending if reverse),
+# start is inclusive, stop is exclusive.
+
+LEVELDB = 'leveldb'
+MEMORY = 'memory'
+LMDB = 'lmdb'
+
+
+class BaseBackend(ABC):
+
+    @abstractmethod
+    def get(self, key):
+        """
+        :return: value, None if missing
+        """
+        raise NotImplementedError("backend: method not implement")
+
+    @abstractmethod
+    def put(self, key, value):
+        raise NotImplementedError("backend: method not implement")
+
+    @abstractmethod
+    def delete(self, key):
+        raise NotImplementedError("backend: method not implement")
+
+    @abstractmethod
+    def write_batch(self, sync=False):
+        raise NotImplementedError("backend: method not implement")
+
+    @abstractmethod
+    def snapshot(self):
+        raise NotImplementedError("backend: method not implement")
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        # implicit snapshot, released once the iterator is done
+        snapshot = self.snapshot()
+        try:
+            yield from snapshot.iterator(start=start, stop=stop, reverse=reverse)
+        finally:
+            snapshot.close()
+
+    def get_property(self, name):
+        return None
+
+    @abstractmethod
+    def close(self):
+        raise NotImplementedError("backend: method not implement")
+
+
+class LevelDBBackend(BaseBackend):
+    """ plyvel, options are plyvel.DB keyword arguments
+    """
+    # 미세한 차이로 leveldb보다 빠르다...
+
+    def __init__(self, path, **options):
+        import plyvel
+        self._db = plyvel.DB(path, create_if_missing=True, **options)
+
+    def get(self, key):
+        return self._db.get(key)
+
+    def put(self, key, value):
+        self._db.put(key, value)
+
+    def delete(self, key):
+        self._db.delete(key)
+
+    def write_batch(self, sync=False):
+        return self._db.write_batch(transaction=True, sync=sync)
+
+    def snapshot(self):
+        return self._db.snapshot()
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        return self._db.iterator(start=start, stop=stop, reverse=reverse)
+
+    def get_property(self, name):
+        return self._db.get_property(name)
+
+    def close(self):
+        self._db.close()
+
+
+class _MemoryBatch:
+    __slots__ = ('_backend', '_ops')
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._ops = []
+
+    def put(self, key, value):
+        self._ops.append((key, value))
+
+    def delete(self, key):
+        self._ops.append((key, None))
+
+    def write(self):
+        self._backend._apply(self._ops)
+        self._ops = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.write()
+
+
+def _key_range(keys, start, stop):
+    """
+    :return: (lo, hi) index range of sorted keys in [start, stop)
+    """
+    lo = 0 if start is None else bisect.bisect_left(keys, start)
+    hi = len(keys) if stop is None else bisect.bisect_left(keys, stop)
+    return lo, hi
+
+
+class _MemorySnapshot:
+    __slots__ = ('_data', '_keys')
+
+    def __init__(self, data, keys):
+        self._data = data
+        self._keys = keys
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        keys = self._keys
+        lo, hi = _key_range(keys, start, stop)
+        data = self._data
+        for index in (range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)):
+            key = keys[index]
+            yield key, data[key]
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(BaseBackend):
+    """ dict + sorted key list, nothing is persisted.
+    snapshots share data until the next write (copy on write).
+    """
+
+    def __init__(self, path=None, **options):
+        self._data = {}
+        self._keys = []
+        self._lock = threading.Lock()
+        # True while a snapshot holds the current dict/list
+        self._shared = False
+
+    def _own(self):
+        if self._shared:
+            self._data = dict(self._data)
+            self._keys = list(self._keys)
+            self._shared = False
+
+    def _put(self, key, value):
+        if key not in self._data:
+            bisect.insort(self._keys, key)
+        self._data[key] = value
+
+    def _delete(self, key):
+        if self._data.pop(key, None) is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def _apply(self, ops):
+        with self._lock:
+            self._own()
+            for key, value in ops:
+                if value is None:
+                    self._delete(key)
+                else:
+                    self._put(key, value)
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def put(self, key, value):
+        self._apply(((key, value),))
+
+    def delete(self, key):
+        self._apply(((key, None),))
+
+    def write_batch(self, sync=False):
+        return _MemoryBatch(self)
+
+    def snapshot(self):
+        with self._lock:
+            self._shared = True
+            return _MemorySnapshot(self._data, self._keys)
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        # copies the range only, a snapshot would make the next write copy everything
+        with self._lock:
+            lo, hi = _key_range(self._keys, start, stop)
+            data = self._data
+            items = [(key, data[key]) for key in self._keys[lo:hi]]
+        if reverse:
+            items.reverse()
+        # a generator, closable like the other engines' iterators
+        return (item for item in items)
+
+    def close(self):
+        pass
+
+
+# lmdb rejects zero-length keys (the trie writes NONE_ROOT = b''),
+# every key is stored behind one byte, order is unchanged.
+_LMDB_KEY = b'k'
+
+
+def _lmdb_key(key):
+    return _LMDB_KEY + key
+
+
+class _LMDBBatch:
+    __slots__ = ('_env', '_sync', '_txn')
+
+    def __init__(self, env, sync):
+        self._env = env
+        self._sync = sync
+        self._txn = None
+
+    def __enter__(self):
+        self._txn = self._env.begin(write=True)
+        return self
+
+    def put(self, key, value):
+        self._txn.put(_lmdb_key(key), value)
+
+    def delete(self, key):
+        self._txn.delete(_lmdb_key(key))
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self._txn.commit()
+            if self._sync:
+                self._env.sync(True)
+        else:
+            self._txn.abort()
+
+
+class _LMDBSnapshot:
+    __slots__ = ('_txn',)
+
+    def __init__(self, env):
+        self._txn = env.begin(buffers=False)
+
+    def get(self, key, default=None):
+        value = self._txn.get(_lmdb_key(key))
+        return default if value is None else value
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        start = _lmdb_key(start if start is not None else b'')
+        stop = _lmdb_key(stop) if stop is not None else None
+        with self._txn.cursor() as cursor:
+            if reverse:
+                items = self._reverse(cursor, start, stop)
+            else:
+                items = self._forward(cursor, start, stop)
+            for key, value in items:
+                yield key[1:], value
+
+    @staticmethod
+    def _forward(cursor, start, stop):
+        found = cursor.set_range(start)
+        while found:
+            key = cursor.key()
+            if stop is not None and key >= stop:
+                return
+            yield key, cursor.value()
+            found = cursor.next()
+
+    @staticmethod
+    def _reverse(cursor, start, stop):
+        if stop is None:
+            found = cursor.last()
+        elif cursor.set_range(stop):
+            # first key >= stop, step back below it
+            found = cursor.prev()
+        else:
+            found = cursor.last()
+        while found:
+            key = cursor.key()
+            if key < start:
+                return
+            yield key, cursor.value()
+            found = cursor.prev()
+
+    def close(self):
+        self._txn.abort()
+
+
+class LMDBBackend(BaseBackend):
+    """ lmdb (optional), options are lmdb.open keyword arguments
+    """
+
+    def __init__(self, path, map_size=1 << 36, **options):
+        try:
+            import lmdb
+        except ImportError:
+            raise ImportError("lmdb backend requires the 'lmdb' package")
+        self._env = lmdb.open(path, map_size=map_size, sync=False, **options)
+
+    def get(self, key):
+        with self._env.begin() as txn:
+            return txn.get(_lmdb_key(key))
+
+    def put(self, key, value):
+        with self._env.begin(write=True) as txn:
+            txn.put(_lmdb_key(key), value)
+
+    def delete(self, key):
+        with self._env.begin(write=True) as txn:
+            txn.delete(_lmdb_key(key))
+
+    def write_batch(self, sync=False):
+        return _LMDBBatch(self._env, sync)
+
+    def snapshot(self):
+        return _LMDBSnapshot(self._env)
+
+    def get_property(self, name):
+        if name == b'lmdb.stat':
+            return str(self._env.stat()).encode()
+        return None
+
+    def close(self):
+        self._env.close()
+
+
+BACKENDS = {
+    LEVELDB: LevelDBBackend,
+    MEMORY: MemoryBackend,
+    LMDB: LMDBBackend
+}
+
+
+def prepare_backend(name, path, options=None) -> BaseBackend:
+    """
+    :param str name: 'leveldb', 'memory' or 'lmdb'
+    :param str path: database path
+    :param dict options: engine options
+    :return: backend
+    """
+    if name not in BACKENDS:
+        raise ValueError('unknown db backend: {}'.format(name))
+    return BACKENDS[name](path, **(options or {}))
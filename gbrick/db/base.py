@@ -1,25 +1,61 @@
 
-import plyvel
-
 from abc import ABC, abstractmethod
 
-# 미세한 차이로 leveldb보다 빠르다...
+from gbrick.db.backend import prepare_backend, LEVELDB
+from gbrick.db.config import (
+    PROFILES, DEFAULT_PROFILE, DB_PROPERTIES
+)
+from utils.cache import LRUCache, SizedLRUCache
 
 
 class BaseDB:
-    __slots__ = ('_path', '_db')
-
-    def __init__(self, path):
+    __slots__ = ('_path', '_db', '_profile', '_backend')
+
+    def __init__(self, path, profile=DEFAULT_PROFILE, backend=LEVELDB):
+        """
+        :param str path: database directory
+        :param str profile: tuning profile name, see config.PROFILES (leveldb only)
+        :param str backend: storage engine, see backend.BACKENDS
+        """
         if not path:
             raise AttributeError('path confused {}'.format(path))
+        if profile not in PROFILES:
+            raise ValueError('unknown db profile: {}'.format(profile))
         self._path = path
-        self._db = plyvel.DB(
-            self._path,
-            create_if_missing=True,
-        )
+        self._profile = profile
+        self._backend = backend
+        options = PROFILES[profile] if backend == LEVELDB else None
+        self._db = prepare_backend(backend, self._path, options)
 
-    def write_batch(self):
-        return self._db.write_batch()
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def profile(self):
+        return self._profile
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def stats(self):
+        """ profile options and engine property output
+        """
+        properties = {}
+        for name in DB_PROPERTIES:
+            value = self._db.get_property(name)
+            properties[name.decode()] = value.decode() if value is not None else None
+        return {
+            'backend': self._backend,
+            'profile': self._profile,
+            'options': dict(PROFILES[self._profile]),
+            'properties': properties
+        }
+
+    def write_batch(self, sync=False):
+        # nothing is written if the block raises
+        return self._db.write_batch(sync=sync)
 
     def snapshot(self):
         return self._db.snapshot()
@@ -41,17 +77,19 @@ class BaseDB:
     def put(self, key: bytes, value: bytes) -> None:
         self._db.put(key, value)
 
-    def iter(self, start=None, end=None):
-        if not start:
-            sn = self.snapshot()
-            sn_iter = sn.iterator()
-        else:
-            sn = self.snapshot()
-            if not end:
-                sn_iter = sn.iterator(start=start)
-            else:
-                sn_iter = sn.iterator(start=start, stop=end)
-        return sn_iter
+    def delete(self, key: bytes) -> None:
+        self._db.delete(key)
+
+    def iter(self, start=None, end=None, snapshot=None, reverse=False):
+        """ ordered (key, value) iterator
+        :param bytes start: first key, inclusive
+        :param bytes end: last key, exclusive
+        :param snapshot: snapshot to read from, a new one when None
+        :param bool reverse: descending key order
+        """
+        if snapshot is None:
+            return self._db.iterator(start=start or None, stop=end or None, reverse=reverse)
+        return snapshot.iterator(start=start or None, stop=end or None, reverse=reverse)
 
     def __contains__(self, key: bytes):
         return self.exists(key)
@@ -119,7 +157,15 @@ class BaseChainDB(ABC):
         raise NotImplementedError("chain_db: method not implement")
 
     @abstractmethod
-    def commit(self, block):
+    def commit(self, block, tries=(), state=None, receipts=None):
+        raise NotImplementedError("chain_db: method not implement")
+
+    @abstractmethod
+    def write_block(self, block, tries=(), receipts=None, state=None, prepared=None):
+        raise NotImplementedError("chain_db: method not implement")
+
+    @abstractmethod
+    def finish_block(self, block, tries=(), state=None, prepared=None):
         raise NotImplementedError("chain_db: method not implement")
 
     @abstractmethod
@@ -131,11 +177,64 @@ class BaseStateDB(ABC):
     _logger = None
     _root = None
     _trie = None
+    _validator_cache_size = 16
+    _warm_cache_size = 8192
+    _node_cache_size = 32768
+    _code_cache_bytes = 32 * 1024 * 1024
+    _code_pinned = 256
 
     def __init__(self, db: BaseDB):
         self._db = db
         self._cache = {}
-        self._code_cache = {}
+        # code blobs by code hash, shared across blocks, deployed code is pinned
+        self._code_cache = SizedLRUCache(self._code_cache_bytes, self._code_pinned)
+        # raw writes (code, delegation, minimum), flushed on commit
+        self._pending = {}
+        # accounts changed since the last flush to the trie
+        self._dirty = set()
+        # undo log while a snapshot is open, (journal length, trie root) per snapshot
+        self._journal = []
+        self._snapshots = []
+        # validator set of the working state, None until decoded
+        self._validators = None
+        # state root -> validator set, for roots that were committed or set
+        self._validator_sets = LRUCache(self._validator_cache_size)
+        # election index nodes, root follows the constant_rep leaf
+        self._ranks = None
+        # accounts read from the trie, the prefetch coverage counter
+        self.account_loads = 0
+        # clean accounts as of _warm_root, carried from block to block
+        self._warm = LRUCache(self._warm_cache_size)
+        self._warm_root = None
+        # decoded trie nodes by hash, valid under any root
+        self._nodes = LRUCache(self._node_cache_size)
+
+    @classmethod
+    def set_validator_cache_size(cls, size):
+        cls._validator_cache_size = size
+
+    @classmethod
+    def set_warm_cache_size(cls, accounts, nodes):
+        """
+        :param int accounts: clean accounts kept across blocks
+        :param int nodes: decoded trie nodes kept across blocks
+        """
+        cls._warm_cache_size = accounts
+        cls._node_cache_size = nodes
+
+    @classmethod
+    def set_code_cache_size(cls, max_bytes, pinned=None):
+        """
+        :param int max_bytes: code bytes kept across blocks
+        :param int pinned: recently deployed code hashes kept out of eviction
+        """
+        cls._code_cache_bytes = max_bytes
+        if pinned is not None:
+            cls._code_pinned = pinned
+
+    @property
+    def db(self):
+        return self._db
 
     @property
     @abstractmethod
@@ -216,7 +315,31 @@ class BaseStateDB(ABC):
         raise NotImplementedError("state_db: method not implement")
 
     @abstractmethod
-    def commit(self):
+    def snapshot(self):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def revert(self, snapshot_id):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def discard(self, snapshot_id):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def commit(self, sync=False):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def prepare_commit(self):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def write_commit(self, prepared, sync=False):
+        raise NotImplementedError("state_db: method not implement")
+
+    @abstractmethod
+    def finish_commit(self, prepared):
         raise NotImplementedError("state_db: method not implement")
 
     @abstractmethod
@@ -0,0 +1,185 @@
+import threading
+
+from gbrick.db.base import BaseDB
+
+_DELETED = None
+
+
+class _OverlayBatch:
+    __slots__ = ('_db', '_ops')
+
+    def __init__(self, db):
+        self._db = db
+        self._ops = {}
+
+    def put(self, key, value):
+        self._ops[key] = value
+
+    def delete(self, key):
+        self._ops[key] = _DELETED
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self._db._apply(self._ops)
+
+
+def _overlay_range(overlay, start, stop, reverse):
+    """
+    :return: sorted (key, value) of overlay in [start, stop), deletes included
+    """
+    items = [(key, value) for key, value in overlay.items()
+             if (start is None or key >= start) and (stop is None or key < stop)]
+    items.sort(reverse=reverse)
+    return items
+
+
+def _merge(items, base, reverse):
+    """ overlay items over a base iterator, both in the same key order.
+    the overlay wins on equal keys, deleted keys are dropped.
+    """
+    try:
+        ahead = next(base, None)
+        for key, value in items:
+            while ahead is not None and (ahead[0] > key if reverse else ahead[0] < key):
+                yield ahead
+                ahead = next(base, None)
+            if ahead is not None and ahead[0] == key:
+                ahead = next(base, None)
+            if value is not _DELETED:
+                yield key, value
+        while ahead is not None:
+            yield ahead
+            ahead = next(base, None)
+    finally:
+        close = getattr(base, 'close', None)
+        if close is not None:
+            close()
+
+
+class _OverlaySnapshot:
+    """ overlay copy over a snapshot of the base db
+    """
+    __slots__ = ('_overlay', '_base')
+
+    def __init__(self, overlay, base):
+        self._overlay = overlay
+        self._base = base
+
+    def get(self, key, default=None):
+        value = self._overlay.get(key, self)
+        if value is self:
+            return self._base.get(key, default)
+        if value is _DELETED:
+            return default
+        return value
+
+    def iterator(self, start=None, stop=None, reverse=False):
+        return _merge(_overlay_range(self._overlay, start, stop, reverse),
+                      self._base.iterator(start=start, stop=stop, reverse=reverse),
+                      reverse)
+
+    def close(self):
+        self._base.close()
+
+
+class BufferedDB:
+    """ write overlay over a BaseDB for bulk loads.
+    batches and puts land in memory and are written in one batch on flush,
+    reads see the overlay first. iter/snapshot merge the overlay over the
+    base db, nothing is flushed before flush/close.
+    """
+
+    def __init__(self, db: BaseDB):
+        self._db = db
+        self._overlay = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self._db.path
+
+    @property
+    def profile(self):
+        return self._db.profile
+
+    @property
+    def backend(self):
+        return self._db.backend
+
+    @property
+    def pending(self):
+        return len(self._overlay)
+
+    def stats(self):
+        stats = self._db.stats()
+        stats['pending'] = len(self._overlay)
+        return stats
+
+    def _apply(self, ops):
+        with self._lock:
+            self._overlay.update(ops)
+
+    def flush(self, sync=False):
+        """ write the overlay in one batch
+        :return: number of keys written
+        """
+        with self._lock:
+            overlay, self._overlay = self._overlay, {}
+        with self._db.write_batch(sync=sync) as batch:
+            for key, value in overlay.items():
+                if value is _DELETED:
+                    batch.delete(key)
+                else:
+                    batch.put(key, value)
+        return len(overlay)
+
+    def write_batch(self, sync=False):
+        return _OverlayBatch(self)
+
+    def snapshot(self):
+        with self._lock:
+            overlay = dict(self._overlay)
+        return _OverlaySnapshot(overlay, self._db.snapshot())
+
+    def exists(self, key: bytes) -> bool:
+        value = self._overlay.get(key, self)
+        if value is self:
+            return self._db.exists(key)
+        return value is not _DELETED
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def get(self, key):
+        if isinstance(key, str):
+            key = key.encode()
+        value = self._overlay.get(key, self)
+        if value is self:
+            return self._db.get(key)
+        if value is _DELETED:
+            raise KeyError(str(value))
+        return value
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self._apply(((key, value),))
+
+    def delete(self, key: bytes) -> None:
+        self._apply(((key, _DELETED),))
+
+    def iter(self, start=None, end=None, snapshot=None, reverse=False):
+        """ ordered (key, value) iterator, pending writes included
+        :param snapshot: snapshot() of this db, a new one when None
+        """
+        start, end = start or None, end or None
+        if snapshot is not None:
+            return snapshot.iterator(start, end, reverse)
+        with self._lock:
+            items = _overlay_range(self._overlay, start, end, reverse)
+        return _merge(items, self._db.iter(start, end, None, reverse), reverse)
+
+    def __contains__(self, key: bytes):
+        return self.exists(key)
@@ -1,8 +1,18 @@
+import queue
+import threading
 
-from pickle import dumps, loads
+from gbrick.db import record
 from gbrick.db.base import BaseChainDB
+from gbrick.db.view import BlockView
+from gbrick.db.config import (
+    height_key, body_key, tx_index_key,
+    history_key, history_prefix, history_position,
+    SYNC_NONE, SYNC_FULL, FREEZE_DEPTH
+)
 
 from utils.config import Lookup
+from utils.cache import LRUCache
+from utils.metrics import LatencyMeter
 from utils.trie.prepare import prepare_trie, make_hash_root
 
 from gbrick.types.base import (
@@ -24,14 +34,194 @@ from utils.util import (
     HEADER_CONTEXT
 ) = tuple(range(2))
 
+_END_OF_RANGE = object()
+_BODY_RECORD = bytes((record.RECORD_VERSION, record.BODY))
+# above any (height, index) of an address
+_HISTORY_END = b'\xff' * 13
+
+
+def history_entries(height, transactions):
+    """ account history entries of one block
+    :param int height: block height
+    :param transactions: block transactions
+    :return: list of (key, value)
+    """
+    entries = []
+    for index, tx in enumerate(transactions):
+        sender, recipient = tx.address_sender, tx.address_recipient
+        if sender == recipient:
+            entries.append((history_key(sender, height, index),
+                            record.encode_history(record.HISTORY_SENT | record.HISTORY_RECEIVED, tx.hash)))
+            continue
+        entries.append((history_key(sender, height, index),
+                        record.encode_history(record.HISTORY_SENT, tx.hash)))
+        if recipient:
+            entries.append((history_key(recipient, height, index),
+                            record.encode_history(record.HISTORY_RECEIVED, tx.hash)))
+    return entries
+
 
 class ChainDB(BaseChainDB):
+    _header_cache_size = 256
+    _sync_policy = SYNC_NONE
+    _tx_index = True
+    _history_index = True
+    _prefetch_depth = 64
+    _freeze_depth = FREEZE_DEPTH
+    _freeze_batch = 256
+
+    def __init__(self, db, freezer=None):
+        """
+        :param BaseDB db: chain database
+        :param Freezer freezer: ancient block store, blocks stay in db when None
+        """
+        super().__init__(db)
+        self._freezer = freezer
+        # head :: (height, block hash, header), replaced as a whole on commit
+        self._head = None
+        self._chain_id = None
+        self._header_by_height = LRUCache(self._header_cache_size)
+        self._header_by_hash = LRUCache(self._header_cache_size)
+        self.commit_latency = LatencyMeter()
+
+    @classmethod
+    def set_cache_size(cls, header_cache_size):
+        cls._header_cache_size = header_cache_size
+
+    @classmethod
+    def set_tx_index(cls, enabled):
+        """ direct tx_hash -> (height, index, tx, receipt) index,
+        lookups fall back to the tries when disabled
+        """
+        cls._tx_index = enabled
+
+    @classmethod
+    def set_history_index(cls, enabled):
+        """ (address, height, index) -> tx_hash index,
+        rebuild with gbrick.tools.rebuild_history after enabling on a synced node
+        """
+        cls._history_index = enabled
+
+    @classmethod
+    def set_freeze_depth(cls, depth, batch=None):
+        """ blocks deeper than depth below head move to the freezer
+        :param int depth: blocks kept in db
+        :param int batch: blocks moved per commit at most
+        """
+        if depth <= 0:
+            raise ValueError("freeze depth must be positive: {}".format(depth))
+        cls._freeze_depth = depth
+        if batch is not None:
+            cls._freeze_batch = batch
+
+    @classmethod
+    def set_prefetch_depth(cls, depth):
+        """ blocks read ahead by iter_blocks
+        """
+        if depth <= 0:
+            raise ValueError("prefetch depth must be positive: {}".format(depth))
+        cls._prefetch_depth = depth
+
+    @classmethod
+    def set_sync_policy(cls, policy):
+        """
+        :param str policy: 'none' or 'full'
+        """
+        if policy not in (SYNC_NONE, SYNC_FULL):
+            raise ValueError("unexpected sync policy: {}".format(policy))
+        cls._sync_policy = policy
+
+    @property
+    def head(self):
+        """ in-memory chain head
+        :return: (height, block hash, header), None before genesis
+        """
+        if self._head is None:
+            self._head = self._load_head()
+        return self._head
+
+    def _load_head(self):
+        try:
+            height = bytes_to_int(self.db.get(Lookup.top_header()))
+        except KeyError:
+            return None
+        header = self.get_header_from_height(height)
+        return height, header.hash, header
+
+    def _cache_header(self, header):
+        self._header_by_height.put(header.num_height, header)
+        self._header_by_hash.put(header.hash, header)
+
+    def cache_stats(self):
+        return {
+            'header_by_height': self._header_by_height.stats(),
+            'header_by_hash': self._header_by_hash.stats()
+        }
+
+    def commit_stats(self):
+        return self.commit_latency.stats()
+
+    @property
+    def frozen(self):
+        """ heights below are served by the freezer
+        """
+        return 0 if self._freezer is None else len(self._freezer)
+
+    def _load_ancient(self, height):
+        raw_header, raw_body = record.split_ancient(self._freezer.get(height))
+        return record.decode_header(raw_header), raw_body
+
+    def freeze(self):
+        """ move blocks deeper than the freeze depth to the freezer.
+        freezer is synced before the db records are deleted,
+        a crash in between leaves both copies and reads use the freezer.
+        :return: number of blocks moved
+        """
+        head = self.head
+        if self._freezer is None or head is None:
+            return 0
+        start = len(self._freezer)
+        stop = min(head[0] - self._freeze_depth + 1, start + self._freeze_batch)
+        if stop <= start:
+            return 0
+
+        moved = []
+        for height in range(start, stop):
+            header_key = int_to_bytes32(height)
+            raw_header = self.db.get(header_key)
+            header = self.deserialize(raw_header, HEADER_CONTEXT)
+            if record.is_legacy(raw_header):
+                raw_header = self.serialize(header)
+            try:
+                raw_body = self.db.get(body_key(header.hash))
+                legacy_key = None
+            except KeyError:
+                legacy_key = header.hash_block
+                raw_body = record.encode_body(self.deserialize(self.db.get(legacy_key)))
+            self._freezer.append(record.encode_ancient(raw_header, raw_body))
+            moved.append((height, header, legacy_key))
+        self._freezer.sync()
+
+        with self.db.write_batch() as batch:
+            for height, header, legacy_key in moved:
+                batch.delete(int_to_bytes32(height))
+                batch.delete(body_key(header.hash))
+                if legacy_key is not None:
+                    batch.delete(legacy_key)
+                    batch.put(height_key(header.hash), record.encode_height(height))
+        return len(moved)
 
     def serialize(self, obj):
-        return dumps(obj.to_dict())
+        if isinstance(obj, BaseBlock):
+            return record.encode_block(obj)
+        return record.encode_header(obj)
 
-    def deserialize(self, raw_dict, context=BLOCK_CONTEXT):
-        return self._deserialize(loads(raw_dict), context)
+    def deserialize(self, raw_obj, context=BLOCK_CONTEXT):
+        if record.is_legacy(raw_obj):
+            return self._deserialize(record.legacy_loads(raw_obj), context)
+        if context == HEADER_CONTEXT:
+            return record.decode_header(raw_obj)
+        return record.decode_block(raw_obj)
 
     def _deserialize(self, dict_obj, context):
         if context == HEADER_CONTEXT:
@@ -39,6 +229,18 @@ class ChainDB(BaseChainDB):
         elif context == BLOCK_CONTEXT:
             return self._deserialize_block(dict_obj)
 
+    def _load(self, key, context=BLOCK_CONTEXT):
+        # legacy records are read as they are,
+        # gbrick.tools.migrate_records rewrites them
+        return self.deserialize(self.db.get(key), context)
+
+    def _load_lookup(self, key):
+        raw_lookup = self.db.get(key)
+        if record.is_legacy(raw_lookup):
+            height, seek_index = record.legacy_loads(raw_lookup)
+            return height, seek_index
+        return record.decode_lookup(raw_lookup)
+
     def _deserialize_block(self, dict_obj) -> BaseBlock:
         return deserialize_block(dict_obj)
 
@@ -46,46 +248,195 @@ class ChainDB(BaseChainDB):
         return deserialize_header(dict_obj)
 
     def get_chain_id(self):
-        header = self.get_header_from_height(0)
-        return header.chain_id
+        if self._chain_id is None:
+            # pinned, genesis never changes
+            self._chain_id = self.get_header_from_height(0).chain_id
+        return self._chain_id
 
     def get_block_hash(self, height):
         header = self.get_header_from_height(height)
         return header.hash_block
 
+    def _get_height(self, block_hash):
+        return record.decode_height(self.db.get(height_key(block_hash)))
+
+    def _load_legacy_block(self, block_hash) -> BaseBlock:
+        # full block under its hash, written before header/body split.
+        # read as it is, migrate_records or freeze split it.
+        return self._load(block_hash)
+
     def get_block_from_height(self, height) -> BaseBlock:
-        block_hash = self.get_block_hash(height)
-        raw_block = self.db.get(block_hash)
-        return self.deserialize(raw_block)
+        if height < self.frozen:
+            header, raw_body = self._load_ancient(height)
+            return BlockView(self._header_by_height.get(height) or header, raw_body)
+        header = self.get_header_from_height(height)
+        try:
+            raw_body = self.db.get(body_key(header.hash))
+        except KeyError:
+            return self._load_legacy_block(header.hash_block)
+        return BlockView(header, raw_body)
 
     def get_header_from_height(self, height) -> BaseHeader:
-        raw_header = self.db.get(int_to_bytes32(height))
-        return self.deserialize(raw_header, HEADER_CONTEXT)
+        header = self._header_by_height.get(height)
+        if header is None:
+            if height < self.frozen:
+                header, _ = self._load_ancient(height)
+            else:
+                header = self._load(int_to_bytes32(height), HEADER_CONTEXT)
+            self._cache_header(header)
+        return header
 
     def get_block_from_hash(self, block_hash) -> BaseBlock:
-        raw_block = self.db.get(block_hash)
-        return self.deserialize(raw_block)
+        try:
+            raw_body = self.db.get(body_key(block_hash))
+        except KeyError:
+            try:
+                height = self._get_height(block_hash)
+            except KeyError:
+                return self._load_legacy_block(block_hash)
+            return self.get_block_from_height(height)
+        return BlockView(self.get_header_from_hash(block_hash), raw_body)
 
     def get_header_from_hash(self, block_hash) -> BaseHeader:
-        block = self.get_block_from_hash(block_hash)
-        return block.header
+        header = self._header_by_hash.get(block_hash)
+        if header is not None:
+            return header
+        try:
+            height = self._get_height(block_hash)
+        except KeyError:
+            header = self._load_legacy_block(block_hash).header
+            self._cache_header(header)
+            return header
+        return self.get_header_from_height(height)
+
+    def iter_blocks(self, start=0, end=None, headers_only=False):
+        """ stream blocks [start, end) from one snapshot.
+        records are read ahead in a background thread,
+        transactions and votes are decoded on first access.
+        headers read here bypass the header cache.
+        :param int start: first height
+        :param int end: stop height (exclusive), head + 1 when None
+        :param bool headers_only: yield headers, bodies are not read
+        :return: generator of BlockView (or BlockHeader)
+        """
+        if end is None:
+            head = self.head
+            end = 0 if head is None else head[0] + 1
+        if start >= end:
+            return
+
+        snapshot = self.db.snapshot()
+        # read after the snapshot: heights frozen later are still in it
+        frozen = min(self.frozen, end)
+        items = queue.Queue(self._prefetch_depth)
+        stop = threading.Event()
+
+        def offer(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_ahead():
+            # headers are keyed by 32-byte big-endian height,
+            # so the key range is the height range.
+            it = self.db.iter(int_to_bytes32(max(start, frozen)), int_to_bytes32(end), snapshot)
+            try:
+                for height in range(start, frozen):
+                    header, raw_body = self._load_ancient(height)
+                    if not offer((header, None if headers_only else raw_body)):
+                        return
+                for _, raw_header in it:
+                    header = self.deserialize(raw_header, HEADER_CONTEXT)
+                    raw_body = None
+                    if not headers_only:
+                        raw_body = snapshot.get(body_key(header.hash))
+                        if raw_body is None:
+                            # legacy full block under its hash
+                            raw_body = snapshot.get(header.hash_block)
+                    if not offer((header, raw_body)):
+                        return
+                offer(_END_OF_RANGE)
+            except Exception as e:
+                offer(e)
+            finally:
+                it.close()
+                snapshot.close()
+
+        reader = threading.Thread(target=read_ahead, name='chain-iter', daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = items.get()
+                if item is _END_OF_RANGE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                header, raw_body = item
+                if headers_only:
+                    yield header
+                elif raw_body is None:
+                    raise KeyError("chain_db: missing body at {}".format(header.num_height))
+                elif raw_body[:2] == _BODY_RECORD:
+                    yield BlockView(header, raw_body)
+                else:
+                    yield self.deserialize(raw_body)
+        finally:
+            # early close: unblock and wait for the reader
+            stop.set()
+            while True:
+                try:
+                    items.get_nowait()
+                except queue.Empty:
+                    break
+            reader.join()
 
     def get_current_height(self):
-        return bytes_to_int(self.db.get(Lookup.top_header()))
+        head = self.head
+        if head is None:
+            return bytes_to_int(self.db.get(Lookup.top_header()))
+        return head[0]
 
     def has_transaction(self, tx_hash):
         lookup = Lookup.transaction(tx_hash)
         return lookup in self.db
 
-    def _set_transaction_from_lookup(self, height, seek_index, transaction):
+    def _set_transaction_from_lookup(self, height, seek_index, transaction, batch=None):
         lookup_key = Lookup.transaction(transaction.hash)
-        leaf_key = dumps((height, seek_index))
-        self.db.put(lookup_key, leaf_key)
+        (self.db if batch is None else batch).put(lookup_key, record.encode_lookup(height, seek_index))
+
+    def _set_transaction_index(self, block, receipts, batch):
+        by_hash = {}
+        for receipt in receipts or ():
+            by_hash[receipt.hash_transaction] = receipt
+        for index, tx in enumerate(block.list_transactions):
+            batch.put(tx_index_key(tx.hash),
+                      record.encode_tx_index(block.height, index, tx,
+                                             by_hash.get(tx.hash)))
+
+    def get_transaction_index(self, tx_hash):
+        """ direct index entry
+        :return: (height, index, tx dict, receipt dict), None if not indexed
+        """
+        try:
+            raw_entry = self.db.get(tx_index_key(tx_hash))
+        except KeyError:
+            return None
+        return record.decode_tx_index(raw_entry)
 
     def get_transaction_from_lookup(self, tx_hash) -> BaseTransaction:
+        entry = self.get_transaction_index(tx_hash)
+        if entry is not None:
+            return entry[2]
+        return self.get_transaction_from_trie(tx_hash)
+
+    def get_transaction_from_trie(self, tx_hash):
         lookup = Lookup.transaction(tx_hash)
         if lookup in self.db:
-            height, seek_index = loads(self.db.get(lookup))
+            height, seek_index = self._load_lookup(lookup)
             header = self.get_header_from_height(height)
             tx_root = header.hash_transaction_root
             trie = prepare_trie(tx_root, self.db)
@@ -93,15 +444,27 @@ class ChainDB(BaseChainDB):
             tx = trie.get(trie_key)
             return tx
 
-    def _set_vote_from_lookup(self, height, seek_index, vote):
+    def iter_history(self, address, before=None):
+        """ transactions sent or received by address, newest first
+        :param bytes address: account address
+        :param tuple before: (height, index), only older entries
+        :return: generator of (height, index, tx hash, flags)
+        """
+        prefix = history_prefix(address)
+        end = prefix + _HISTORY_END if before is None else history_key(address, *before)
+        for key, raw in self.db.iter(prefix, end, reverse=True):
+            height, index = history_position(key)
+            flags, tx_hash = record.decode_history(raw)
+            yield height, index, tx_hash, flags
+
+    def _set_vote_from_lookup(self, height, seek_index, vote, batch=None):
         lookup_key = Lookup.vote(vote.hash)
-        leaf_key = dumps((height, seek_index))
-        self.db.put(lookup_key, leaf_key)
+        (self.db if batch is None else batch).put(lookup_key, record.encode_lookup(height, seek_index))
 
     def get_vote_from_lookup(self, vote_hash) -> BaseVote:
         lookup = Lookup.vote(vote_hash)
         if lookup in self.db:
-            height, seek_index = loads(self.db.get(lookup))
+            height, seek_index = self._load_lookup(lookup)
             header = self.get_header_from_height(height)
             vote_root = header.hash_vote_root
             trie = prepare_trie(vote_root, self.db)
@@ -116,9 +479,15 @@ class ChainDB(BaseChainDB):
         trie.clear()
 
     def get_receipt(self, tx_hash):
+        entry = self.get_transaction_index(tx_hash)
+        if entry is not None and entry[3] is not None:
+            return entry[3]
+        return self.get_receipt_from_trie(tx_hash)
+
+    def get_receipt_from_trie(self, tx_hash):
         lookup = Lookup.transaction(tx_hash)
         if lookup in self.db:
-            height, seek_index = loads(self.db.get(lookup))
+            height, seek_index = self._load_lookup(lookup)
             header = self.get_header_from_height(height)
             receipt_root = header.hash_receipt_root
             trie = prepare_trie(receipt_root, self.db)
@@ -126,23 +495,68 @@ class ChainDB(BaseChainDB):
             receipt = trie.get(trie_key)
             return receipt
 
-    def commit(self, block: BaseBlock):
-        self.db.put(Lookup.top_header(), int_to_bytes32(block.header.num_height))
-        # not padding.
-        self.db.put(int_to_bytes32(block.header.num_height), self.serialize(block.header))
-        self.db.put(block.hash, self.serialize(block))
-        # Lookup(height, index) ->
-        # block tx root -> Trie.root = root hash -> Trie.get(index-key)
-        for index, tx in enumerate(block.list_transactions):
-            self._set_transaction_from_lookup(
-                block.height, index, tx
-            )
-
-        for index, vote in enumerate(block.list_vote):
-            self._set_vote_from_lookup(
-                block.height, index, vote
-            )
+    def commit(self, block: BaseBlock, tries=(), state=None, receipts=None):
+        """ write block in one batch
+        :param BaseBlock block: finalized block
+        :param tries: transaction, receipt and vote tries of the block
+        :param state: state to commit first, head never runs ahead of state
+        :param receipts: block receipts, stored in the direct tx index
+        """
+        prepared = None if state is None else state.prepare_commit()
+        self.write_block(block, tries, receipts, state, prepared)
+        self.finish_block(block, tries, state, prepared)
+        self.freeze()
+
+    def write_block(self, block: BaseBlock, tries=(), receipts=None, state=None, prepared=None):
+        """ db writes of commit, no cache is touched, safe on the i/o pool
+        :param state: state db of prepared
+        :param StateCommit prepared: state.prepare_commit(), written first
+        """
+        sync = self._sync_policy == SYNC_FULL
+        with self.commit_latency.time():
+            if prepared is not None:
+                state.write_commit(prepared, sync)
+
+            with self.db.write_batch(sync=sync) as batch:
+                for trie in tries:
+                    for k, v in trie.cache.items():
+                        batch.put(k, v)
+
+                batch.put(int_to_bytes32(block.header.num_height), self.serialize(block.header))
+                batch.put(body_key(block.hash), record.encode_body(block))
+                batch.put(height_key(block.hash), record.encode_height(block.height))
+                # Lookup(height, index) ->
+                # block tx root -> Trie.root = root hash -> Trie.get(index-key)
+                for index, tx in enumerate(block.list_transactions):
+                    self._set_transaction_from_lookup(
+                        block.height, index, tx, batch
+                    )
+
+                if self._tx_index:
+                    self._set_transaction_index(block, receipts, batch)
+
+                if self._history_index:
+                    for k, v in history_entries(block.height, block.list_transactions):
+                        batch.put(k, v)
+
+                for index, vote in enumerate(block.list_vote):
+                    self._set_vote_from_lookup(
+                        block.height, index, vote, batch
+                    )
+                # not padding.
+                batch.put(Lookup.top_header(), int_to_bytes32(block.header.num_height))
+
+    def finish_block(self, block: BaseBlock, tries=(), state=None, prepared=None):
+        """ caches and head after write_block, on the thread that owns them
+        """
+        if prepared is not None:
+            state.finish_commit(prepared)
+        for trie in tries:
+            trie.clear()
+
+        self._cache_header(block.header)
+        self._head = (block.height, block.hash, block.header)
 
     def __contains__(self, block_hash):
-        return self.db.exists(block_hash)
+        return self.db.exists(height_key(block_hash)) or self.db.exists(block_hash)
 
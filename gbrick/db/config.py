@@ -0,0 +1,155 @@
+import struct
+
+# chain db key layout
+# Lookup.top_header()        -> height
+# int_to_bytes32(height)     -> header record
+# HEIGHT_PREFIX + block hash -> height record
+# BODY_PREFIX + block hash   -> body record
+# block hash                 -> full block record (legacy)
+# TX_INDEX_PREFIX + tx hash  -> height, index, tx, receipt (optional)
+# HISTORY_PREFIX + len(address) + address + height + index
+#                            -> flags, tx hash (optional)
+# heights below the freeze point live in the freezer (<path>-ancient),
+# their header and body keys are removed from the db
+
+HEIGHT_PREFIX = b'gBh:'
+BODY_PREFIX = b'gBb:'
+TX_INDEX_PREFIX = b'gBt:'
+HISTORY_PREFIX = b'gBa:'
+
+_HISTORY_POSITION = struct.Struct('>QI')
+
+
+def height_key(block_hash: bytes) -> bytes:
+    return HEIGHT_PREFIX + block_hash
+
+
+def body_key(block_hash: bytes) -> bytes:
+    return BODY_PREFIX + block_hash
+
+
+def tx_index_key(tx_hash: bytes) -> bytes:
+    return TX_INDEX_PREFIX + tx_hash
+
+
+def history_prefix(address: bytes) -> bytes:
+    return HISTORY_PREFIX + bytes((len(address),)) + address
+
+
+def history_key(address: bytes, height: int, index: int) -> bytes:
+    # big-endian position, keys of one address sort by (height, index)
+    return history_prefix(address) + _HISTORY_POSITION.pack(height, index)
+
+
+def history_position(key: bytes) -> (int, int):
+    return _HISTORY_POSITION.unpack_from(key, len(key) - _HISTORY_POSITION.size)
+
+# state db key layout (raw keys next to the trie nodes)
+# DELEGATION_PREFIX + len(address) + address + to -> delegation record
+# DELEGATOR_PREFIX + len(to) + to + address       -> b'' (delegations received)
+# DELEGATION_TOTAL_PREFIX + address               -> int_to_bytes32(delegated out)
+# sha3_hex(address + to)                          -> delegation record (legacy,
+#                                                    listed in account.delegated)
+
+DELEGATION_PREFIX = b'gBd:'
+DELEGATOR_PREFIX = b'gBr:'
+DELEGATION_TOTAL_PREFIX = b'gBs:'
+
+
+def delegation_prefix(address: bytes) -> bytes:
+    return DELEGATION_PREFIX + bytes((len(address),)) + address
+
+
+def delegation_key(address: bytes, to: bytes) -> bytes:
+    return delegation_prefix(address) + to
+
+
+def delegator_prefix(to: bytes) -> bytes:
+    return DELEGATOR_PREFIX + bytes((len(to),)) + to
+
+
+def delegator_key(to: bytes, address: bytes) -> bytes:
+    return delegator_prefix(to) + address
+
+
+def delegation_total_key(address: bytes) -> bytes:
+    return DELEGATION_TOTAL_PREFIX + address
+
+# validator election
+# constant_rep trie leaf -> root of the rank index (utils.trie.rank),
+#                           legacy leaf: list of rep dicts, migrated on the next write
+# ELECTED_LEAF trie leaf -> rep dicts elected at the last epoch boundary,
+#                           the validator set until the next boundary
+# rank key :: inverted delegated stake (32 bytes) + node id,
+#             ascending key order is highest stake first
+ELECTION_LIMIT = 21
+# blocks per epoch, the election runs at the end of every height % ELECTION_EPOCH == 0
+ELECTION_EPOCH = 100
+ELECTED_LEAF = b'gBelected'
+
+_RANK_MAX = (1 << 256) - 1
+
+
+def rank_key(stake: int, node_id: bytes) -> bytes:
+    return (_RANK_MAX - stake).to_bytes(32, byteorder='big') + node_id
+
+# commit sync policy
+# none :: leave flushing to the OS
+# full :: fsync the state batch, then the chain batch
+SYNC_NONE = 'none'
+SYNC_FULL = 'full'
+
+# blocks kept in the chain db below head,
+# deeper blocks are moved to the freezer
+FREEZE_DEPTH = 90000
+
+# leveldb tuning profiles, plyvel.DB options
+# state   :: trie nodes, random point reads -> big block cache, bloom filter
+# chain   :: headers, bodies, lookups -> mostly recent reads, larger blocks
+# archive :: cold data, sequential scans -> small cache, large blocks
+DEFAULT_PROFILE = 'default'
+
+PROFILES = {
+    DEFAULT_PROFILE: {},
+    'state': {
+        'lru_cache_size': 256 * 1024 * 1024,
+        'bloom_filter_bits': 10,
+        'write_buffer_size': 64 * 1024 * 1024,
+        'max_open_files': 1024,
+        'block_size': 4 * 1024,
+        'compression': 'snappy'
+    },
+    'chain': {
+        'lru_cache_size': 64 * 1024 * 1024,
+        'bloom_filter_bits': 10,
+        'write_buffer_size': 32 * 1024 * 1024,
+        'max_open_files': 512,
+        'block_size': 16 * 1024,
+        'compression': 'snappy'
+    },
+    'archive': {
+        'lru_cache_size': 16 * 1024 * 1024,
+        'bloom_filter_bits': 0,
+        'write_buffer_size': 8 * 1024 * 1024,
+        'max_open_files': 256,
+        'block_size': 64 * 1024,
+        'compression': 'snappy'
+    }
+}
+
+# DBContext entry -> profile
+DB_PROFILES = {
+    'chain': 'chain',
+    'state': 'state'
+}
+
+# storage engine: 'leveldb', 'memory' or 'lmdb'
+DB_BACKEND = 'leveldb'
+
+# engine properties reported by BaseDB.stats
+DB_PROPERTIES = (
+    b'leveldb.stats',
+    b'leveldb.sstables',
+    b'leveldb.approximate-memory-usage',
+    b'lmdb.stat'
+)
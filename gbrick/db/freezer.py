@@ -0,0 +1,149 @@
+import mmap
+import os
+import struct
+import threading
+
+from utils.exceptions import FreezerError
+from utils.logger import getLogger
+
+# ancient store, one item per height starting at 0
+# segment :: <name>.<number>.seg, items appended back to back,
+#            a new segment is opened once the current one is full
+# index   :: <name>.idx, fixed 16 bytes per item (>IIQ)
+#            segment number, item length, offset in segment
+# an item is visible once its index entry is written,
+# a torn tail is cut back to the last full index entry on open.
+
+_ENTRY = struct.Struct('>IIQ')
+
+SEGMENT_SIZE = 1 << 30
+
+
+class Freezer:
+    """ append-only, memory-mapped item store
+    """
+    _logger = None
+
+    def __init__(self, path, name='blocks', segment_size=SEGMENT_SIZE):
+        """
+        :param str path: freezer directory
+        :param str name: table name
+        :param int segment_size: segment roll-over size in bytes
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._path = path
+        self._name = name
+        self._segment_size = segment_size
+        self._lock = threading.Lock()
+        # segment number -> mmap, remapped when the segment grows
+        self._maps = {}
+
+        self._index = open(os.path.join(path, '{}.idx'.format(name)), 'a+b')
+        self._items = self._repair()
+        self._head_number, self._head_offset = self._tail()
+        self._head = open(self._segment_path(self._head_number), 'a+b')
+        # segment data past the last index entry was never acknowledged
+        self._head.truncate(self._head_offset)
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            self._logger = getLogger('freezer')
+        return self._logger
+
+    def __len__(self):
+        return self._items
+
+    @property
+    def items(self):
+        return self._items
+
+    def _segment_path(self, number):
+        return os.path.join(self._path, '{}.{:04d}.seg'.format(self._name, number))
+
+    def _entry(self, index):
+        raw = os.pread(self._index.fileno(), _ENTRY.size, index * _ENTRY.size)
+        if len(raw) != _ENTRY.size:
+            raise FreezerError('freezer: truncated index at {}'.format(index))
+        return _ENTRY.unpack(raw)
+
+    def _tail(self):
+        if self._items == 0:
+            return 0, 0
+        number, length, offset = self._entry(self._items - 1)
+        return number, offset + length
+
+    def _repair(self):
+        size = os.fstat(self._index.fileno()).st_size
+        items = size // _ENTRY.size
+        if size % _ENTRY.size:
+            self.logger.warning('drop torn index entry ({} bytes)'.format(size % _ENTRY.size))
+            self._index.truncate(items * _ENTRY.size)
+
+        while items > 0:
+            number, length, offset = self._entry(items - 1)
+            segment = self._segment_path(number)
+            if os.path.exists(segment) and os.path.getsize(segment) >= offset + length:
+                break
+            self.logger.warning('drop item {}, segment data missing'.format(items - 1))
+            items -= 1
+            self._index.truncate(items * _ENTRY.size)
+        return items
+
+    def append(self, item: bytes) -> int:
+        """ append item, not durable until sync
+        :param bytes item: item data
+        :return: item index
+        """
+        with self._lock:
+            if self._head_offset > 0 and self._head_offset + len(item) > self._segment_size:
+                self._head.flush()
+                os.fsync(self._head.fileno())
+                self._head.close()
+                self._head_number += 1
+                self._head_offset = 0
+                self._head = open(self._segment_path(self._head_number), 'w+b')
+
+            self._head.write(item)
+            self._head.flush()
+            self._index.write(_ENTRY.pack(self._head_number, len(item), self._head_offset))
+            self._index.flush()
+            self._head_offset += len(item)
+            self._items += 1
+            return self._items - 1
+
+    def sync(self):
+        """ fsync segment before index, an index entry never points past the data
+        """
+        with self._lock:
+            os.fsync(self._head.fileno())
+            os.fsync(self._index.fileno())
+
+    def _map(self, number, end):
+        view = self._maps.get(number)
+        if view is None or len(view) < end:
+            with open(self._segment_path(number), 'rb') as f:
+                # old map stays alive while views into it are held
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[number] = view
+        return view
+
+    def get(self, index) -> memoryview:
+        """ item without copying out of the segment
+        :param int index: item index
+        :return: read-only memoryview
+        """
+        if not 0 <= index < self._items:
+            raise KeyError(index)
+        with self._lock:
+            number, length, offset = self._entry(index)
+            if length == 0:
+                return memoryview(b'')
+            return self._map(number, offset + length)[offset:offset + length]
+
+    def close(self):
+        with self._lock:
+            self._head.close()
+            self._index.close()
+            self._maps.clear()
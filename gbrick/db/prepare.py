@@ -1,27 +1,41 @@
 
 from gbrick.db.base import DB
+from gbrick.db.config import DB_PROFILES, DEFAULT_PROFILE, DB_BACKEND
+from gbrick.db.freezer import Freezer
+from gbrick.db.aio import AsyncChainDB, AsyncStateDB
+from gbrick.db.buffered import BufferedDB
+from utils.metrics import LoopLagMonitor
 from gbrick.db import (
     ChainDB, StateDB
 )
 
 
+def prepare_freezer(db) -> Freezer:
+    return Freezer(db.path + '-ancient')
+
+
 def prepare_chain_db(db) -> ChainDB:
-    return ChainDB(db=db)
+    return ChainDB(db=db, freezer=prepare_freezer(db))
 
 
 def prepare_state_db(db) -> StateDB:
     return StateDB(db=db)
 
 
-def prepare_database(path_class):
+def prepare_database(path_class, profiles=None, backend=DB_BACKEND, buffered=False):
     """ prepare to db class
 
     :param path path_class: path class
+    :param dict profiles: db name -> tuning profile, config.DB_PROFILES when None
+    :param str backend: storage engine, 'leveldb', 'memory' or 'lmdb'
+    :param bool buffered: writes are kept in memory until DBContext.flush (bulk import)
     :return: db_context class
     """
+    if profiles is None:
+        profiles = DB_PROFILES
 
     class DBContext:
-        __slots__ = ('chain', 'state')
+        __slots__ = ('chain', 'state', 'async_chain', 'async_state', 'loop_lag')
 
         def __init__(self, path):
             db_class = (
@@ -31,8 +45,40 @@ def prepare_database(path_class):
             for name, path, make_db in zip(path.__slots__[:-2],
                                            path,
                                            db_class):
-                base_db = DB(path)
+                base_db = DB(path, profiles.get(name, DEFAULT_PROFILE), backend)
+                if buffered:
+                    base_db = BufferedDB(base_db)
                 setattr(self, name, make_db(base_db))
+            # same dbs, reads and commits off the event loop
+            self.async_chain = AsyncChainDB(self.chain)
+            self.async_state = AsyncStateDB(self.state)
+            self.loop_lag = LoopLagMonitor()
+
+        def flush(self, sync=False):
+            """ buffered context: state first, chain head never runs ahead of state
+            """
+            for db in (self.state.db, self.chain.db):
+                if isinstance(db, BufferedDB):
+                    db.flush(sync)
+
+        def db_stats(self):
+            return {
+                'chain': self.chain.db.stats(),
+                'state': self.state.db.stats(),
+                'cache': {
+                    'chain': self.chain.cache_stats(),
+                    'state': self.state.cache_stats()
+                }
+            }
+
+        def io_stats(self):
+            return {
+                'chain': self.async_chain.stats(),
+                'state': self.async_state.stats(),
+                'loop_lag': self.loop_lag.stats(),
+                'prefetch': self.async_state.coverage.stats(),
+                'commit': self.chain.commit_stats()
+            }
 
     return DBContext(path_class)
 
@@ -0,0 +1,256 @@
+import io
+import pickle
+import struct
+
+from utils.pack import pack_into, unpack_from, write_varint, read_varint
+from utils.exceptions import SerializeError
+from gbrick.types import (
+    BlockHeader, Block, Transaction,
+    Vote, Account
+)
+from gbrick.types.config import TX_DICT, RECEIPT_DICT
+
+# on-disk record
+# :: [version 0x01][kind][payload]
+# header, block, account :: slot values packed positionally,
+#                           decoded straight into the slot objects.
+# body :: [varint len][transactions][varint len][votes][extra],
+#         sections are decoded on first access
+# lookup :: fixed (>QI) height, index
+# height :: fixed (>Q) height
+# tx index :: height, index, tx and receipt in to_dict order
+# ancient :: [varint len][header record][body record], freezer item
+# history :: flags (sent 0x01, received 0x02), tx hash
+
+RECORD_VERSION = 0x01
+
+HEADER = 0x01
+BLOCK = 0x02
+ACCOUNT = 0x03
+LOOKUP = 0x04
+DELEGATION = 0x05
+BODY = 0x06
+HEIGHT = 0x07
+TX_INDEX = 0x08
+HISTORY = 0x09
+
+HISTORY_SENT = 0x01
+HISTORY_RECEIVED = 0x02
+
+# pickle protocol 2+ starts with PROTO opcode
+_PICKLE_PROTO = 0x80
+
+_LOOKUP = struct.Struct('>QI')
+_HEIGHT = struct.Struct('>Q')
+
+
+def is_legacy(raw) -> bool:
+    """ pickle record written before the record format
+    :param bytes raw: stored value
+    """
+    return len(raw) > 0 and raw[0] == _PICKLE_PROTO
+
+
+class _DataUnpickler(pickle.Unpickler):
+    # legacy records hold plain containers only,
+    # protocol 2 bytes go through _codecs.encode
+    _allowed = {('_codecs', 'encode')}
+
+    def find_class(self, module, name):
+        if (module, name) in self._allowed:
+            return super().find_class(module, name)
+        raise SerializeError(
+            'record: legacy record refers to {}.{}'.format(module, name)
+        )
+
+
+def legacy_loads(raw):
+    """ load legacy pickle record without resolving globals
+    :param bytes raw: pickle data
+    :return: dict, list or tuple
+    """
+    return _DataUnpickler(io.BytesIO(raw)).load()
+
+
+def _slots(obj):
+    return [getattr(obj, name) for name in obj.__slots__]
+
+
+def _encode(kind, value) -> bytes:
+    out = bytearray((RECORD_VERSION, kind))
+    pack_into(out, value)
+    return bytes(out)
+
+
+def _decode(raw, kind):
+    if len(raw) < 2:
+        raise SerializeError('record: truncated')
+    if raw[0] != RECORD_VERSION:
+        raise SerializeError('record: unknown version {}'.format(raw[0]))
+    if raw[1] != kind:
+        raise SerializeError('record: expected kind {}, got {}'.format(kind, raw[1]))
+    value, offset = unpack_from(bytes(raw), 2)
+    if offset != len(raw):
+        raise SerializeError('record: {} trailing bytes'.format(len(raw) - offset))
+    return value
+
+
+def encode_header(header) -> bytes:
+    return _encode(HEADER, _slots(header))
+
+
+def decode_header(raw) -> BlockHeader:
+    return BlockHeader(*_decode(raw, HEADER))
+
+
+def encode_block(block) -> bytes:
+    return _encode(BLOCK, [
+        _slots(block.header),
+        [_slots(tx) for tx in block.list_transactions],
+        [_slots(vt) for vt in block.list_vote],
+        block.extra_data
+    ])
+
+
+def decode_block(raw) -> Block:
+    header, transactions, votes, extra = _decode(raw, BLOCK)
+    return Block(BlockHeader(*header),
+                 [Transaction(*tx) for tx in transactions],
+                 [Vote(*vt) for vt in votes],
+                 extra)
+
+
+def encode_body(block) -> bytes:
+    out = bytearray((RECORD_VERSION, BODY))
+    for section in ([_slots(tx) for tx in block.list_transactions],
+                    [_slots(vt) for vt in block.list_vote]):
+        packed = bytearray()
+        pack_into(packed, section)
+        write_varint(out, len(packed))
+        out += packed
+    pack_into(out, block.extra_data)
+    return bytes(out)
+
+
+def split_body(raw) -> (bytes, bytes, dict):
+    """ split body record without decoding its sections
+    :param bytes raw: body record
+    :return: (transaction section, vote section, extra data)
+    """
+    if len(raw) < 2 or raw[0] != RECORD_VERSION or raw[1] != BODY:
+        raise SerializeError('record: malformed body')
+    # sections stay slices of raw (memoryview for ancient blocks)
+    # until they are decoded
+    sections = []
+    offset = 2
+    for _ in range(2):
+        size, offset = read_varint(raw, offset)
+        if offset + size > len(raw):
+            raise SerializeError('record: truncated body')
+        sections.append(raw[offset:offset+size])
+        offset += size
+    tail = bytes(raw[offset:])
+    extra, offset = unpack_from(tail, 0)
+    if offset != len(tail):
+        raise SerializeError('record: {} trailing bytes'.format(len(tail) - offset))
+    return sections[0], sections[1], extra
+
+
+def decode_transactions(section) -> list:
+    values, _ = unpack_from(bytes(section), 0)
+    return [Transaction(*tx) for tx in values]
+
+
+def decode_votes(section) -> list:
+    values, _ = unpack_from(bytes(section), 0)
+    return [Vote(*vt) for vt in values]
+
+
+def encode_ancient(raw_header, raw_body) -> bytes:
+    out = bytearray()
+    write_varint(out, len(raw_header))
+    out += raw_header
+    out += raw_body
+    return bytes(out)
+
+
+def split_ancient(item) -> (bytes, bytes):
+    """ split freezer item, slices of item are returned
+    :param item: freezer item
+    :return: (header record, body record)
+    """
+    size, offset = read_varint(item, 0)
+    if offset + size > len(item):
+        raise SerializeError('record: truncated ancient block')
+    return item[offset:offset+size], item[offset+size:]
+
+
+def encode_account(account) -> bytes:
+    return _encode(ACCOUNT, _slots(account))
+
+
+def decode_account(raw) -> Account:
+    return Account(*_decode(raw, ACCOUNT))
+
+
+def encode_lookup(height, index) -> bytes:
+    return bytes((RECORD_VERSION, LOOKUP)) + _LOOKUP.pack(height, index)
+
+
+def decode_lookup(raw) -> (int, int):
+    if len(raw) != 2 + _LOOKUP.size or raw[0] != RECORD_VERSION or raw[1] != LOOKUP:
+        raise SerializeError('record: malformed lookup')
+    return _LOOKUP.unpack_from(raw, 2)
+
+
+def encode_height(height) -> bytes:
+    return bytes((RECORD_VERSION, HEIGHT)) + _HEIGHT.pack(height)
+
+
+def decode_height(raw) -> int:
+    if len(raw) != 2 + _HEIGHT.size or raw[0] != RECORD_VERSION or raw[1] != HEIGHT:
+        raise SerializeError('record: malformed height')
+    return _HEIGHT.unpack_from(raw, 2)[0]
+
+
+def encode_tx_index(height, index, transaction, receipt=None) -> bytes:
+    tx_dict = transaction.to_dict()
+    tx_values = [tx_dict[k] for k in TX_DICT]
+    receipt_values = None
+    if receipt is not None:
+        receipt_dict = receipt.to_dict()
+        receipt_values = [receipt_dict[k] for k in RECEIPT_DICT]
+    return _encode(TX_INDEX, [height, index, tx_values, receipt_values])
+
+
+def decode_tx_index(raw) -> (int, int, dict, dict):
+    """
+    :return: (height, index, tx dict, receipt dict or None)
+    """
+    height, index, tx_values, receipt_values = _decode(raw, TX_INDEX)
+    receipt = None
+    if receipt_values is not None:
+        receipt = dict(zip(RECEIPT_DICT, receipt_values))
+    return height, index, dict(zip(TX_DICT, tx_values)), receipt
+
+
+def encode_history(flags, tx_hash) -> bytes:
+    return bytes((RECORD_VERSION, HISTORY, flags)) + tx_hash
+
+
+def decode_history(raw) -> (int, bytes):
+    """
+    :return: (flags, tx hash)
+    """
+    if len(raw) < 3 or raw[0] != RECORD_VERSION or raw[1] != HISTORY:
+        raise SerializeError('record: malformed history')
+    return raw[2], bytes(raw[3:])
+
+
+def encode_delegation(address, to, value) -> bytes:
+    return _encode(DELEGATION, [address, to, value])
+
+
+def decode_delegation(raw) -> (bytes, bytes, int):
+    address, to, value = _decode(raw, DELEGATION)
+    return address, to, value
@@ -1,21 +1,27 @@
 
-from pickle import dumps, loads
-
+from gbrick.db import record
 from gbrick.db.base import BaseStateDB
+from gbrick.db.config import (
+    delegation_prefix, delegation_key, delegator_prefix,
+    delegator_key, delegation_total_key,
+    rank_key, ELECTION_LIMIT, ELECTION_EPOCH, ELECTED_LEAF
+)
+from gbrick.db.validators import ValidatorSet
 from gbrick.types.base import BaseAccount
 from gbrick.types.prepare import prepare_rep, prepare_account
 
 from utils.crypto.hash import sha3_hex
-from utils.exceptions import ValidationError, CacheError
+from utils.exceptions import ValidationError
 from utils.config import Lookup
-from gbrick.types.config import REP_DICT
 from gbrick.types.deserializer import deserialize_account
 from utils.trie.prepare import prepare_trie
+from utils.trie.rank import RankTree
+from utils.trie.util import NONE_ROOT
 from utils.logger import getLogger
 
 from utils.util import (
     int_to_bytes32, bytes_to_int,
-    extract_values, get_trie_key
+    get_trie_key
 )
 
 from gbrick.validation import (
@@ -23,6 +29,50 @@ from gbrick.validation import (
     validate_code
 )
 
+# journal entries, undone in reverse on revert
+(
+    _ACCOUNT,   # (address, (previous account, was dirty))
+    _PENDING,   # (raw key, previous value or _MISSING)
+    _FLUSH,     # (addresses written to the trie,)
+    _VALIDATORS # (None, previous validator set)
+) = tuple(range(4))
+
+_MISSING = object()
+
+
+def _node_id(account):
+    # str once the account went through the trie
+    node_id = account.node_id
+    return node_id.encode() if isinstance(node_id, str) else node_id
+
+
+class StateCommit:
+    """ writes of one state commit, copied out on the loop.
+    the i/o pool only sees this, never the live caches.
+    """
+    __slots__ = ('base_root', 'root', 'items', 'pending', 'accounts', 'validators')
+
+    def __init__(self, base_root, root, items, pending, accounts, validators):
+        self.base_root = base_root
+        self.root = root
+        self.items = items
+        self.pending = pending
+        self.accounts = accounts
+        self.validators = validators
+
+
+class PrefetchResult:
+    """ what one prefetch worker read, merged on the loop
+    """
+    __slots__ = ('root', 'accounts', 'nodes', 'codes', 'loads')
+
+    def __init__(self, root):
+        self.root = root
+        self.accounts = []
+        self.nodes = {}
+        self.codes = []
+        self.loads = 0
+
 
 class StateDB(BaseStateDB):
 
@@ -38,42 +88,184 @@ class StateDB(BaseStateDB):
 
     @property
     def cache_trie_root(self):
+        # root over the dirty accounts too
+        self.flush_accounts()
         return self._trie.root
 
     def set_root(self, state_root):
-        self._trie = prepare_trie(state_root, self._db)
+        self._trie = prepare_trie(state_root, self._db, self._nodes)
         self._root = self._trie.root
+        if self._root != self._warm_root:
+            # not the last committed root: reorg, sync reset or a fresh start
+            self._warm.clear()
+            self._warm_root = None
+        self._validators = self._validator_sets.get(self._root)
+        self._cache.clear()
+        self._dirty.clear()
+        self._journal.clear()
+        self._snapshots.clear()
+
+    def snapshot(self):
+        """ checkpoint, undo with revert or keep with discard
+        :return: snapshot id
+        """
+        self._snapshots.append((len(self._journal), self._trie.root))
+        return len(self._snapshots) - 1
+
+    def revert(self, snapshot_id):
+        """ undo every change since snapshot, O(changes)
+        :param int snapshot_id: id from snapshot, later snapshots are dropped
+        """
+        mark, root = self._snapshots[snapshot_id]
+        del self._snapshots[snapshot_id:]
+        journal = self._journal
+        while len(journal) > mark:
+            kind, key, previous = journal.pop()
+            if kind == _ACCOUNT:
+                previous, dirty = previous
+                self._cache[key] = previous
+                if dirty:
+                    self._dirty.add(key)
+                else:
+                    self._dirty.discard(key)
+            elif kind == _PENDING:
+                if previous is _MISSING:
+                    self._pending.pop(key, None)
+                else:
+                    self._pending[key] = previous
+            elif kind == _FLUSH:
+                self._dirty.update(key)
+            elif kind == _VALIDATORS:
+                self._validators = previous
+        # trie nodes are immutable, the old root is the old trie
+        self._trie.root = root
+
+    def discard(self, snapshot_id):
+        """ keep changes since snapshot
+        :param int snapshot_id: id from snapshot, later snapshots are dropped
+        """
+        del self._snapshots[snapshot_id:]
+        if not self._snapshots:
+            self._journal.clear()
 
     def serialize(self, obj):
-        return dumps(obj.to_dict())
+        return record.encode_account(obj)
 
     def deserialize(self, raw_obj):
-        return self._deserialize(loads(raw_obj))
+        if record.is_legacy(raw_obj):
+            return self._deserialize(record.legacy_loads(raw_obj))
+        return record.decode_account(raw_obj)
 
     def _deserialize(self, dict_obj) -> BaseAccount:
         return deserialize_account(dict_obj)
 
-    def _get_account(self, address) -> BaseAccount:
-        if address in self._cache:
-            return self._cache[address]
+    def _raw_get(self, key):
+        if key in self._pending:
+            return self._pending[key]
+        return self._db.get(key)
+
+    def _raw_put(self, key, value):
+        if self._snapshots:
+            self._journal.append((_PENDING, key, self._pending.get(key, _MISSING)))
+        self._pending[key] = value
+
+    def _raw_exists(self, key):
+        return key in self._pending or key in self._db
+
+    def _raw_scan(self, prefix):
+        """ raw (key, value) under prefix, pending writes included, in key order
+        """
+        items = dict(self._db.iter(prefix, prefix + b'\xff'))
+        items.update((key, value) for key, value in self._pending.items() if key.startswith(prefix))
+        return sorted(items.items())
+
+    def _load_account(self, address, trie):
+        """
+        :return: (account, True if it was read from the trie)
+        """
+        account = self._warm.get(address)
+        if account is not None:
+            return account, False
         try:
-            trie_key = get_trie_key(address)
-            account = self._deserialize(self._trie.get(trie_key))
+            account = self._deserialize(trie.get(get_trie_key(address)))
         except KeyError:
             account = prepare_account(address_account=address)
+        return account, True
+
+    def _get_account(self, address) -> BaseAccount:
+        # one lookup, the loop may clear the cache while a pool reader is here
+        account = self._cache.get(address)
+        if account is not None:
+            return account
+        account, loaded = self._load_account(address, self._trie)
+        self.account_loads += loaded
         self._cache[address] = account
         return account
 
+    def prefetch(self, addresses):
+        """ read accounts, their contract code and the trie nodes on each path.
+        nothing on the state db is written, several pool threads may run it
+        at once. the caller adds the result with merge_prefetch.
+        :param addresses: account addresses
+        :return: PrefetchResult
+        """
+        trie = self._trie.reader()
+        result = PrefetchResult(self._trie.root)
+        for address in addresses:
+            if address in self._cache:
+                continue
+            account, loaded = self._load_account(address, trie)
+            result.accounts.append((address, account))
+            result.loads += loaded
+            if account.code and account.code not in self._code_cache:
+                try:
+                    result.codes.append((account.code, self._raw_get(account.code)))
+                except KeyError:
+                    pass
+        result.nodes = trie.loaded
+        return result
+
+    def merge_prefetch(self, result):
+        """ add a prefetch result to the caches, on the thread that executes
+        :param PrefetchResult result: from prefetch
+        :return: number of accounts read from the trie
+        """
+        if result.root != self._trie.root:
+            # set_root ran meanwhile, the accounts belong to another state
+            return 0
+        self._trie.merge(result.nodes)
+        for address, account in result.accounts:
+            self._cache.setdefault(address, account)
+        for code_hash, code in result.codes:
+            self._code_cache.put(code_hash, code)
+        self.account_loads += result.loads
+        return result.loads
+
     def _set_account(self, address, account):
+        # write-back, the trie sees the account on flush_accounts
+        if self._snapshots:
+            previous = self._get_account(address), address in self._dirty
+            self._journal.append((_ACCOUNT, address, previous))
         self._cache[address] = account
-        trie_key = get_trie_key(address)
-        self._trie.put(trie_key, account.to_dict())
+        self._dirty.add(address)
+
+    def flush_accounts(self):
+        """ put dirty accounts into the trie once, in trie key order
+        """
+        if not self._dirty:
+            return
+        cache = self._cache
+        for trie_key, address in sorted((get_trie_key(address), address) for address in self._dirty):
+            self._trie.put(trie_key, cache[address].to_dict())
+        if self._snapshots:
+            self._journal.append((_FLUSH, tuple(self._dirty), None))
+        self._dirty.clear()
 
     def get_minimum(self):
-        return bytes_to_int(self._db.get(Lookup.minimum()))
+        return bytes_to_int(self._raw_get(Lookup.minimum()))
 
     def set_minimum(self, value):
-        self._db.put(Lookup.minimum(), int_to_bytes32(value))
+        self._raw_put(Lookup.minimum(), int_to_bytes32(value))
 
     def get_nonce(self, address):
         validate_address(address)
@@ -93,6 +285,10 @@ class StateDB(BaseStateDB):
         validate_address(address)
         account = self._get_account(address)
         new_balance = account.delegated_stake_balance + stake
+        if account.node_id:
+            node_id = _node_id(account)
+            self._set_const_validator(address, node_id, new_balance,
+                                      (account.delegated_stake_balance, node_id))
         self._set_account(address, account.copy(delegated_stake_balance=new_balance))
 
     def set_balance(self, address, balance):
@@ -124,13 +320,14 @@ class StateDB(BaseStateDB):
         except ValidationError:
             return None
         account = self._get_account(address)
-        if account.code in self._code_cache:
-            return self._code_cache[account.code]
+        code = self._code_cache.get(account.code)
+        if code is not None:
+            return code
         try:
-            code = self._db.get(account.code)
+            code = self._raw_get(account.code)
         except KeyError:
             return b''
-        self._code_cache[account.code] = code
+        self._code_cache.put(account.code, code)
         return code
 
     def set_code(self, address, code):
@@ -138,151 +335,295 @@ class StateDB(BaseStateDB):
         code = validate_code(code)
         account = self._get_account(address)
         hashcode = sha3_hex(code)
-        self._code_cache[hashcode] = code
-        self._db.put(hashcode, code)
+        # content addressed, a reverted deploy leaves a harmless entry
+        self._code_cache.put(hashcode, code)
+        self._code_cache.pin(hashcode)
+        self._raw_put(hashcode, code)
         self._set_account(address, account.copy(code=hashcode))
 
-    def _set_delegated(self, hash_key, value):
-        if hash_key not in self._db:
-            self._db.put(hash_key, dumps(value))
-        else:
-            address, to, new_value = value
-            _address, _to, old_value = self._get_delegated(hash_key)
-            if address != _address:
-                raise ValueError
-            change_value = old_value + new_value
-            self._db.put(hash_key, dumps((address, to, change_value)))
+    def _delegation_value(self, address, to):
+        try:
+            _, _, value = record.decode_delegation(self._raw_get(delegation_key(address, to)))
+        except KeyError:
+            return 0
+        return value
+
+    def _legacy_delegation_value(self, account, to):
+        legacy_key = sha3_hex(b''.join((account.address_account, to)))
+        if legacy_key not in account.delegated:
+            return legacy_key, 0
+        _, _, value = self._get_delegated(legacy_key)
+        return legacy_key, value
 
     def set_delegated(self, address, to, value):
-        hash_key = sha3_hex(b''.join((address, to)))
+        """ delegate value from address to the validator account to,
+        the record is indexed by (address, to), accounts are not touched
+        beyond balances.
+        :param bytes address: delegator account
+        :param bytes to: validator account
+        :param int value: delegated value
+        """
         account = self._get_account(address)
-        account_to = self._get_account(address)
-
-        delegated = account.delegated
-        delegated_stake = account_to.delegated
-        if hash_key not in account.delegated:
-            delegated.append(hash_key)
-        if hash_key not in account_to.delegated:
-            delegated.append(hash_key)
-
-        self._set_account(address, account.copy(delegated=delegated))
-        self._set_account(to, account_to.copy(delegated=delegated_stake))
+        current = self._delegation_value(address, to)
+        total = self.get_delegated_total(address)
+        if account.delegated:
+            legacy_key, legacy_value = self._legacy_delegation_value(account, to)
+            if legacy_value:
+                # the legacy record folds into the indexed one
+                current += legacy_value
+                delegated = [key for key in account.delegated if key != legacy_key]
+                self._set_account(address, account.copy(delegated=delegated))
+
+        self._raw_put(delegation_key(address, to), record.encode_delegation(address, to, current + value))
+        self._raw_put(delegator_key(to, address), b'')
+        self._raw_put(delegation_total_key(address), int_to_bytes32(total + value))
         self.compute_balance(address, -1 * value)
         self.compute_stake_balance(to, value)
-        self._set_delegated(hash_key, (address, to, value))
 
     def _get_delegated(self, hash_key):
-        return loads(self._db.get(hash_key))
+        raw_value = self._raw_get(hash_key)
+        if record.is_legacy(raw_value):
+            address, to, value = record.legacy_loads(raw_value)
+            # rewritten with the next state commit
+            self._raw_put(hash_key, record.encode_delegation(address, to, value))
+            return address, to, value
+        return record.decode_delegation(raw_value)
 
     def get_delegated(self, address):
-        account = self._get_account(address)
-        delegate = account.delegated
+        """ delegations made by and to address
+        :return: list of (address, to, value)
+        """
         delegated_info = []
-        for key in delegate:
+        for _, raw_value in self._raw_scan(delegation_prefix(address)):
+            delegated_info.append(record.decode_delegation(raw_value))
+        prefix = delegator_prefix(address)
+        for key, _ in self._raw_scan(prefix):
+            delegator = key[len(prefix):]
+            if delegator != address:
+                delegated_info.append(record.decode_delegation(
+                    self._raw_get(delegation_key(delegator, address))))
+        for key in self._get_account(address).delegated:
             delegated_info.append(self._get_delegated(key))
         return delegated_info
 
+    def get_delegated_total(self, address):
+        """ total delegated out of address
+        """
+        try:
+            return bytes_to_int(self._raw_get(delegation_total_key(address)))
+        except KeyError:
+            pass
+        # accounts delegating before the index only have legacy records
+        total = 0
+        for key in self._get_account(address).delegated:
+            sender, _, value = self._get_delegated(key)
+            if sender == address:
+                total += value
+        return total
+
     def get_account_delegate(self, address):
-        info = self.get_delegated(address)
-        account_delegate = 0
-        for sender, to, value in info:
-            if sender == to:
-                account_delegate += value
-        return account_delegate
+        """ self delegated value, the registration qualification
+        """
+        account = self._get_account(address)
+        value = self._delegation_value(address, address)
+        if account.delegated:
+            value += self._legacy_delegation_value(account, address)[1]
+        return value
 
     def register_validator(self, address, rep_id, signature):
         account = self._get_account(address)
         if self.get_account_delegate(address) < self.get_minimum():
             # raise ValidationError("{} is not qualify".format(address))
             return
+        previous = None
+        if account.node_id:
+            previous = account.delegated_stake_balance, _node_id(account)
+        self._set_const_validator(address, rep_id, account.delegated_stake_balance, previous)
         self._set_account(address, account.copy(node_id=rep_id,
                                                 node_signature=signature))
-        self._set_const_validator(address, rep_id)
 
-    def _set_const_validator(self, address, rep_id):
-        # update coming soon TODO
-        trie_key = get_trie_key(Lookup.constant_rep())
-        rep = prepare_rep(node_id=rep_id,
-                          account=address,
-                          delegate=self.get_delegated_balance(address))
+    def _rank_tree(self) -> RankTree:
+        """ election index of the working state, a legacy list leaf is
+        rebuilt into the index with the current stakes.
+        """
+        if self._ranks is None:
+            self._ranks = RankTree(NONE_ROOT, self._db)
         try:
-            qualify = self.get_const_validator_list()
-            qualify.append(rep.to_dict())
-            self._trie.put(trie_key, qualify)
+            leaf = self._trie.get(get_trie_key(Lookup.constant_rep()))
         except KeyError:
-            self._trie.put(trie_key, [rep.to_dict()])
-
-    def _get_const_validator(self):
-        # update coming soon TODO
-        trie_key = get_trie_key(Lookup.constant_rep())
-        validators = self._trie.get(trie_key)
-        list_validators = []
-        for rep in validators:
-            ex = extract_values(rep, REP_DICT)
-            rep_obj = prepare_rep(node_id=ex.node_id.encode(),
-                                  account=ex.account.encode(),
-                                  delegate=ex.delegated)
-            list_validators.append(rep_obj)
-        return list_validators
-
-    def _get_const_validator_list(self):
-        trie_key = get_trie_key(Lookup.constant_rep())
-        reps = self._trie.get(trie_key)
-        return reps
+            leaf = NONE_ROOT
+        if isinstance(leaf, list):
+            self._ranks.root = NONE_ROOT
+            for rep in leaf:
+                address = rep['account'].encode()
+                rep = prepare_rep(node_id=rep['node_id'].encode(),
+                                  account=address,
+                                  delegate=self.get_delegated_balance(address))
+                self._ranks.put(rank_key(rep.delegated_balance, rep.node_id), rep.to_dict())
+        else:
+            self._ranks.root = leaf
+        return self._ranks
+
+    def _set_const_validator(self, address, rep_id, stake, previous=None):
+        """ put address into the election index, O(log n)
+        :param bytes address: validator account
+        :param bytes rep_id: node id
+        :param int stake: delegated stake balance
+        :param tuple previous: (stake, node id) address is indexed under
+        """
+        ranks = self._rank_tree()
+        if previous is not None:
+            try:
+                ranks.remove(rank_key(*previous))
+            except KeyError:
+                pass
+        rep = prepare_rep(node_id=rep_id, account=address, delegate=stake)
+        ranks.put(rank_key(stake, rep_id), rep.to_dict())
+        self._trie.put(get_trie_key(Lookup.constant_rep()), ranks.root)
+        if not self._has_elected():
+            # no election yet, the validator set is the live ranking
+            self._reset_validators(None)
+
+    def _reset_validators(self, validators):
+        if self._snapshots:
+            self._journal.append((_VALIDATORS, None, self._validators))
+        self._validators = validators
+
+    def _has_elected(self):
+        try:
+            self._trie.get(get_trie_key(ELECTED_LEAF))
+        except KeyError:
+            return False
+        return True
+
+    def election_due(self, height):
+        """
+        :param int height: block being executed
+        :return: True if the block ends an epoch, or the state was never elected
+        """
+        return height % ELECTION_EPOCH == 0 or not self._has_elected()
+
+    def elect(self, limit=ELECTION_LIMIT):
+        """ freeze the top limit candidates as the validator set of the next epoch
+        :return: ValidatorSet
+        """
+        elected = self._compute_promote_rank(limit)
+        self._trie.put(get_trie_key(ELECTED_LEAF), elected)
+        self._reset_validators(ValidatorSet(elected))
+        return self._validators
+
+    def validator_set(self) -> ValidatorSet:
+        """ validator set of the working state, the last election.
+        states elected before ELECTED_LEAF existed use the live ranking
+        until the next election.
+        :return: ValidatorSet
+        """
+        if self._validators is None:
+            try:
+                elected = self._trie.get(get_trie_key(ELECTED_LEAF))
+            except KeyError:
+                elected = self._compute_promote_rank()
+            self._validators = ValidatorSet(elected)
+        return self._validators
 
     def get_const_validator(self):
-        return self._get_const_validator()
+        return list(self.validator_set().reps)
 
     def get_const_validator_list(self):
-        return self._get_const_validator_list()
+        return self.validator_set().raw()
 
     def get_validator_id(self):
-        validators = self.get_const_validator()
-        validator_di_set = [rep.node_id for rep in validators]
-        return validator_di_set
+        return self.validator_set().ids
 
     def get_validator(self, validator_id):
-        list_validators = self.get_const_validator()
-        validator = None
-        for rep in list_validators:
-            if validator_id == rep.node_id:
-                validator = rep.copy()
-                break
-        return validator
+        return self.validator_set().get(validator_id)
 
     def get_validator_count(self):
-        reps = self._get_const_validator_list()
-        reps_count = len(reps)
-        allow = int((reps_count - 1) / 3)
-        return reps_count, allow
-
-    def _compute_promote_rank(self):
-        # rep node: delegated stake balance was ranked compute
-        # coming soon, update is not yet
-        pass
-
-    def commit(self):
-        # state cache. committed db before compare cache??
-        for address, account in self._cache.copy().items():
-            trie_key = get_trie_key(address)
-            try:
-                acc = self._trie.get(trie_key)
-            except KeyError:
-                pass
-            else:
-                if account.to_dict() != acc:
-                    self.logger.debug("statedb cache: {},  "
-                                      "trie cache: {}".format(account.to_dict(), acc))
-                    raise CacheError("latest account state error, "
-                                     "{}".format(address.decode()))
+        return self.validator_set().count
 
-        self._root = self._trie.commit()
+    def _compute_promote_rank(self, limit=ELECTION_LIMIT):
+        """ top limit candidates by delegated stake, O(limit + log n)
+        :return: list of rep dicts, highest stake first
+        """
+        trie_key = get_trie_key(Lookup.constant_rep())
+        try:
+            leaf = self._trie.get(trie_key)
+        except KeyError:
+            # nobody registered
+            return []
+        if isinstance(leaf, list):
+            # legacy leaf, every registered rep in registration order
+            return leaf
+        return [rep for _, rep in self._rank_tree().top(limit)]
+
+    def commit(self, sync=False):
+        prepared = self.prepare_commit()
+        self.write_commit(prepared, sync)
+        self.finish_commit(prepared)
+
+    def prepare_commit(self):
+        """ flush and copy out everything the commit writes.
+        runs on the thread that owns the state (the event loop),
+        readers may keep using the state until finish_commit.
+        :return: StateCommit
+        """
+        # the trie is only written through flush_accounts,
+        # cache and trie can't diverge.
+        self.flush_accounts()
+        # dict copies are taken under the gil, pool readers insert into these
+        items = dict(self._trie.cache)
+        if self._ranks is not None:
+            items.update(self._ranks.cache)
+        pending = dict(self._pending)
+        items.update(pending)
+        return StateCommit(self._root, self._trie.root, items, pending,
+                           dict(self._cache), self._validators)
+
+    def write_commit(self, prepared, sync=False):
+        """ trie nodes and raw writes in one batch, touches the backend only,
+        safe on the i/o pool
+        :param StateCommit prepared: prepare_commit result
+        """
+        with self._db.write_batch(sync=sync) as batch:
+            for key, value in prepared.items.items():
+                batch.put(key, value)
+
+    def finish_commit(self, prepared):
+        """ committed root and caches, on the thread that called prepare_commit
+        :param StateCommit prepared: written prepare_commit result
+        """
+        if prepared.base_root != self._warm_root:
+            self._warm.clear()
+        self._root = prepared.root
+        for key, value in prepared.pending.items():
+            # raw writes staged after prepare_commit stay pending
+            if self._pending.get(key, _MISSING) is value:
+                del self._pending[key]
+        if prepared.validators is not None:
+            # the set only changes through elect, or the ranking before the first one
+            self._validator_sets.put(self._root, prepared.validators)
+        # every cached account was clean, untouched warm accounts did not change
+        for address, account in prepared.accounts.items():
+            self._warm.put(address, account)
+        self._warm_root = self._root
+
+    def cache_stats(self):
+        return {
+            'accounts': self._warm.stats(),
+            'nodes': self._nodes.stats(),
+            'code': self._code_cache.stats(),
+            'validator_sets': self._validator_sets.stats()
+        }
 
     def clear(self):
         self._cache.clear()
-        self._code_cache.clear()
+        self._dirty.clear()
+        self._journal.clear()
+        self._snapshots.clear()
+        self._validators = None
+        if self._ranks is not None:
+            self._ranks.clear()
+        self._pending.clear()
         self._trie.clear()
 
 
-# TODO: finalize cache 처리.
-
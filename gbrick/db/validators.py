@@ -0,0 +1,66 @@
+from gbrick.types.prepare import prepare_rep
+
+
+class ValidatorSet:
+    """ decoded validator set, immutable.
+    built once from the elected reps and shared across state roots
+    until the election index changes.
+    """
+    __slots__ = ('_raw', '_reps', '_by_id', '_ids', '_ranked', '_count')
+
+    def __init__(self, raw_reps):
+        """
+        :param list raw_reps: elected rep dicts, in election order
+        """
+        reps = tuple(prepare_rep(node_id=rep['node_id'].encode(),
+                                 account=rep['account'].encode(),
+                                 delegate=rep['delegated'])
+                     for rep in raw_reps)
+        self._raw = tuple(raw_reps)
+        self._reps = reps
+        self._by_id = {rep.node_id: rep for rep in reps}
+        self._ids = frozenset(self._by_id)
+        # highest delegated stake first, node id breaks ties
+        self._ranked = tuple(sorted(reps, key=lambda rep: (-rep.delegated_balance, rep.node_id)))
+        self._count = len(reps)
+
+    @property
+    def reps(self):
+        """ reps in election order
+        """
+        return self._reps
+
+    @property
+    def ranked(self):
+        """ reps by delegated stake, highest first
+        """
+        return self._ranked
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def count(self):
+        """
+        :return: (validator count, allowed faults)
+        """
+        return self._count, int((self._count - 1) / 3)
+
+    def raw(self):
+        """ elected rep dicts, a new list on every call
+        """
+        return list(self._raw)
+
+    def get(self, validator_id):
+        """
+        :return: copy of the rep, None if validator_id is not in the set
+        """
+        rep = self._by_id.get(validator_id)
+        return None if rep is None else rep.copy()
+
+    def __contains__(self, validator_id):
+        return validator_id in self._ids
+
+    def __len__(self):
+        return self._count
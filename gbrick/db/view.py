@@ -0,0 +1,54 @@
+
+from gbrick.db import record
+from gbrick.types import Block
+from gbrick.types.serializer import memoized_property
+
+
+class BlockView(Block):
+    """ block read from chain db,
+    transactions and votes are decoded on first access
+    """
+
+    def __init__(self, header, raw_body):
+        """
+        :param BlockHeader header: decoded header
+        :param bytes raw_body: body record
+        """
+        tx_section, vote_section, extra_data = record.split_body(raw_body)
+        object.__setattr__(self, 'header', header)
+        object.__setattr__(self, 'extra_data', extra_data)
+        self.__dict__['_tx_section'] = tx_section
+        self.__dict__['_vote_section'] = vote_section
+
+    @memoized_property
+    def list_transactions(self):
+        return record.decode_transactions(self.__dict__.pop('_tx_section'))
+
+    @memoized_property
+    def list_vote(self):
+        return record.decode_votes(self.__dict__.pop('_vote_section'))
+
+    @property
+    def raw_transactions(self):
+        """ transaction section, None once decoded
+        """
+        return self.__dict__.get('_tx_section')
+
+    @property
+    def is_loaded(self):
+        return '_tx_section' not in self.__dict__ and '_vote_section' not in self.__dict__
+
+    def materialize(self) -> Block:
+        return Block(self.header,
+                     self.list_transactions,
+                     self.list_vote,
+                     self.extra_data)
+
+    def copy(self, **kwargs):
+        return self.materialize().copy(**kwargs)
+
+    def deepcopy(self, **kwargs):
+        return self.materialize().deepcopy(**kwargs)
+
+    def __reduce__(self):
+        return self.materialize().__reduce__()
@@ -214,14 +214,11 @@ def make_candidate(block: BaseBlock,
         chain.logger.info("build new height ({})".format(chain.height + 1))
 
         trie = make_hash_root(validate_transactions)
-        block.header.hash_transaction_root = trie.root
+        header = block.header.propose(trie.root, time.time())
 
-        block.header.timestamp = time.time()
-        block.header.hash_candidate_block = block.pre_hash
+        signature = chain.make_signature(header.pre_hash)
 
-        signature = chain.make_signature(block.pre_hash)
-
-        return block.copy(header=block.header.copy(byte_signature=signature),
+        return block.copy(header=header.sign(signature),
                           list_transactions=validate_transactions)
 
 
@@ -253,10 +250,10 @@ def make_vote(select_block,
                             num_block_height=select_block.height,
                             hash_candidate_block=select_block.pre_hash,
                             address_creator=chain.nodebase)
-        vote.hash_vote = vote.hash
-        signature = chain.make_signature(vote.hash_vote)
+        signature = chain.make_signature(vote.hash)
 
-        return vote.copy(byte_signature=signature)
+        return vote.copy(hash_vote=vote.hash,
+                         byte_signature=signature)
 
 
 def make_confirm_from_vote(height,
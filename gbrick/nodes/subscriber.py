@@ -65,6 +65,7 @@ class Subscriber(BaseNode):
 
     async def _run(self):
         self.syncer_run()
+        self.chain.io_monitor_run()
         self.event.prepare(self.chain)
         await self._worker()
 
@@ -122,6 +122,7 @@ class Validator(BaseNode):
 
     async def _run(self):
         self.syncer_run()
+        self.chain.io_monitor_run()
         self.event.prepare(self.chain)
         await self.progress()
 
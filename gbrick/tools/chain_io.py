@@ -0,0 +1,209 @@
+""" chain export / import (node stopped)
+
+python -m gbrick.tools.chain_io export -d <node_dir> -f chain.gz [-s start] [-e end] [--receipts]
+python -m gbrick.tools.chain_io import -d <node_dir> -f chain.gz [--checkpoint height:hash]
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import time
+
+from gbrick.db import record
+from gbrick.db.prepare import prepare_database
+from gbrick.db.view import BlockView
+from gbrick.chains.chain import Chain
+from utils.exceptions import SerializeError, ValidationError
+from utils.logger import getLogger
+from utils.pack import pack_into, unpack, write_varint
+from utils.util import get_path
+
+# export file, gzip stream
+# :: MAGIC, flags (0x01 receipts)
+# :: per block [varint len][packed (header record, body record, receipt dicts or None)]
+
+MAGIC = b'gBexport\x01'
+FLAG_RECEIPTS = 0x01
+
+IMPORT_BATCH = 256
+REPORT_EVERY = 1000
+
+
+def _write_frame(out, values):
+    payload = bytearray()
+    pack_into(payload, values)
+    size = bytearray()
+    write_varint(size, len(payload))
+    out.write(size)
+    out.write(payload)
+
+
+def _read_frame(src):
+    size = shift = 0
+    while True:
+        byte = src.read(1)
+        if not byte:
+            if shift:
+                raise SerializeError('export: truncated frame')
+            return None
+        size |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            break
+        shift += 7
+    payload = src.read(size)
+    if len(payload) != size:
+        raise SerializeError('export: truncated frame')
+    return unpack(payload)
+
+
+def _receipts(chain_db, block):
+    receipts = []
+    for tx in block.list_transactions:
+        try:
+            receipts.append(chain_db.get_receipt(tx.hash))
+        except KeyError:
+            receipts.append(None)
+    return receipts
+
+
+def export_chain(chain_db, path, start=0, end=None, receipts=False, logger=None):
+    """ stream blocks [start, end) to a gzip file
+    :return: (blocks, transactions)
+    """
+    blocks = transactions = 0
+    started = time.time()
+    with gzip.open(path, 'wb') as out:
+        out.write(MAGIC + bytes((FLAG_RECEIPTS if receipts else 0,)))
+        for block in chain_db.iter_blocks(start, end):
+            _write_frame(out, [
+                record.encode_header(block.header),
+                record.encode_body(block),
+                _receipts(chain_db, block) if receipts else None
+            ])
+            blocks += 1
+            transactions += len(block.list_transactions)
+            if logger is not None and blocks % REPORT_EVERY == 0:
+                _report(logger, 'export', blocks, transactions, started)
+    return blocks, transactions
+
+
+def read_export(path):
+    """
+    :return: generator of (block, receipt dicts or None)
+    """
+    with gzip.open(path, 'rb') as src:
+        head = src.read(len(MAGIC) + 1)
+        if head[:len(MAGIC)] != MAGIC:
+            raise SerializeError('export: not a chain export file')
+        while True:
+            values = _read_frame(src)
+            if values is None:
+                return
+            raw_header, raw_body, receipts = values
+            yield BlockView(record.decode_header(raw_header), raw_body), receipts
+
+
+def _report(logger, name, blocks, transactions, started):
+    elapsed = max(time.time() - started, 1e-9)
+    logger.info("{}: {} blocks, {:.1f} blocks/s, {:.1f} tx/s".format(
+        name, blocks, blocks / elapsed, transactions / elapsed))
+
+
+async def import_chain(chain, db_context, path, checkpoint=None,
+                       batch=IMPORT_BATCH, logger=None):
+    """ apply exported blocks through Wagon.
+    db_context should be buffered, writes are flushed every batch blocks.
+    :param Chain chain: chain on db_context
+    :param db_context: db context
+    :param str path: export file
+    :param tuple checkpoint: (height, block hash), blocks up to it skip
+                             signature and vote verification
+    :param int batch: blocks per flush
+    :return: (blocks, transactions, elapsed seconds)
+    """
+    blocks = transactions = 0
+    started = time.time()
+    try:
+        for block, _ in read_export(path):
+            if block.height <= chain.height:
+                # genesis, or already imported
+                continue
+            trusted = checkpoint is not None and block.height <= checkpoint[0]
+            if trusted and block.height == checkpoint[0] and block.hash != checkpoint[1]:
+                raise ValidationError(
+                    "checkpoint {} hash: {}, "
+                    "imported hash: {}".format(checkpoint[0], checkpoint[1], block.hash)
+                )
+            # receipts are rebuilt by execution, the block hash covers their root
+            await chain.finalize(block, trusted)
+
+            blocks += 1
+            transactions += len(block.list_transactions)
+            if blocks % batch == 0:
+                db_context.flush()
+            if logger is not None and blocks % REPORT_EVERY == 0:
+                _report(logger, 'import', blocks, transactions, started)
+    finally:
+        db_context.flush(sync=True)
+    return blocks, transactions, time.time() - started
+
+
+def prepare_import_chain(db_context, loop) -> Chain:
+    chain = Chain(db_context=db_context,
+                  signer=None,
+                  node_base=b'',
+                  start_at=datetime.datetime.now(),
+                  loop=loop)
+    if not chain.block_from_genesis():
+        header = chain.get_header_from_height(chain.height)
+        db_context.state.set_root(header.hash_state_root)
+    return chain
+
+
+def _checkpoint(value):
+    height, block_hash = value.split(':', 1)
+    return int(height), block_hash.encode()
+
+
+def argument_parser():
+    parse = argparse.ArgumentParser(description='gbrick chain export / import.')
+    parse.add_argument('command', choices=('export', 'import'))
+    parse.add_argument('-d', '--node_dir', type=str, help="node directory, "
+                                                          "default path to if not input. ")
+    parse.add_argument('-f', '--file', type=str, required=True, help="export file (gzip)")
+    parse.add_argument('-s', '--start', type=int, default=0, help="export: first height")
+    parse.add_argument('-e', '--end', type=int, default=None, help="export: stop height (exclusive)")
+    parse.add_argument('--receipts', action='store_true', help="export: include receipts")
+    parse.add_argument('--checkpoint', type=_checkpoint, default=None,
+                       help="import: trusted checkpoint, height:block-hash")
+    parse.add_argument('--batch', type=int, default=IMPORT_BATCH, help="import: blocks per flush")
+    return parse
+
+
+def main():
+    logger = getLogger('chain-io')
+    arguments = argument_parser().parse_args()
+    path = get_path(arguments.node_dir)
+
+    if arguments.command == 'export':
+        db_context = prepare_database(path)
+        started = time.time()
+        blocks, transactions = export_chain(db_context.chain, arguments.file,
+                                            arguments.start, arguments.end,
+                                            arguments.receipts, logger)
+        _report(logger, 'export done', blocks, transactions, started)
+        return
+
+    loop = asyncio.get_event_loop()
+    db_context = prepare_database(path, buffered=True)
+    chain = prepare_import_chain(db_context, loop)
+    started = time.time()
+    blocks, transactions, _ = loop.run_until_complete(
+        import_chain(chain, db_context, arguments.file,
+                     arguments.checkpoint, arguments.batch, logger)
+    )
+    _report(logger, 'import done', blocks, transactions, started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+""" rewrite legacy pickle chain records in the record format (node stopped)
+
+python -m gbrick.tools.migrate_records -d <node_dir> [-s start] [-e end]
+"""
+import argparse
+import time
+
+from gbrick.db import record
+from gbrick.db.chain import HEADER_CONTEXT
+from gbrick.db.config import body_key, height_key
+from gbrick.db.prepare import prepare_database
+from gbrick.db.view import BlockView
+from utils.config import Lookup
+from utils.logger import getLogger
+from utils.util import get_path, int_to_bytes32
+
+CHUNK_SIZE = 256
+
+
+def _migrate_lookups(db, keys, batch):
+    moved = 0
+    for key in keys:
+        try:
+            raw_lookup = db.get(key)
+        except KeyError:
+            continue
+        if record.is_legacy(raw_lookup):
+            height, seek_index = record.legacy_loads(raw_lookup)
+            batch.put(key, record.encode_lookup(height, seek_index))
+            moved += 1
+    return moved
+
+
+def _migrate_block(chain_db, height, batch):
+    """ header, body and tx/vote lookups of one block
+    :return: records rewritten
+    """
+    db = chain_db.db
+    moved = 0
+    header_key = int_to_bytes32(height)
+    raw_header = db.get(header_key)
+    header = chain_db.deserialize(raw_header, HEADER_CONTEXT)
+    if record.is_legacy(raw_header):
+        batch.put(header_key, chain_db.serialize(header))
+        moved += 1
+
+    try:
+        block = BlockView(header, db.get(body_key(header.hash)))
+    except KeyError:
+        # full block under its hash, written before header/body split
+        block = chain_db.deserialize(db.get(header.hash_block))
+        batch.put(body_key(header.hash), record.encode_body(block))
+        batch.put(height_key(header.hash), record.encode_height(height))
+        batch.delete(header.hash_block)
+        moved += 1
+
+    moved += _migrate_lookups(db, (Lookup.transaction(tx.hash) for tx in block.list_transactions), batch)
+    moved += _migrate_lookups(db, (Lookup.vote(vote.hash) for vote in block.list_vote), batch)
+    return moved
+
+
+def migrate_records(chain_db, start=0, end=None, logger=None):
+    """ rewrite legacy records of blocks [start, end), one batch per chunk.
+    frozen blocks are skipped, the freezer only holds the record format.
+    :return: (blocks, records rewritten)
+    """
+    if end is None:
+        end = chain_db.get_current_height() + 1
+    start = max(start, chain_db.frozen)
+    blocks = moved = 0
+    started = time.time()
+    for chunk in range(start, end, CHUNK_SIZE):
+        with chain_db.db.write_batch() as batch:
+            for height in range(chunk, min(chunk + CHUNK_SIZE, end)):
+                moved += _migrate_block(chain_db, height, batch)
+                blocks += 1
+        if logger is not None and blocks % (CHUNK_SIZE * 40) == 0:
+            logger.info("migrate: {} blocks, {} records, {:.1f} blocks/s".format(
+                blocks, moved, blocks / max(time.time() - started, 1e-9)))
+    return blocks, moved
+
+
+def argument_parser():
+    parse = argparse.ArgumentParser(description='rewrite legacy chain records.')
+    parse.add_argument('-d', '--node_dir', type=str, help="node directory, "
+                                                          "default path to if not input. ")
+    parse.add_argument('-s', '--start', type=int, default=0, help="first height")
+    parse.add_argument('-e', '--end', type=int, default=None, help="stop height (exclusive), "
+                                                                   "chain height + 1 if not input. ")
+    return parse
+
+
+def main():
+    logger = getLogger('migrate')
+    arguments = argument_parser().parse_args()
+    db_context = prepare_database(get_path(arguments.node_dir))
+    started = time.time()
+    blocks, moved = migrate_records(db_context.chain,
+                                    arguments.start,
+                                    arguments.end,
+                                    logger)
+    elapsed = max(time.time() - started, 1e-9)
+    logger.info("records migrated: {} blocks, {} records, "
+                "{:.1f} blocks/s".format(blocks, moved, blocks / elapsed))
+
+
+if __name__ == '__main__':
+    main()
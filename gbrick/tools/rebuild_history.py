@@ -0,0 +1,109 @@
+""" rebuild the account history index from stored blocks (node stopped)
+
+python -m gbrick.tools.rebuild_history -d <node_dir> [-s start] [-e end] [-w workers]
+"""
+import argparse
+import time
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from gbrick.db import record
+from gbrick.db.chain import history_entries
+from gbrick.db.prepare import prepare_database
+from utils.logger import getLogger
+from utils.util import get_path
+
+CHUNK_SIZE = 256
+
+
+def _chunk_entries(chunk):
+    """ worker: decode transactions, list history entries
+    :param list chunk: (height, transaction section or transactions)
+    :return: list of (key, value)
+    """
+    entries = []
+    for height, transactions in chunk:
+        if isinstance(transactions, bytes):
+            transactions = record.decode_transactions(transactions)
+        entries.extend(history_entries(height, transactions))
+    return entries
+
+
+def _chunks(chain_db, start, end):
+    chunk = []
+    for block in chain_db.iter_blocks(start, end):
+        section = getattr(block, 'raw_transactions', None)
+        if section is not None:
+            chunk.append((block.height, bytes(section)))
+        else:
+            chunk.append((block.height, list(block.list_transactions)))
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rebuild_history(chain_db, start=0, end=None, workers=4, logger=None):
+    """ rewrite history entries of blocks [start, end),
+    blocks are decoded on a process pool, entries written in one batch per chunk
+    :return: (blocks, entries)
+    """
+    if end is None:
+        end = chain_db.get_current_height() + 1
+    blocks = entries = 0
+    started = time.time()
+
+    def write(future):
+        nonlocal entries
+        result = future.result()
+        with chain_db.db.write_batch() as batch:
+            for k, v in result:
+                batch.put(k, v)
+        entries += len(result)
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        for chunk in _chunks(chain_db, start, end):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future)
+            pending.add(pool.submit(_chunk_entries, chunk))
+            blocks += len(chunk)
+            if logger is not None and blocks % (CHUNK_SIZE * 40) == 0:
+                logger.info("history: {} blocks, {:.1f} blocks/s".format(
+                    blocks, blocks / max(time.time() - started, 1e-9)))
+        for future in pending:
+            write(future)
+    return blocks, entries
+
+
+def argument_parser():
+    parse = argparse.ArgumentParser(description='rebuild account history index.')
+    parse.add_argument('-d', '--node_dir', type=str, help="node directory, "
+                                                          "default path to if not input. ")
+    parse.add_argument('-s', '--start', type=int, default=0, help="first height")
+    parse.add_argument('-e', '--end', type=int, default=None, help="stop height (exclusive), "
+                                                                   "chain height + 1 if not input. ")
+    parse.add_argument('-w', '--workers', type=int, default=4, help="decode processes")
+    return parse
+
+
+def main():
+    logger = getLogger('history')
+    arguments = argument_parser().parse_args()
+    db_context = prepare_database(get_path(arguments.node_dir))
+    started = time.time()
+    blocks, entries = rebuild_history(db_context.chain,
+                                      arguments.start,
+                                      arguments.end,
+                                      arguments.workers,
+                                      logger)
+    elapsed = max(time.time() - started, 1e-9)
+    logger.info("history rebuilt: {} blocks, {} entries, "
+                "{:.1f} blocks/s".format(blocks, entries, blocks / elapsed))
+
+
+if __name__ == '__main__':
+    main()
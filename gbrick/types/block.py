@@ -1,33 +1,70 @@
 
 from utils.crypto.hash import sha3_hex
 from gbrick.types.base import BaseHeader, BaseBlock
-from utils.util import extract_values
+from gbrick.types.serializer import memoized_property
 
 
 class BlockHeader(BaseHeader):
+    immutable = True
 
-    @property
+    @memoized_property
     def pre_hash(self):
         setup = self.__slots__[:7]
         attr = self.serialize(setup)
         return sha3_hex(','.join(attr).encode())
 
-    @property
+    @memoized_property
     def hash(self):
         setup = self.__slots__[:-2]
         attr = self.serialize(setup)
         return sha3_hex(','.join(attr).encode())
 
+    def propose(self, hash_transaction_root, timestamp):
+        """ candidate header
+        :param hash_transaction_root: transaction trie root
+        :param timestamp: candidate time
+        :return: BlockHeader, hash_candidate_block is set to pre_hash
+        """
+        header = self.copy(hash_transaction_root=hash_transaction_root,
+                           timestamp=timestamp)
+        return header.copy(hash_candidate_block=header.pre_hash)
+
+    def finalize(self, timestamp_finalize, **kwargs):
+        """ finalize header
+        :param timestamp_finalize: finalize time
+        :param kwargs: other roots, hash_vote_root, ...
+        :return: BlockHeader
+        """
+        return self.copy(timestamp_finalize=timestamp_finalize, **kwargs)
+
+    def sign(self, signature):
+        """
+        :param signature: creator signature
+        :return: BlockHeader
+        """
+        return self.copy(byte_signature=signature)
+
+    def seal(self, signature=None):
+        """ header with hash_block fixed to the current hash
+        :param signature: creator signature, keeps current if None
+        :return: BlockHeader
+        """
+        if signature is None:
+            signature = self.byte_signature
+        return self.copy(hash_block=self.hash,
+                         byte_signature=signature)
+
 
 class Block(BaseBlock):
+    immutable = True
 
     def to_dict(self):
-        obj = super().to_dict()
-        ex = extract_values(obj, ['header', 'transaction_list', 'vote_list'])
-        obj['header'] = ex.header.to_dict()
-        obj['transaction_list'] = [tx.to_dict() for tx in ex.transaction_list]
-        obj['vote_list'] = [vt.to_dict() for vt in ex.vote_list]
-        return obj
+        return {
+            'header': self.header.to_dict(),
+            'transaction_list': [tx.to_dict() for tx in self.list_transactions],
+            'vote_list': [vt.to_dict() for vt in self.list_vote],
+            'extra': self.extra_data
+        }
 
     @property
     def previous(self):
@@ -0,0 +1,73 @@
+
+# per-schema codecs, generated once at import.
+# encoder :: object -> dict, decoder :: dict -> object
+
+RAW = 'raw'
+INT = 'int'
+FLOAT = 'float'
+BYTES = 'bytes'
+
+_CONVERT = {
+    RAW: '{}',
+    INT: 'int({})',
+    FLOAT: 'float({})',
+    BYTES: '{}.encode()'
+}
+
+
+def _build(name, source, namespace):
+    code = compile(source, '<codec:{}>'.format(name), 'exec')
+    exec(code, namespace)
+    return namespace[name]
+
+
+def compile_encoder(slots, dict_slots):
+    """ object -> dict encoder, bytes values are decoded to str
+    :param slots: object fields
+    :param dict_slots: dict keys, same order as slots
+    :return: function(self) -> dict
+    """
+    lines = ['def to_dict(self):']
+    items = []
+    for i, (key, slot) in enumerate(zip(dict_slots, slots)):
+        lines.append('    v{} = self.{}'.format(i, slot))
+        items.append('        {!r}: v{i}.decode() if isinstance(v{i}, bytes) else v{i},'.format(
+            key, i=i
+        ))
+    lines.append('    return {')
+    lines.extend(items)
+    lines.append('    }')
+    return _build('to_dict', '\n'.join(lines), {})
+
+
+def compile_decoder(name, fields, factory, dict_slots, on_unknown):
+    """ dict -> object decoder with slots validation folded in
+    :param str name: decoder name
+    :param fields: [(dict key, factory kwarg, conversion[, default]), ...]
+    :param factory: prepare_* function
+    :param dict_slots: accepted dict keys
+    :param on_unknown: called with the dict when it has unknown keys, raises
+    :return: function(dict_obj) -> object
+    """
+    lines = [
+        'def {}(dict_obj):'.format(name),
+        '    if not dict_obj.keys() <= _known:',
+        '        _on_unknown(dict_obj)',
+        '    get = dict_obj.get',
+        '    return _factory('
+    ]
+    for field in fields:
+        key, kwarg, conversion = field[:3]
+        if len(field) > 3:
+            value = 'get({!r}, {!r})'.format(key, field[3])
+        else:
+            value = 'get({!r})'.format(key)
+        lines.append('        {}={},'.format(kwarg, _CONVERT[conversion].format(value)))
+    lines.append('    )')
+
+    namespace = {
+        '_known': frozenset(dict_slots),
+        '_on_unknown': on_unknown,
+        '_factory': factory
+    }
+    return _build(name, '\n'.join(lines), namespace)
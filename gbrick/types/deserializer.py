@@ -1,5 +1,8 @@
 
-from utils.util import extract_values
+from gbrick.types.codec import (
+    compile_decoder,
+    RAW, INT, FLOAT, BYTES
+)
 
 from gbrick.types.config import (
     BLOCK_DICT,
@@ -38,38 +41,101 @@ from gbrick.validation import (
 )
 
 
+_BLOCK_SLOTS = frozenset(BLOCK_DICT)
+
+
+_decode_header = compile_decoder(
+    'decode_header',
+    [('prev_hash', 'hash_prev_block', BYTES),
+     ('height', 'num_height', INT),
+     ('tx_root_hash', 'hash_transaction_root', BYTES),
+     ('creator', 'address_creator', BYTES),
+     ('timestamp', 'timestamp', RAW),
+     ('version', 'num_version', INT),
+     ('chain_id', 'chain_id', INT),
+     ('candidate_block_hash', 'hash_candidate_block', BYTES),
+     ('vote_root_hash', 'hash_vote_root', BYTES),
+     ('receipt_root', 'hash_receipt_root', BYTES),
+     ('state_root', 'hash_state_root', BYTES),
+     ('finalized_timestamp', 'timestamp_finalize', RAW),
+     ('block_hash', 'block_hash', BYTES),
+     ('signature', 'signature', BYTES)],
+    prepare_header, HEADER_DICT, validate_header_slots
+)
+
+_decode_transaction = compile_decoder(
+    'decode_transaction',
+    [('version', 'num_version', INT),
+     ('type', 'type_transaction', RAW),
+     ('from', 'address_sender', BYTES),
+     ('to', 'address_recipient', BYTES),
+     ('value', 'amount_value', INT),
+     ('fee', 'amount_fee', INT),
+     ('message', 'message', RAW),
+     ('timestamp', 'timestamp', FLOAT),
+     ('tx_hash', 'tx_hash', BYTES),
+     ('signature', 'signature', BYTES)],
+    prepare_transaction, TX_DICT, validate_transaction_slots
+)
+
+_decode_vote = compile_decoder(
+    'decode_vote',
+    [('version', 'num_version', INT),
+     ('block_height', 'num_block_height', INT),
+     ('candidate_block_hash', 'hash_candidate_block', BYTES),
+     ('creator', 'address_creator', BYTES),
+     ('vote_hash', 'vote_hash', BYTES),
+     ('signature', 'signature', BYTES)],
+    prepare_vote, VT_DICT, validate_vote_slots
+)
+
+_decode_account = compile_decoder(
+    'decode_account',
+    [('address', 'address_account', BYTES),
+     ('nonce', 'nonce', RAW),
+     ('balance', 'balance', RAW),
+     ('delegated', 'delegated', RAW),
+     ('delegated_balance', 'delegated_balance', RAW),
+     ('type', 'type', RAW),
+     ('node_id', 'node_id', RAW),
+     ('node_signature', 'node_signature', RAW),
+     ('state', 'state', RAW),
+     ('code', 'code', BYTES, '')],
+    prepare_account, ACCOUNT_DICT, validate_account_slots
+)
+
+_decode_receipt = compile_decoder(
+    'decode_receipt',
+    [('tx_hash', 'hash_transaction', RAW),
+     ('fee_limit', 'fee_limit', RAW),
+     ('height', 'height', RAW),
+     ('paid_fee', 'paid_fee', RAW),
+     ('created_address', 'created_address', RAW),
+     ('status', 'status', RAW),
+     ('message', 'message', RAW),
+     ('error_message', 'error_message', RAW)],
+    prepare_receipt, RECEIPT_DICT, validate_receipt_slots
+)
+
+
 def deserialize_header(dict_obj) -> BaseHeader:
-    validate_header_slots(dict_obj)
-    ex_header = extract_values(dict_obj, HEADER_DICT)
-    return prepare_header(hash_prev_block=ex_header.prev_hash.encode(),
-                          num_height=int(ex_header.height),
-                          hash_transaction_root=ex_header.tx_root_hash.encode(),
-                          address_creator=ex_header.creator.encode(),
-                          timestamp=ex_header.timestamp,
-                          num_version=int(ex_header.version),
-                          chain_id=int(ex_header.chain_id),
-                          hash_candidate_block=ex_header.candidate_block_hash.encode(),
-                          hash_vote_root=ex_header.vote_root_hash.encode(),
-                          hash_receipt_root=ex_header.receipt_root.encode(),
-                          hash_state_root=ex_header.state_root.encode(),
-                          timestamp_finalize=ex_header.finalized_timestamp,
-                          block_hash=ex_header.block_hash.encode(),
-                          signature=ex_header.signature.encode())
+    return _decode_header(dict_obj)
 
 
 def deserialize_block(dict_obj) -> BaseBlock:
-    validate_block_slots(dict_obj)
-    ex_block = extract_values(dict_obj, BLOCK_DICT)
-    header = deserialize_header(ex_block.header)
+    if not dict_obj.keys() <= _BLOCK_SLOTS:
+        validate_block_slots(dict_obj)
+
+    header = _decode_header(dict_obj.get('header'))
 
     transaction_list = [
-        deserialize_transaction(obj)
-        for obj in ex_block.transaction_list
+        _decode_transaction(obj)
+        for obj in dict_obj.get('transaction_list')
     ]
 
     vote_list = [
-        deserialize_vote(obj)
-        for obj in ex_block.vote_list
+        _decode_vote(obj)
+        for obj in dict_obj.get('vote_list')
     ]
 
     return prepare_block(header=header,
@@ -78,57 +144,16 @@ def deserialize_block(dict_obj) -> BaseBlock:
 
 
 def deserialize_transaction(dict_obj) -> BaseTransaction:
-    validate_transaction_slots(dict_obj)
-
-    ex_transaction = extract_values(dict_obj, TX_DICT)
-
-    return prepare_transaction(num_version=int(ex_transaction.version),
-                               type_transaction=ex_transaction.type,
-                               address_sender=getattr(ex_transaction, 'from').encode(),
-                               address_recipient=ex_transaction.to.encode(),
-                               amount_value=int(ex_transaction.value),
-                               amount_fee=int(ex_transaction.fee),
-                               message=ex_transaction.message,
-                               timestamp=float(ex_transaction.timestamp),
-                               tx_hash=ex_transaction.tx_hash.encode(),
-                               signature=ex_transaction.signature.encode())
+    return _decode_transaction(dict_obj)
 
 
 def deserialize_vote(dict_obj) -> BaseVote:
-    validate_vote_slots(dict_obj)
-    ex_vote = extract_values(dict_obj, VT_DICT)
-    return prepare_vote(num_version=int(ex_vote.version),
-                        num_block_height=int(ex_vote.block_height),
-                        hash_candidate_block=ex_vote.candidate_block_hash.encode(),
-                        address_creator=ex_vote.creator.encode(),
-                        vote_hash=ex_vote.vote_hash.encode(),
-                        signature=ex_vote.signature.encode())
+    return _decode_vote(dict_obj)
 
 
 def deserialize_account(dict_obj) -> BaseAccount:
-    validate_account_slots(dict_obj)
-    ex = extract_values(dict_obj, ACCOUNT_DICT)
-    return prepare_account(address_account=ex.address.encode(),
-                           nonce=ex.nonce,
-                           balance=ex.balance,
-                           delegated=ex.delegated,
-                           delegated_balance=ex.delegated_balance,
-                           type=ex.type,
-                           node_id=ex.node_id,
-                           node_signature=ex.node_signature,
-                           state=ex.state)
+    return _decode_account(dict_obj)
 
 
 def deserialize_receipt(dict_obj) -> BaseReceipt:
-    validate_receipt_slots(dict_obj)
-    ex = extract_values(dict_obj, RECEIPT_DICT)
-    return prepare_receipt(hash_transaction=ex.tx_hash,
-                           fee_limit=ex.fee_limit,
-                           height=ex.height,
-                           paid_fee=ex.paid_fee,
-                           created_address=ex.created_address,
-                           status=ex.status,
-                           message=ex.message,
-                           error_message=ex.error_message)
-
-
+    return _decode_receipt(dict_obj)
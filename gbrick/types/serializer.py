@@ -4,6 +4,7 @@ import copy
 
 from abc import ABC, abstractmethod
 from utils.exceptions import SerializeError
+from gbrick.types.codec import compile_encoder
 from typing import List
 
 
@@ -19,6 +20,47 @@ class BaseSerializer(ABC):
     def to_json(self): raise NotImplementedError
 
 
+_SHARED_TYPES = (int, float, str, bytes, bool, type(None))
+
+
+def share_copy(value):
+    """ copy mutable containers, share immutable values
+    :param value: slot value
+    :return: value or copy
+    """
+    if isinstance(value, _SHARED_TYPES):
+        return value
+    if isinstance(value, Serializer):
+        if value.immutable:
+            return value
+        return value.copy()
+    if isinstance(value, list):
+        return [share_copy(v) for v in value]
+    if isinstance(value, dict):
+        return {k: share_copy(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(share_copy(v) for v in value)
+    return copy.deepcopy(value)
+
+
+class memoized_property:
+    """ read-only property computed once per instance,
+    the value is kept in the instance __dict__
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
 class Serializer(BaseSerializer):
     """ Serializer
     type structure serialize class
@@ -26,6 +68,19 @@ class Serializer(BaseSerializer):
     """
     dict_slots: List[str]
 
+    # immutable types reject assignment after construction,
+    # use copy(**kwargs) to derive a new object.
+    immutable = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # compile to_dict once per schema
+        own = cls.__dict__
+        if 'to_dict' in own:
+            return
+        if '__slots__' in own or 'dict_slots' in own:
+            cls.to_dict = compile_encoder(cls.__slots__, cls.dict_slots)
+
     def __init__(self, *args, **kwargs):
 
         if kwargs:
@@ -41,7 +96,27 @@ class Serializer(BaseSerializer):
         for fields, value in zip(self.__slots__, data_fields):
             # if type(value) is field_type:
             #     raise ValueError('{} fields set error'.format(field_name))
-            setattr(self, fields, value)
+            object.__setattr__(self, fields, value)
+
+    def __setattr__(self, name, value):
+        if self.immutable:
+            raise SerializeError(
+                '{} is immutable, use copy({}=...)'.format(
+                    type(self).__name__, name
+                )
+            )
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if self.immutable:
+            raise SerializeError(
+                '{} is immutable'.format(type(self).__name__)
+            )
+        object.__delattr__(self, name)
+
+    def __reduce__(self):
+        # rebuild through the constructor, cached values are not carried over
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
 
     def _set_fields(self, args, kwargs):
         # kwargs is merge to args
@@ -82,6 +157,26 @@ class Serializer(BaseSerializer):
         return json.dumps(self.to_dict())
 
     def copy(self, **kwargs):
+        """ structural-sharing copy,
+        immutable children are shared, mutable containers are copied
+        :param kwargs: fields to replace
+        :return: new object
+        """
+        bind_key = set(self.__slots__).difference(
+            kwargs.keys()
+        )
+        bind_kwargs = {
+           k: share_copy(getattr(self, k))
+           for k in bind_key
+        }
+        merge_kwargs = dict(**bind_kwargs, **kwargs)
+        return type(self)(**merge_kwargs)
+
+    def deepcopy(self, **kwargs):
+        """ copy without sharing any child
+        :param kwargs: fields to replace
+        :return: new object
+        """
         bind_key = set(self.__slots__).difference(
             kwargs.keys()
         )
@@ -1,11 +1,13 @@
 
 from gbrick.types.base import BaseTransaction, BaseReceipt
 from utils.crypto.hash import sha3_hex
+from gbrick.types.serializer import memoized_property
 
 
 class Transaction(BaseTransaction):
+    immutable = True
 
-    @property
+    @memoized_property
     def hash(self):
         setup = self.__slots__[:-2]
         attr = self.serialize(setup)
@@ -13,8 +15,9 @@ class Transaction(BaseTransaction):
 
 
 class Receipt(BaseReceipt):
+    immutable = True
 
-    @property
+    @memoized_property
     def hash(self):
         setup = self.__slots__
         attr = self.serialize(setup)
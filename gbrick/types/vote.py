@@ -1,15 +1,17 @@
 
 from utils.crypto.hash import sha3_hex
+from gbrick.types.serializer import memoized_property
 from gbrick.types.base import BaseVote
 
 
 class Vote(BaseVote):
+    immutable = True
 
     @property
     def creator(self):
         return self.address_creator
 
-    @property
+    @memoized_property
     def hash(self):
         setup = self.__slots__[:-2]
         attr = self.serialize(setup)
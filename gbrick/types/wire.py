@@ -0,0 +1,274 @@
+import json
+
+from utils.pack import write_varint, read_varint
+from utils.exceptions import SerializeError
+from gbrick.types.config import (
+    HEADER_DICT, TX_DICT, VT_DICT
+)
+
+# gossip message format
+# json   :: body starts with '{' or '['
+# binary :: [format 0x02][kind][varint layout length][layout][column blobs]
+#
+# records are laid out as tables, one column per dict_slots field.
+# layout :: json [table, ..., extra], table :: [rows, specs, json columns]
+# spec   :: 0 json column, [1, width] hex column, [2, width] prefix hex column
+# hex columns (hashes, signatures, 'gBx' addresses) are sent as raw bytes
+# after the layout, in spec order: [rows * prefix][rows * width].
+# layout and blobs decode in C (json, bytes.hex), python only slices.
+#
+# binary is receive-only by default: every node decodes it, nodes send
+# json until set_wire_format('binary') is switched on for the network.
+
+JSON = 'json'
+BINARY = 'binary'
+
+# 0x01 was the tagged value payload, never sent by default.
+FORMAT_BINARY = 0x02
+
+TRANSACTION = 0x01
+BLOCK = 0x02
+VOTE = 0x03
+CONFIRM = 0x04
+
+PREFIX_SIZE = 3
+
+_JSON_COLUMN = 0
+_HEX_COLUMN = 1
+_PREFIX_COLUMN = 2
+
+_JSON_START = (ord('{'), ord('['))
+
+
+def _hex_width(column):
+    """
+    :param column: str values
+    :return: (raw width, raw bytes) if every value is lowercase hex of one length, else None
+    """
+    size = len(column[0])
+    if not size or size & 1:
+        return None
+    for value in column:
+        if len(value) != size:
+            return None
+    joined = ''.join(column)
+    try:
+        raw = bytes.fromhex(joined)
+    except ValueError:
+        return None
+    # fromhex skips whitespace and accepts upper case, the round trip does not
+    if raw.hex() != joined:
+        return None
+    return size // 2, raw
+
+
+def _encode_column(column, specs, columns, blobs):
+    if column and all(type(value) is str for value in column):
+        found = _hex_width(column)
+        if found is not None:
+            width, raw = found
+            specs.append([_HEX_COLUMN, width])
+            blobs.append(raw)
+            return
+        prefixes = ''.join(value[:PREFIX_SIZE] for value in column)
+        if len(prefixes) == len(column) * PREFIX_SIZE and prefixes.isascii():
+            found = _hex_width([value[PREFIX_SIZE:] for value in column])
+            if found is not None:
+                width, raw = found
+                specs.append([_PREFIX_COLUMN, width])
+                blobs.append(prefixes.encode())
+                blobs.append(raw)
+                return
+    specs.append(_JSON_COLUMN)
+    columns.append(column)
+
+
+def _encode_table(rows, size, blobs):
+    """
+    :param rows: records as positional lists of size fields
+    """
+    specs = []
+    columns = []
+    for column in zip(*rows) if rows else [()] * size:
+        _encode_column(list(column), specs, columns, blobs)
+    return [len(rows), specs, columns]
+
+
+def _decode_table(table, body, offset):
+    """
+    :return: (columns, next offset)
+    """
+    rows, specs, json_columns = table
+    if type(rows) is not int or rows < 0:
+        raise SerializeError('wire: bad row count')
+    json_columns = iter(json_columns)
+    columns = []
+    for spec in specs:
+        if spec == _JSON_COLUMN:
+            column = next(json_columns)
+            if len(column) != rows:
+                raise SerializeError('wire: column length mismatch')
+            columns.append(column)
+            continue
+        kind, width = spec
+        if type(width) is not int or width <= 0:
+            raise SerializeError('wire: bad column width')
+        prefixes = None
+        if kind == _PREFIX_COLUMN:
+            end = offset + rows * PREFIX_SIZE
+            prefixes = body[offset:end].decode('ascii')
+            offset = end
+        elif kind != _HEX_COLUMN:
+            raise SerializeError('wire: unknown column {}'.format(kind))
+        end = offset + rows * width
+        digits = body[offset:end].hex()
+        offset = end
+        step = width * 2
+        if prefixes is None:
+            column = [digits[i:i + step] for i in range(0, rows * step, step)]
+        else:
+            column = [prefixes[i * PREFIX_SIZE:(i + 1) * PREFIX_SIZE] + digits[i * step:(i + 1) * step]
+                      for i in range(rows)]
+        columns.append(column)
+    if offset > len(body):
+        raise SerializeError('wire: truncated body')
+    return columns, offset
+
+
+def _positional(dict_obj, dict_slots):
+    return [dict_obj.get(k) for k in dict_slots]
+
+
+def _named(columns, dict_slots):
+    if len(columns) != len(dict_slots):
+        raise SerializeError('wire: expected {} fields, got {}'.format(
+            len(dict_slots), len(columns)
+        ))
+    return [dict(zip(dict_slots, row)) for row in zip(*columns)]
+
+
+def _one(records):
+    if len(records) != 1:
+        raise SerializeError('wire: expected one record, got {}'.format(len(records)))
+    return records[0]
+
+
+def _encode_block(dict_obj, blobs):
+    return [
+        _encode_table([_positional(dict_obj['header'], HEADER_DICT)], len(HEADER_DICT), blobs),
+        _encode_table([_positional(tx, TX_DICT) for tx in dict_obj['transaction_list']],
+                      len(TX_DICT), blobs),
+        _encode_table([_positional(vt, VT_DICT) for vt in dict_obj['vote_list']],
+                      len(VT_DICT), blobs),
+        dict_obj.get('extra', {})
+    ]
+
+
+def _decode_block(layout, body, offset):
+    header, transactions, votes, extra = layout
+    header, offset = _decode_table(header, body, offset)
+    transactions, offset = _decode_table(transactions, body, offset)
+    votes, offset = _decode_table(votes, body, offset)
+    return {
+        'header': _one(_named(header, HEADER_DICT)),
+        'transaction_list': _named(transactions, TX_DICT),
+        'vote_list': _named(votes, VT_DICT),
+        'extra': extra
+    }, offset
+
+
+def _record_codec(dict_slots):
+    def encode(dict_obj, blobs):
+        return [_encode_table([_positional(dict_obj, dict_slots)], len(dict_slots), blobs)]
+
+    def decode(layout, body, offset):
+        columns, offset = _decode_table(layout[0], body, offset)
+        return _one(_named(columns, dict_slots)), offset
+    return encode, decode
+
+
+def _encode_confirm(values, blobs):
+    return [_encode_table([list(values)], len(values), blobs)]
+
+
+def _decode_confirm(layout, body, offset):
+    columns, offset = _decode_table(layout[0], body, offset)
+    return [_one(column) for column in columns], offset
+
+
+_TRANSACTION_CODEC = _record_codec(TX_DICT)
+_VOTE_CODEC = _record_codec(VT_DICT)
+
+_ENCODE = {
+    TRANSACTION: _TRANSACTION_CODEC[0],
+    BLOCK: _encode_block,
+    VOTE: _VOTE_CODEC[0],
+    CONFIRM: _encode_confirm
+}
+
+_DECODE = {
+    TRANSACTION: _TRANSACTION_CODEC[1],
+    BLOCK: _decode_block,
+    VOTE: _VOTE_CODEC[1],
+    CONFIRM: _decode_confirm
+}
+
+
+def dumps(obj, kind, fmt=JSON):
+    """ gossip message encode
+    :param obj: Serializer object or json-compatible value (confirm)
+    :param int kind: message kind
+    :param str fmt: 'json' or 'binary'
+    :return: json str or binary bytes
+    """
+    value = obj.to_dict() if hasattr(obj, 'to_dict') else obj
+    if fmt == JSON:
+        return json.dumps(value)
+    if fmt != BINARY:
+        raise SerializeError('wire: unknown format {}'.format(fmt))
+
+    blobs = []
+    layout = json.dumps(_ENCODE[kind](value, blobs), separators=(',', ':')).encode()
+
+    out = bytearray((FORMAT_BINARY, kind))
+    write_varint(out, len(layout))
+    out += layout
+    for blob in blobs:
+        out += blob
+    return bytes(out)
+
+
+def loads(body):
+    """ gossip message decode, format is detected by the first byte
+    :param body: message body
+    :return: to_dict shaped value
+    """
+    if isinstance(body, str):
+        return json.loads(body)
+    if not body:
+        raise SerializeError('wire: empty body')
+
+    head = body[0]
+    if head in _JSON_START:
+        return json.loads(body)
+    if len(body) < 3:
+        raise SerializeError('wire: truncated body')
+    if head != FORMAT_BINARY:
+        raise SerializeError('wire: unknown format byte {}'.format(head))
+
+    kind = body[1]
+    if kind not in _DECODE:
+        raise SerializeError('wire: unknown kind {}'.format(kind))
+
+    body = bytes(body)
+    size, offset = read_varint(body, 2)
+    try:
+        layout = json.loads(body[offset:offset + size])
+        value, offset = _DECODE[kind](layout, body, offset + size)
+    except SerializeError:
+        raise
+    except (ValueError, TypeError, IndexError, StopIteration) as err:
+        raise SerializeError('wire: malformed layout: {!r}'.format(err))
+    if offset != len(body):
+        raise SerializeError('wire: length mismatch')
+    return value
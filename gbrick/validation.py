@@ -1,7 +1,7 @@
 
 import json
 
-from utils.crypto.ec import verify
+from utils.crypto.ec import verify, verify_signature
 from utils.trie.prepare import make_hash_root
 from utils.exceptions import ValidationError
 from event.base import BaseEventContext
@@ -24,9 +24,16 @@ from gbrick.types.base import (
 
 from utils.config import ADDRESS_SIZE
 
+_HEADER_SLOTS = frozenset(HEADER_DICT)
+_BLOCK_SLOTS = frozenset(BLOCK_DICT)
+_TX_SLOTS = frozenset(TX_DICT)
+_VT_SLOTS = frozenset(VT_DICT)
+_RECEIPT_SLOTS = frozenset(RECEIPT_DICT)
+_ACCOUNT_SLOTS = frozenset(ACCOUNT_DICT)
+
 
 def validate_header_slots(header_dict: dict) -> None:
-    unknown_slots = set(header_dict.keys()).difference(HEADER_DICT)
+    unknown_slots = header_dict.keys() - _HEADER_SLOTS
     if unknown_slots:
         raise ValidationError(
             "header be used with slots {}"
@@ -37,7 +44,7 @@ def validate_header_slots(header_dict: dict) -> None:
 
 
 def validate_block_slots(block_dict: dict) -> None:
-    unknown_slots = set(block_dict.keys()).difference(BLOCK_DICT)
+    unknown_slots = block_dict.keys() - _BLOCK_SLOTS
     if unknown_slots:
         raise ValidationError(
             "block be used with slots {}"
@@ -49,7 +56,7 @@ def validate_block_slots(block_dict: dict) -> None:
 
 
 def validate_transaction_slots(tx_dict: dict) -> None:
-    unknown_slots = set(tx_dict.keys()).difference(TX_DICT)
+    unknown_slots = tx_dict.keys() - _TX_SLOTS
     if unknown_slots:
         raise ValidationError(
             "transaction be used with slots {}"
@@ -60,7 +67,7 @@ def validate_transaction_slots(tx_dict: dict) -> None:
 
 
 def validate_vote_slots(vt_dict: dict) -> None:
-    unknown_slots = set(vt_dict.keys()).difference(VT_DICT)
+    unknown_slots = vt_dict.keys() - _VT_SLOTS
     if unknown_slots:
         raise ValidationError(
             "vote be used with slots {}"
@@ -71,7 +78,7 @@ def validate_vote_slots(vt_dict: dict) -> None:
 
 
 def validate_receipt_slots(rct_dict: dict) -> None:
-    unknown_slots = set(rct_dict.keys()).difference(RECEIPT_DICT)
+    unknown_slots = rct_dict.keys() - _RECEIPT_SLOTS
     if unknown_slots:
         raise ValidationError(
             "receipt be used with slots {}"
@@ -82,7 +89,7 @@ def validate_receipt_slots(rct_dict: dict) -> None:
 
 
 def validate_account_slots(account_dict: dict) -> None:
-    unknown_slots = set(account_dict.keys()).difference(ACCOUNT_DICT)
+    unknown_slots = account_dict.keys() - _ACCOUNT_SLOTS
     if unknown_slots:
         raise ValidationError(
             "account be used with slots {}"
@@ -187,7 +194,7 @@ def validate_nonce(context_nonce, account_nonce) -> None:
         )
 
 
-async def validate_transaction(tx: BaseTransaction) -> None:
+def verify_transaction(tx: BaseTransaction) -> None:
     # if not isinstance(tx.hash_transaction, bytes):
     #     raise ValueError('tx hash is not bytes')
     if tx.hash_transaction != tx.hash:
@@ -197,9 +204,13 @@ async def validate_transaction(tx: BaseTransaction) -> None:
                 tx.hash, tx.hash_transaction
             )
         )
-    await verify(tx.hash,
-                 tx.byte_signature,
-                 tx.address_sender)
+    verify_signature(tx.hash,
+                     tx.byte_signature,
+                     tx.address_sender)
+
+
+async def validate_transaction(tx: BaseTransaction) -> None:
+    verify_transaction(tx)
 
 
 async def validate_candidate(block: BaseBlock) -> None:
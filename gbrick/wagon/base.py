@@ -102,7 +102,19 @@ class BaseState(ABC):
         raise NotImplementedError('state: method not implement')
 
     @abstractmethod
-    def commit(self):
+    def commit(self, sync=False):
+        raise NotImplementedError('state: method not implement')
+
+    @abstractmethod
+    def prepare_commit(self):
+        raise NotImplementedError('state: method not implement')
+
+    @abstractmethod
+    def write_commit(self, prepared, sync=False):
+        raise NotImplementedError('state: method not implement')
+
+    @abstractmethod
+    def finish_commit(self, prepared):
         raise NotImplementedError('state: method not implement')
 
     @abstractmethod
@@ -79,14 +79,17 @@ class ExecuteContext(BaseExecuteContext):
 
     def use(self, cmd):
         consume = getattr(self.ratio, cmd)
-        self._fee += consume
-        if self._fee > self.limited:
+        expected = self._fee + consume
+        if expected > self.limited:
+            # the sender is charged up to the limit, paid is what is charged
+            self._fee = self.limited
             raise FeeLimitedError(
                 "fee limited: {}, "
                 "expected consume fee: {}".format(
-                    self.limited, self._fee
+                    self.limited, expected
                 )
             )
+        self._fee = expected
 
     def set_code(self, code):
         code = validate_code(code)
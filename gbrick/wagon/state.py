@@ -76,12 +76,21 @@ class State(BaseState):
                 )
             )
 
+        snapshot = self.state_db.snapshot()
         try:
             await self.validate_transaction(version, transaction)
             await executor(self, context, transaction)
         except (ValidationError, FeeLimitedError) as err:
+            # partial changes are rolled back, an executed transaction
+            # still pays the fee it used (context.paid, never above the limit,
+            # the block reward adds the same amount) and consumes one nonce.
+            self.state_db.revert(snapshot)
             context.set_error(err)
-            self.state_db.compute_balance(context.txbase, context.fee_remainder)
+            if context.paid > 0:
+                self.state_db.compute_balance(context.txbase, -1 * context.paid)
+                self.state_db.increase_nonce(context.txbase)
+        else:
+            self.state_db.discard(snapshot)
         # try:
         #     await self.validate_transaction(version, transaction)
         # except ValidationError as err:
@@ -112,8 +121,17 @@ class State(BaseState):
         balance = self.state_db.get_balance(transaction.address_sender)
         validate_payable(transaction, balance)
 
-    def commit(self):
-        self.state_db.commit()
+    def commit(self, sync=False):
+        self.state_db.commit(sync)
+
+    def prepare_commit(self):
+        return self.state_db.prepare_commit()
+
+    def write_commit(self, prepared, sync=False):
+        self.state_db.write_commit(prepared, sync)
+
+    def finish_commit(self, prepared):
+        self.state_db.finish_commit(prepared)
 
     def clear(self):
         self.state_db.clear()
@@ -5,6 +5,7 @@ from gbrick.wagon.execute_context import ExecuteContext
 
 from gbrick.types.prepare import prepare_receipt
 from utils.trie.prepare import make_hash_root
+from utils.config import CREATE_CONTRACT
 from gbrick.wagon.executor import Executor
 
 from utils.exceptions import (
@@ -119,6 +120,10 @@ class Wagon(BaseWagon):
                     self.header.num_height, block.height
                 )
             )
+        # resolved before any transaction runs, against the set the votes were cast under
+        voters = self.rewarded_voters(block)
+        prefetched = await self.prefetch(block, voters)
+        loads = self.state.state_db.account_loads
         for index, transaction in enumerate(block.list_transactions):
             # self._tasks.add(
             #     asyncio.ensure_future(
@@ -131,22 +136,68 @@ class Wagon(BaseWagon):
         self._trie = make_hash_root(
             [receipt for _, receipt in self._receipts]
         )
-        self._pre_finalize(block)
+        self._pre_finalize(block, voters)
+        self._db_context.async_state.coverage.observe(
+            prefetched, self.state.state_db.account_loads - loads
+        )
         return block.copy(header=block.header.copy(hash_receipt_root=self._trie.root,
                                                    hash_state_root=self.state.cache_trie_root))
 
-    def _set_reward(self, validator_id, reward):
+    def rewarded_voters(self, block):
+        """ validators of the votes on block's candidate, in vote order.
+        resolved against the validator set of the parent state, the one
+        the votes were cast under. voters outside it are not rewarded.
+        :param Block block: next height block
+        :return: list of Rep
+        """
+        if block.height == 0:
+            return []
+        # self.state moves the state db to the parent root first
+        validator_set = self.state.state_db.validator_set()
+        voters = []
+        for v in block.list_vote:
+            if v.hash_candidate_block == block.pre_hash:
+                validator = validator_set.get(v.creator)
+                if validator is not None:
+                    voters.append(validator)
+        return voters
+
+    def touched_addresses(self, block, voters=None):
+        """ accounts block execution reads: senders, recipients, reward recipients
+        :param Block block: next height block
+        :param list voters: rewarded_voters(block), resolved here when None
+        :return: list of addresses, in first use order
         """
-        :param bytes validator_id: validator account address
+        if voters is None:
+            voters = self.rewarded_voters(block)
+        addresses = []
+        for transaction in block.list_transactions:
+            addresses.append(transaction.address_sender)
+            if transaction.address_recipient != CREATE_CONTRACT:
+                addresses.append(transaction.address_recipient)
+        addresses.extend(validator.address_account for validator in voters)
+        return list(dict.fromkeys(addresses))
+
+    async def prefetch(self, block, voters=None):
+        """ warm state db caches for block on the i/o pool
+        :return: number of accounts ready before execution
+        """
+        addresses = self.touched_addresses(block, voters)
+        await self._db_context.async_state.prefetch(addresses)
+        return len(addresses)
+
+    def _set_reward(self, validator, reward):
+        """
+        :param Rep validator: rewarded validator
         :param int reward: block reward
         :return: None
         """
-        validator = self._db_context.state.get_validator(validator_id)
-        self._db_context.state.compute_balance(validator.address_account, reward)
+        self.state.state_db.compute_balance(validator.address_account, reward)
 
-    def __computation_block_rewards(self, block):
+    def __computation_block_rewards(self, block, voters):
         """ The validator who vote are rewarded.
         :param Block block:
+        :param list voters: rewarded_voters(block)
         :return: None
         """
         # block-creator -> block rewards [undefined]
@@ -155,32 +206,46 @@ class Wagon(BaseWagon):
         # base_reword * ratio : validators total rewards
         # vote pointer..
         
-        validators = []
-        for v in block.list_vote:
-            if v.hash_candidate_block == block.pre_hash:
-                validators.append(v.creator)
+        if not voters:
+            return
         # state -> get vt pow
-        base_reward = self._total_paid // len(validators)
-        for validator in validators:
-            self._set_reward(validator, base_reward)
+        base_reward, remainder = divmod(self._total_paid, len(voters))
+        for validator in voters:
+            # the first voter takes the rounding remainder, no fee is burned
+            self._set_reward(validator, base_reward + remainder)
+            remainder = 0
 
-    def _pre_finalize(self, block):
+    def _pre_finalize(self, block, voters):
         if block.height > 0:
-            self.__computation_block_rewards(block)
+            self.__computation_block_rewards(block, voters)
+            state_db = self.state.state_db
+            if state_db.election_due(block.height):
+                # the next blocks are voted by the new set
+                state_db.elect()
 
     def finalize(self, block):
         self._commit(block)
 
+    async def finalize_async(self, block):
+        """ commit on the db i/o pool, the event loop keeps running
+        """
+        try:
+            await self._db_context.async_chain.commit(block, *self._commit_args(block))
+        except CacheError:
+            raise FinalizeError
+        finally:
+            self.clear()
+
+    def _commit_args(self, block):
+        tries = (make_hash_root(block.list_transactions),
+                 self._trie,
+                 make_hash_root(block.list_vote))
+        receipts = [receipt for _, receipt in self._receipts]
+        return tries, self.state, receipts
+
     def _commit(self, block) -> None:
-        # TODO: exceptions -> snapshot revert.
         try:
-            self.state.commit()
-            trie = make_hash_root(block.list_transactions)
-            self._db_context.chain.set_trie(trie)
-            self._db_context.chain.set_trie(self._trie)
-            trie = make_hash_root(block.list_vote)
-            self._db_context.chain.set_trie(trie)
-            self._db_context.chain.commit(block)
+            self._db_context.chain.commit(block, *self._commit_args(block))
         except CacheError:
             raise FinalizeError
         finally:
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from factory import DBContext, extend_test_chain, make_transfer, prepare_test_chain
+
+import gbrick.chains.chain as chain_module
+import gbrick.validation as validation
+from gbrick.tools.chain_io import export_chain, import_chain, read_export
+from utils.exceptions import FinalizeError, ValidationError
+
+BLOCKS = 4
+
+
+async def _verified(msg_hash, sig, sender):
+    pass
+
+
+async def _not_trusted(msg_hash, sig, sender):
+    raise AssertionError('trusted import verified a signature')
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    # generated signatures are not real
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    monkeypatch.setattr(chain_module, 'verify', _verified)
+    source = DBContext(tmp_path / 'source')
+    chain = prepare_test_chain(source)
+
+    async def generate():
+        for height in range(BLOCKS):
+            await extend_test_chain(chain, [make_transfer(height * 10 + i) for i in range(2)])
+    asyncio.run(generate())
+
+    path = str(tmp_path / 'chain.gz')
+    export_chain(source.chain, path)
+    return source, path
+
+
+def test_trusted_import_skips_signatures_only(tmp_path, monkeypatch, exported):
+    source, path = exported
+    monkeypatch.setattr(chain_module, 'verify', _not_trusted)
+    target = DBContext(tmp_path / 'target', buffered=True)
+    chain = prepare_test_chain(target)
+
+    head = source.chain.get_header_from_height(BLOCKS)
+    blocks, transactions, _ = asyncio.run(
+        import_chain(chain, target, path, checkpoint=(BLOCKS, head.hash)))
+
+    assert (blocks, transactions) == (BLOCKS, BLOCKS * 2)
+    assert target.chain.get_current_height() == BLOCKS
+    assert target.chain.get_header_from_height(BLOCKS).hash == head.hash
+    assert target.state.get_balance(make_transfer(31).address_recipient) == 10 ** 8
+
+
+@pytest.mark.parametrize('tamper, error', [
+    (lambda block: block.header.copy(num_height=2), FinalizeError),
+    (lambda block: block.header.copy(chain_id=2), ValidationError),
+    (lambda block: block.header.copy(timestamp=0), ValidationError),
+    (lambda block: block.header.copy(hash_transaction_root=block.header.hash_vote_root), ValidationError),
+    (lambda block: block.header.copy(hash_vote_root=block.header.hash_transaction_root), ValidationError),
+])
+def test_trusted_finalize_keeps_structural_checks(tmp_path, monkeypatch, exported, tamper, error):
+    source, path = exported
+    monkeypatch.setattr(chain_module, 'verify', _not_trusted)
+    target = DBContext(tmp_path / 'target')
+    chain = prepare_test_chain(target)
+    block = next(block for block, _ in read_export(path) if block.height == 1)
+    block = block.copy(header=tamper(block))
+
+    with pytest.raises(error):
+        asyncio.run(chain.finalize(block, trusted=True))
+    assert target.chain.get_current_height() == 0
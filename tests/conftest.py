@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.config as config  # noqa: E402
+
+# utils/config.py is kept private, settings it does not define
+# get test values here.
+
+
+class _Lookup:
+
+    @staticmethod
+    def top_header():
+        return b'gBtop'
+
+    @staticmethod
+    def transaction(tx_hash):
+        return b'gBtx' + tx_hash
+
+    @staticmethod
+    def vote(vote_hash):
+        return b'gBvt' + vote_hash
+
+    @staticmethod
+    def minimum():
+        return b'gBmin'
+
+    @staticmethod
+    def constant_rep():
+        return b'gBconstrep'
+
+
+class _MainConstant:
+    block_hash = b''
+    state_root = b''
+
+
+_TEST_CONFIG = {
+    'ROOT_DIR': tempfile.mkdtemp(prefix='gbrick-test-'),
+    'DATABASE': ('chain', 'state'),
+    'DB_DIR': 'db',
+    'NODE_DIR': 'node',
+    'NODE_SEED': lambda seed: b'seed',
+    'ADDRESS_SIZE': 43,
+    'O_COIN_TYPE': b'gBx',
+    'CONTRACT_TYPE': b'gBc',
+    'CREATE_CONTRACT': b'gBc' + b'0' * 40,
+    'UNIT': 10 ** 18,
+    'FEE_EXECUTE': 0.0001,
+    'FEE_CREATE': 0.01,
+    'FEE_CALL': 0.001,
+    'MQ_HOST': 'localhost',
+    'MQ_SEED': 'guest',
+    'MQ_PORT': 5672,
+    'MQ_USER': 'guest',
+    'TX_EXCHANGE': 'tx',
+    'CD_EXCHANGE': 'cd',
+    'VT_EXCHANGE': 'vt',
+    'FN_EXCHANGE': 'fn',
+    'CM_EXCHANGE': 'cm',
+    'EVENT_NAME': lambda name: 'event-' + name,
+    'Lookup': _Lookup,
+    'MainConstant': _MainConstant
+}
+
+for _name, _value in _TEST_CONFIG.items():
+    if not hasattr(config, _name):
+        setattr(config, _name, _value)
+
+# shared builders, tests/factory.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
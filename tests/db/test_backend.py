@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from gbrick.db.backend import LEVELDB, LMDB, MEMORY
+from gbrick.db.base import DB
+
+_MODULES = {LEVELDB: 'plyvel', LMDB: 'lmdb', MEMORY: None}
+
+
+@pytest.fixture(params=[LEVELDB, MEMORY, LMDB])
+def db(request, tmp_path):
+    module = _MODULES[request.param]
+    if module is not None:
+        pytest.importorskip(module)
+    database = DB(str(tmp_path / request.param), backend=request.param)
+    yield database
+    database.close()
+
+
+def _fill(db, keys):
+    with db.write_batch() as batch:
+        for key in keys:
+            batch.put(key, b'v' + key)
+
+
+def test_get_put_delete(db):
+    db.put(b'a', b'1')
+    assert db.get(b'a') == b'1'
+    assert db.exists(b'a') and b'a' in db
+    db.put(b'a', b'2')
+    assert db.get(b'a') == b'2'
+    db.delete(b'a')
+    assert not db.exists(b'a')
+    with pytest.raises(KeyError):
+        db.get(b'a')
+    # deleting a missing key is not an error
+    db.delete(b'missing')
+
+
+def test_empty_key(db):
+    db.put(b'', b'root')
+    db.put(b'a', b'1')
+    assert db.get(b'') == b'root'
+    assert list(db.iter()) == [(b'', b'root'), (b'a', b'1')]
+    assert list(db.iter(reverse=True)) == [(b'a', b'1'), (b'', b'root')]
+    db.delete(b'')
+    assert not db.exists(b'')
+
+
+def test_batch_is_atomic(db):
+    db.put(b'a', b'1')
+    with pytest.raises(RuntimeError):
+        with db.write_batch() as batch:
+            batch.put(b'b', b'2')
+            batch.delete(b'a')
+            raise RuntimeError('abort')
+    assert db.get(b'a') == b'1'
+    assert not db.exists(b'b')
+
+    with db.write_batch() as batch:
+        batch.put(b'b', b'2')
+        batch.delete(b'a')
+        batch.put(b'c', b'3')
+    assert list(db.iter()) == [(b'b', b'2'), (b'c', b'3')]
+
+
+def test_snapshot_isolation(db):
+    _fill(db, [b'a', b'b'])
+    snapshot = db.snapshot()
+    db.put(b'c', b'new')
+    db.put(b'a', b'changed')
+    db.delete(b'b')
+    assert snapshot.get(b'a') == b'va'
+    assert snapshot.get(b'b') == b'vb'
+    assert snapshot.get(b'c') is None
+    assert list(db.iter(snapshot=snapshot)) == [(b'a', b'va'), (b'b', b'vb')]
+    assert list(db.iter()) == [(b'a', b'changed'), (b'c', b'new')]
+    snapshot.close()
+
+
+def test_iter_bounds(db):
+    keys = [bytes([i]) for i in range(0, 20, 2)]
+    _fill(db, keys)
+    forward = [key for key, _ in db.iter(b'\x04', b'\x0a')]
+    assert forward == [b'\x04', b'\x06', b'\x08']
+    # bounds that fall between keys, stop is exclusive
+    assert [key for key, _ in db.iter(b'\x03', b'\x08')] == [b'\x04', b'\x06']
+    assert [key for key, _ in db.iter(b'\x04', b'\x0a', reverse=True)] == forward[::-1]
+    assert [key for key, _ in db.iter(b'\x0f')] == [b'\x10', b'\x12']
+    assert [key for key, _ in db.iter(end=b'\x04')] == [b'\x00', b'\x02']
+    assert [key for key, _ in db.iter(end=b'\x04', reverse=True)] == [b'\x02', b'\x00']
+    assert [key for key, _ in db.iter(reverse=True)] == keys[::-1]
+    assert list(db.iter(b'\x30')) == []
+    assert list(db.iter(b'\x08', b'\x08')) == []
+
+
+def test_iter_is_point_in_time(db):
+    _fill(db, [b'a', b'b', b'c'])
+    it = db.iter()
+    assert next(it) == (b'a', b'va')
+    db.delete(b'b')
+    db.put(b'bb', b'new')
+    assert list(it) == [(b'b', b'vb'), (b'c', b'vc')]
+
+
+def test_memory_iter_does_not_share_storage(tmp_path):
+    # a plain iter() must not turn the next write into a full copy
+    db = DB(str(tmp_path / 'memory'), backend=MEMORY)
+    _fill(db, [bytes([i]) for i in range(100)])
+    backend = db._db
+    data = backend._data
+    list(db.iter(b'\x10', b'\x20'))
+    db.put(b'\xff', b'x')
+    assert backend._data is data
+
+    snapshot = db.snapshot()
+    db.put(b'\xfe', b'x')
+    assert backend._data is not data
+    assert snapshot.get(b'\xfe') is None
+
+
+@pytest.mark.parametrize('backend', [LEVELDB, MEMORY, LMDB])
+def test_benchmark_runs(backend, tmp_path):
+    from bench.backend import run
+    module = _MODULES[backend]
+    if module is not None:
+        pytest.importorskip(module)
+    result = run(backend, str(tmp_path / 'bench'), count=200, value_size=16)
+    assert set(result) == {'batch_put', 'get', 'scan', 'range_scan'}
+    assert all(value > 0 for value in result.values())
+
+
+def test_large_values(db):
+    value = os.urandom(1 << 20)
+    db.put(b'big', value)
+    assert db.get(b'big') == value
@@ -0,0 +1,47 @@
+import pytest
+
+from gbrick.db.backend import MEMORY
+from gbrick.db.base import DB
+from gbrick.db.buffered import BufferedDB
+
+
+@pytest.fixture
+def buffered(tmp_path):
+    base = DB(str(tmp_path / 'buffered'), backend=MEMORY)
+    for key in (b'a', b'c', b'e', b'g'):
+        base.put(key, b'base-' + key)
+    db = BufferedDB(base)
+    db.put(b'b', b'new-b')
+    db.put(b'c', b'new-c')
+    db.delete(b'e')
+    db.put(b'h', b'new-h')
+    return db
+
+
+EXPECTED = [(b'a', b'base-a'), (b'b', b'new-b'), (b'c', b'new-c'),
+            (b'g', b'base-g'), (b'h', b'new-h')]
+
+
+def test_iter_merges_overlay_without_flush(buffered):
+    assert list(buffered.iter()) == EXPECTED
+    assert list(buffered.iter(reverse=True)) == EXPECTED[::-1]
+    assert list(buffered.iter(b'b', b'h')) == EXPECTED[1:4]
+    assert list(buffered.iter(b'b', b'h', reverse=True)) == EXPECTED[1:4][::-1]
+    assert buffered.pending == 4
+
+
+def test_snapshot_keeps_overlay_and_base(buffered):
+    snapshot = buffered.snapshot()
+    buffered.put(b'a', b'later')
+    buffered.delete(b'g')
+    buffered.flush()
+
+    assert buffered.pending == 0
+    assert snapshot.get(b'a') == b'base-a'
+    assert snapshot.get(b'e') is None
+    assert snapshot.get(b'c') == b'new-c'
+    assert list(buffered.iter(snapshot=snapshot)) == EXPECTED
+    snapshot.close()
+
+    assert list(buffered.iter()) == [(b'a', b'later'), (b'b', b'new-b'),
+                                     (b'c', b'new-c'), (b'h', b'new-h')]
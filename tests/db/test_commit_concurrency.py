@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import time
+
+from factory import DBContext, make_address, make_block
+
+from gbrick.db.state import StateDB
+from gbrick.wagon.wagon import Wagon
+from utils.trie.prepare import make_hash_root
+from utils.trie.util import NONE_ROOT
+
+ACCOUNTS = 1200
+
+
+def _slow_batches(db, delay):
+    # the pool write takes a while, readers run meanwhile
+    write_batch = db.write_batch
+
+    class SlowBatch:
+        def __init__(self, sync=False):
+            self._batch = write_batch(sync=sync)
+
+        def __enter__(self):
+            return self._batch.__enter__()
+
+        def __exit__(self, *exc):
+            time.sleep(delay)
+            return self._batch.__exit__(*exc)
+
+    db.write_batch = SlowBatch
+
+
+def _genesis(tmp_path):
+    context = DBContext(tmp_path)
+    state = context.state
+    state.set_root(NONE_ROOT)
+    for i in range(ACCOUNTS):
+        state.set_balance(make_address(i), 1000 + i)
+    state.commit()
+    state.clear()
+    return context
+
+
+def test_loop_reads_during_finalize_async(tmp_path):
+    context = _genesis(tmp_path)
+    state = context.state
+    genesis_root = state.state_root
+    wagon = Wagon(context, make_block(0).header.copy(hash_state_root=genesis_root))
+    assert wagon.state.state_db is state
+
+    # block 1 changes the first half
+    for i in range(ACCOUNTS // 2):
+        state.compute_balance(make_address(i), 5)
+    expected_root = state.cache_trie_root
+    wagon._trie = make_hash_root([])
+    _slow_batches(state._db._db, 0.05)
+    _slow_batches(context.chain.db._db, 0.05)
+
+    async def reader(first, done):
+        # untouched half, then accounts nobody has, every read a cache miss
+        # that goes to the pool and inserts into the cache
+        reads = 0
+        for i in range(first, ACCOUNTS, 4):
+            assert await context.async_state.get_balance(make_address(i)) == 1000 + i
+            reads += 1
+        while not done.is_set():
+            address = make_address(ACCOUNTS * (first + 1) + reads)
+            assert await context.async_state.get_balance(address) == 0
+            reads += 1
+        return reads
+
+    async def scenario():
+        done = asyncio.Event()
+        readers = [asyncio.ensure_future(reader(ACCOUNTS // 2 + k, done)) for k in range(4)]
+        await asyncio.sleep(0)
+        await wagon.finalize_async(make_block(1))
+        done.set()
+        return await asyncio.gather(*readers)
+
+    interval = sys.getswitchinterval()
+    # switch threads often, commit and pool readers interleave
+    sys.setswitchinterval(1e-6)
+    try:
+        reads = asyncio.new_event_loop().run_until_complete(scenario())
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(reads)
+    assert state.state_root == expected_root != genesis_root
+
+    # what went to disk, through a fresh state db
+    fresh = StateDB(state.db)
+    fresh.set_root(expected_root)
+    for i in range(ACCOUNTS):
+        assert fresh.get_balance(make_address(i)) == 1000 + i + (5 if i < ACCOUNTS // 2 else 0)
+    assert context.chain.head[0] == 1
+
+
+def test_raw_writes_staged_during_commit_stay_pending(tmp_path):
+    context = _genesis(tmp_path)
+    state = context.state
+    state.set_minimum(7)
+    prepared = state.prepare_commit()
+    # staged after the copy, belongs to the next commit
+    state._raw_put(b'late', b'value')
+    state.write_commit(prepared)
+    state.finish_commit(prepared)
+    assert state.get_minimum() == 7
+    assert state._pending == {b'late': b'value'}
+    assert b'late' not in state.db
@@ -0,0 +1,150 @@
+import os
+import pickle
+
+from factory import make_block, make_transaction, make_vote
+
+from gbrick.db import record
+from gbrick.db.backend import MEMORY
+from gbrick.db.base import DB
+from gbrick.db.chain import ChainDB
+from gbrick.db.config import body_key, height_key
+from gbrick.db.freezer import Freezer
+from utils.util import int_to_bytes32
+
+
+class _ChainDB(ChainDB):
+    _freeze_depth = 2
+    _freeze_batch = 256
+
+
+def _items(count, size=30):
+    return [bytes([i]) * size for i in range(count)]
+
+
+def _fill(path, items, segment_size=1 << 20):
+    freezer = Freezer(str(path), segment_size=segment_size)
+    for item in items:
+        freezer.append(item)
+    freezer.sync()
+    freezer.close()
+
+
+def test_repair_cuts_torn_index_entry(tmp_path):
+    items = _items(3)
+    _fill(tmp_path, items)
+    with open(str(tmp_path / 'blocks.idx'), 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    freezer = Freezer(str(tmp_path))
+    assert len(freezer) == 3
+    assert os.path.getsize(str(tmp_path / 'blocks.idx')) == 3 * 16
+    assert [bytes(freezer.get(i)) for i in range(3)] == items
+    assert freezer.append(b'next') == 3
+    assert bytes(freezer.get(3)) == b'next'
+    freezer.close()
+
+
+def test_repair_drops_items_missing_segment_data(tmp_path):
+    items = _items(3)
+    _fill(tmp_path, items)
+    segment = str(tmp_path / 'blocks.0000.seg')
+    with open(segment, 'r+b') as f:
+        f.truncate(2 * 30 + 10)
+
+    freezer = Freezer(str(tmp_path))
+    assert len(freezer) == 2
+    # the unacknowledged tail of the segment is cut as well
+    assert os.path.getsize(segment) == 2 * 30
+    assert freezer.append(b'next') == 2
+    assert [bytes(freezer.get(i)) for i in range(3)] == items[:2] + [b'next']
+    freezer.close()
+
+
+def test_repair_drops_items_of_missing_segment(tmp_path):
+    items = _items(5)
+    _fill(tmp_path, items, segment_size=64)
+    os.remove(str(tmp_path / 'blocks.0002.seg'))
+
+    freezer = Freezer(str(tmp_path), segment_size=64)
+    assert len(freezer) == 4
+    assert [bytes(freezer.get(i)) for i in range(4)] == items[:4]
+    freezer.close()
+
+
+def test_segment_roll_over(tmp_path):
+    items = _items(5)
+    _fill(tmp_path, items, segment_size=64)
+    segments = sorted(name for name in os.listdir(str(tmp_path)) if name.endswith('.seg'))
+    assert segments == ['blocks.0000.seg', 'blocks.0001.seg', 'blocks.0002.seg']
+    assert [os.path.getsize(str(tmp_path / name)) for name in segments] == [60, 60, 30]
+
+    freezer = Freezer(str(tmp_path), segment_size=64)
+    assert [bytes(freezer.get(i)) for i in range(5)] == items
+    # reopened head keeps filling the last segment
+    assert freezer.append(b'x' * 30) == 5
+    assert os.path.getsize(str(tmp_path / 'blocks.0002.seg')) == 60
+    assert freezer.append(b'y' * 30) == 6
+    assert os.path.getsize(str(tmp_path / 'blocks.0003.seg')) == 30
+    assert bytes(freezer.get(6)) == b'y' * 30
+    freezer.close()
+
+
+def _block(height):
+    return make_block(height,
+                      [make_transaction(height * 10 + i) for i in range(3)],
+                      [make_vote(height * 10 + i, height) for i in range(2)])
+
+
+def test_reads_across_the_freeze_boundary(tmp_path):
+    db = DB(str(tmp_path / 'chain'), backend=MEMORY)
+    freezer = Freezer(str(tmp_path / 'ancient'))
+    chain = _ChainDB(db, freezer)
+    blocks = [_block(height) for height in range(6)]
+    for block in blocks:
+        chain.commit(block)
+
+    assert chain.frozen == 4
+    for height in range(4):
+        assert int_to_bytes32(height) not in db
+        assert body_key(blocks[height].hash) not in db
+
+    # fresh instance, nothing cached
+    chain = _ChainDB(db, freezer)
+    for height, block in enumerate(blocks):
+        assert chain.get_header_from_height(height).to_dict() == block.header.to_dict()
+        assert chain.get_block_from_height(height).to_dict() == block.to_dict()
+        assert chain.get_block_from_hash(block.hash).to_dict() == block.to_dict()
+
+    assert [b.to_dict() for b in chain.iter_blocks()] == [b.to_dict() for b in blocks]
+    assert [b.to_dict() for b in chain.iter_blocks(2, 6)] == [b.to_dict() for b in blocks[2:]]
+    assert [h.to_dict() for h in chain.iter_blocks(3, 5, headers_only=True)] == \
+        [b.header.to_dict() for b in blocks[3:5]]
+    freezer.close()
+
+
+def test_freeze_splits_legacy_full_block(tmp_path):
+    db = DB(str(tmp_path / 'chain'), backend=MEMORY)
+    blocks = [_block(height) for height in range(4)]
+    chain = ChainDB(db)
+    for block in blocks[:2]:
+        chain.commit(block)
+    legacy = blocks[0]
+    db.put(int_to_bytes32(0), pickle.dumps(legacy.header.to_dict(), protocol=2))
+    db.delete(body_key(legacy.hash))
+    db.delete(height_key(legacy.hash))
+    db.put(legacy.hash, pickle.dumps(legacy.to_dict(), protocol=2))
+
+    freezer = Freezer(str(tmp_path / 'ancient'))
+    chain = _ChainDB(db, freezer)
+    for block in blocks[2:]:
+        chain.commit(block)
+
+    assert chain.frozen == 2
+    assert legacy.hash not in db
+    assert record.decode_height(db.get(height_key(legacy.hash))) == 0
+    raw_header, raw_body = record.split_ancient(freezer.get(0))
+    assert not record.is_legacy(bytes(raw_header))
+    assert not record.is_legacy(bytes(raw_body))
+    assert chain.get_block_from_hash(legacy.hash).to_dict() == legacy.to_dict()
+    assert chain.get_header_from_height(0).to_dict() == legacy.header.to_dict()
+    freezer.close()
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from factory import (
+    DBContext, GenesisConstant, extend_test_chain, make_address, make_transaction,
+    make_transfer, prepare_test_chain
+)
+
+import gbrick.chains.chain as chain_module
+import gbrick.validation as validation
+from gbrick.db import record
+from gbrick.db.chain import history_entries
+from gbrick.db.config import history_position, history_prefix
+
+BLOCKS = 5
+PER_BLOCK = 3
+
+
+async def _verified(msg_hash, sig, sender):
+    pass
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    monkeypatch.setattr(chain_module, 'verify', _verified)
+    context = DBContext(tmp_path)
+    chain = prepare_test_chain(context)
+
+    async def generate():
+        for height in range(1, BLOCKS + 1):
+            await extend_test_chain(chain, [make_transfer(height * 10 + i) for i in range(PER_BLOCK)])
+    asyncio.run(generate())
+    return context, chain
+
+
+def _expected_history(context, address):
+    prefix = history_prefix(address)
+    entries = []
+    for block in context.chain.iter_blocks():
+        for key, raw in history_entries(block.height, block.list_transactions):
+            if key.startswith(prefix):
+                flags, tx_hash = record.decode_history(raw)
+                entries.append((*history_position(key), tx_hash, flags))
+    return sorted(entries, reverse=True)
+
+
+def test_history_pages(generated):
+    context, chain = generated
+    creator = GenesisConstant.creator
+    expected = _expected_history(context, creator)
+    assert len(expected) == BLOCKS * PER_BLOCK
+    assert list(context.chain.iter_history(creator)) == expected
+
+    for limit in (4, 5, len(expected), len(expected) + 1):
+        pages, cursor = [], None
+        while True:
+            entries, cursor = chain.get_account_history(creator, limit, cursor)
+            assert len(entries) <= limit
+            pages.extend((e['height'], e['index'], e['tx_hash']) for e in entries)
+            if cursor is None:
+                break
+            assert cursor == (entries[-1]['height'], entries[-1]['index'])
+        assert pages == [entry[:3] for entry in expected]
+
+    # the cursor is exclusive, a page starts right below it
+    assert next(context.chain.iter_history(creator, (3, 1)))[:2] == (3, 0)
+    assert next(context.chain.iter_history(creator, (3, 0)))[:2] == (2, PER_BLOCK - 1)
+    assert list(context.chain.iter_history(creator, (1, 0))) == []
+
+    recipient = make_transfer(2 * 10 + 1).address_recipient
+    entries, cursor = chain.get_account_history(recipient)
+    assert cursor is None
+    assert [(e['height'], e['index'], e['sent'], e['received']) for e in entries] == \
+        [(2, 1, False, True)]
+
+
+def test_history_entries_of_a_self_transfer():
+    address = make_address('self')
+    entries = history_entries(7, [make_transaction(1, sender=address, recipient=address)])
+    assert len(entries) == 1
+    flags, _ = record.decode_history(entries[0][1])
+    assert flags == record.HISTORY_SENT | record.HISTORY_RECEIVED
+    assert history_position(entries[0][0]) == (7, 0)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from factory import DBContext, extend_test_chain, make_transfer, prepare_test_chain
+
+import gbrick.chains.chain as chain_module
+import gbrick.validation as validation
+from gbrick.db.chain import ChainDB
+from gbrick.db.config import body_key
+
+BLOCKS = 5
+PER_BLOCK = 3
+
+
+async def _verified(msg_hash, sig, sender):
+    pass
+
+
+def _extend(chain, first, count):
+    async def generate():
+        for height in range(first, first + count):
+            await extend_test_chain(chain, [make_transfer(height * 10 + i) for i in range(PER_BLOCK)])
+    asyncio.run(generate())
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    monkeypatch.setattr(chain_module, 'verify', _verified)
+    # small read-ahead, the reader blocks on the queue
+    monkeypatch.setattr(ChainDB, '_prefetch_depth', 1)
+    context = DBContext(tmp_path)
+    chain = prepare_test_chain(context)
+    _extend(chain, 1, BLOCKS)
+    return context, chain
+
+
+def _reader_alive():
+    return any(thread.name == 'chain-iter' for thread in threading.enumerate())
+
+
+def test_iter_blocks_reads_one_snapshot(generated):
+    context, chain = generated
+    blocks = context.chain.iter_blocks(0, BLOCKS + 10)
+    first = next(blocks)
+    # written while the reader is still walking the range
+    _extend(chain, BLOCKS + 1, 2)
+    rest = list(blocks)
+
+    assert [block.height for block in [first] + rest] == list(range(BLOCKS + 1))
+    for block in rest:
+        assert block.to_dict() == context.chain.get_block_from_height(block.height).to_dict()
+    assert not _reader_alive()
+    assert len(list(context.chain.iter_blocks())) == BLOCKS + 3
+
+
+def test_early_close_stops_the_reader(generated):
+    context, _ = generated
+    blocks = context.chain.iter_blocks()
+    next(blocks)
+    assert _reader_alive()
+    blocks.close()
+    assert not _reader_alive()
+
+    for _ in zip(range(2), context.chain.iter_blocks(1)):
+        pass
+    assert not _reader_alive()
+
+
+def test_headers_only_skips_bodies(generated):
+    context, _ = generated
+    header = context.chain.get_header_from_height(3)
+    context.chain.db.delete(body_key(header.hash))
+
+    headers = list(context.chain.iter_blocks(1, BLOCKS + 1, headers_only=True))
+    assert [h.to_dict() for h in headers] == \
+        [context.chain.get_header_from_height(height).to_dict() for height in range(1, BLOCKS + 1)]
+    with pytest.raises(KeyError):
+        list(context.chain.iter_blocks(1, BLOCKS + 1))
+    assert not _reader_alive()
@@ -0,0 +1,94 @@
+import pickle
+
+from factory import make_block, make_transaction, make_vote
+
+from gbrick.db import record
+from gbrick.db.backend import MEMORY
+from gbrick.db.base import DB
+from gbrick.db.chain import ChainDB
+from gbrick.db.config import body_key, height_key
+from gbrick.db.state import StateDB
+from gbrick.tools.migrate_records import migrate_records
+from utils.config import Lookup
+from utils.util import int_to_bytes32
+
+
+def _legacy(value):
+    return pickle.dumps(value, protocol=2)
+
+
+def _chain(tmp_path):
+    db = DB(str(tmp_path / 'chain'), backend=MEMORY)
+    blocks = []
+    chain = ChainDB(db)
+    for height in range(3):
+        block = make_block(height,
+                           [make_transaction(height * 10 + i) for i in range(3)],
+                           [make_vote(height * 10 + i, height) for i in range(2)])
+        chain.commit(block)
+        blocks.append(block)
+    return db, blocks
+
+
+def test_legacy_records_are_read_not_rewritten(tmp_path):
+    db, blocks = _chain(tmp_path)
+    block = blocks[1]
+    lookup = Lookup.transaction(block.list_transactions[2].hash)
+    db.put(int_to_bytes32(1), _legacy(block.header.to_dict()))
+    db.put(lookup, _legacy((1, 2)))
+
+    chain = ChainDB(db)
+    assert chain.get_header_from_height(1).to_dict() == block.header.to_dict()
+    assert chain._load_lookup(lookup) == (1, 2)
+    assert record.is_legacy(db.get(int_to_bytes32(1)))
+    assert record.is_legacy(db.get(lookup))
+
+
+def test_legacy_full_block_is_read_not_rewritten(tmp_path):
+    db, blocks = _chain(tmp_path)
+    block = blocks[0]
+    db.delete(body_key(block.hash))
+    db.delete(height_key(block.hash))
+    db.put(block.hash, _legacy(block.to_dict()))
+
+    chain = ChainDB(db)
+    assert chain.get_block_from_hash(block.hash).to_dict() == block.to_dict()
+    assert chain.get_header_from_hash(block.hash).to_dict() == block.header.to_dict()
+    assert chain.get_block_from_height(0).to_dict() == block.to_dict()
+    assert record.is_legacy(db.get(block.hash))
+    assert body_key(block.hash) not in db
+    assert height_key(block.hash) not in db
+
+
+def test_migrate_records(tmp_path):
+    db, blocks = _chain(tmp_path)
+    header = blocks[1].header
+    db.put(int_to_bytes32(1), _legacy(header.to_dict()))
+    db.put(Lookup.transaction(blocks[1].list_transactions[2].hash), _legacy((1, 2)))
+    db.put(Lookup.vote(blocks[2].list_vote[1].hash), _legacy((2, 1)))
+    # full block under its hash, before the header/body split
+    db.delete(body_key(blocks[0].hash))
+    db.delete(height_key(blocks[0].hash))
+    db.put(blocks[0].hash, _legacy(blocks[0].to_dict()))
+
+    assert migrate_records(ChainDB(db)) == (3, 4)
+    assert migrate_records(ChainDB(db)) == (3, 0)
+
+    chain = ChainDB(db)
+    assert not record.is_legacy(db.get(int_to_bytes32(1)))
+    assert chain.get_header_from_height(1).to_dict() == header.to_dict()
+    assert chain._load_lookup(Lookup.transaction(blocks[1].list_transactions[2].hash)) == (1, 2)
+    assert chain._load_lookup(Lookup.vote(blocks[2].list_vote[1].hash)) == (2, 1)
+    assert blocks[0].hash not in db
+    assert chain.get_block_from_hash(blocks[0].hash).to_dict() == blocks[0].to_dict()
+
+
+def test_legacy_delegation_goes_through_pending(tmp_path):
+    db = DB(str(tmp_path / 'state'), backend=MEMORY)
+    state = StateDB(db)
+    key = b'legacy-delegation'
+    db.put(key, _legacy((b'gBx' + b'a' * 40, b'node', 5)))
+
+    assert state._get_delegated(key) == (b'gBx' + b'a' * 40, b'node', 5)
+    assert record.is_legacy(db.get(key))
+    assert record.decode_delegation(state._raw_get(key)) == (b'gBx' + b'a' * 40, b'node', 5)
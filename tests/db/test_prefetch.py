@@ -0,0 +1,99 @@
+import asyncio
+import sys
+
+from factory import (
+    DBContext, GenesisConstant, make_address, make_test_votes, make_transfer,
+    prepare_test_chain
+)
+
+import gbrick.validation as validation
+from gbrick.types.prepare import prepare_block
+from utils.trie.prepare import make_hash_root
+from utils.trie.util import NONE_ROOT
+
+ACCOUNTS = 800
+
+
+def _state(tmp_path):
+    context = DBContext(tmp_path)
+    state = context.state
+    state.set_root(NONE_ROOT)
+    for i in range(ACCOUNTS):
+        state.set_balance(make_address(i), 1000 + i)
+    state.commit()
+    state.clear()
+    state._warm.clear()
+    state._nodes._data.clear()
+    state.account_loads = 0
+    return context
+
+
+def test_prefetch_worker_only_reads(tmp_path):
+    state = _state(tmp_path).state
+    addresses = [make_address(i) for i in range(0, ACCOUNTS * 2, 2)]
+    trie_cache = dict(state._trie.cache)
+
+    result = state.prefetch(addresses)
+    assert state._cache == {}
+    assert state.account_loads == 0
+    assert state._trie.cache == trie_cache
+    assert len(state._nodes) == 0
+    assert result.loads == len(addresses)
+
+    assert state.merge_prefetch(result) == len(addresses)
+    assert state.account_loads == len(addresses)
+    assert set(state._cache) == set(addresses)
+    assert len(state._nodes) > 0
+    assert state.get_balance(make_address(10)) == 1010
+    assert state.get_balance(make_address(ACCOUNTS + 10)) == 0
+    assert state.account_loads == len(addresses)
+
+
+def test_prefetch_result_of_another_root_is_dropped(tmp_path):
+    state = _state(tmp_path).state
+    result = state.prefetch([make_address(1)])
+    state.set_root(NONE_ROOT)
+    assert state.merge_prefetch(result) == 0
+    assert state._cache == {}
+
+
+def test_async_prefetch_counts_every_worker(tmp_path):
+    context = _state(tmp_path)
+    addresses = [make_address(i) for i in range(ACCOUNTS * 2)]
+
+    interval = sys.getswitchinterval()
+    # switch threads often, the workers interleave
+    sys.setswitchinterval(1e-6)
+    try:
+        loaded = asyncio.new_event_loop().run_until_complete(
+            context.async_state.prefetch(addresses))
+    finally:
+        sys.setswitchinterval(interval)
+    assert loaded == context.state.account_loads == len(addresses)
+    assert set(context.state._cache) == set(addresses)
+
+
+def test_execution_after_a_dropped_one_is_repeatable(tmp_path, monkeypatch):
+    # a proposer executes its block, drops the wagon, then finalizes it
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    context = DBContext(tmp_path)
+    chain = prepare_test_chain(context)
+    head = chain.get_header_from_height(0)
+    transactions = [make_transfer(i) for i in range(3)]
+    header = chain.prepare_candidate_from_header(head).header.propose(
+        make_hash_root(transactions).root, head.timestamp + 1)
+    block = prepare_block(header=header, list_transactions=transactions,
+                          list_vote=make_test_votes(header))
+
+    async def execute():
+        wagon = chain.get_wagon()
+        executed = await wagon.execute_transactions(1, block)
+        wagon.clear()
+        return executed.header.hash_state_root
+
+    roots = [asyncio.run(execute()) for _ in range(3)]
+    assert roots[0] == roots[1] == roots[2] != head.hash_state_root
+    context.state.set_root(head.hash_state_root)
+    assert context.state.get_balance(transactions[0].address_recipient) == 0
+    assert context.state.get_balance(GenesisConstant.creator) == GenesisConstant.published_balance \
+        - len(GenesisConstant.constant_validator) * GenesisConstant.minimum
@@ -0,0 +1,113 @@
+from factory import DBContext, make_address, make_hash
+
+from utils.trie.util import NONE_ROOT
+
+
+def _register(state, i, stake):
+    address = make_address(('candidate', i))
+    state.set_balance(address, stake)
+    state.set_delegated(address, address, stake)
+    state.register_validator(address, make_address(('candidate-node', i)), make_hash(i))
+    return make_address(('candidate-node', i))
+
+
+def _state(tmp_path):
+    state = DBContext(tmp_path).state
+    state.set_root(NONE_ROOT)
+    state.set_minimum(1)
+    state.set_balance(make_address(0), 10)
+    state.commit()
+    return state
+
+
+def test_nested_snapshots_restore_each_entry(tmp_path):
+    state = _state(tmp_path)
+    first = _register(state, 0, 100)
+    state.elect(limit=1)
+    state.commit()
+    a, b = make_address(1), make_address(2)
+    committed = state._trie.root
+
+    outer = state.snapshot()
+    state.set_balance(a, 5)
+    state.set_minimum(2)
+
+    inner = state.snapshot()
+    state.set_balance(a, 7)
+    state.set_balance(b, 1)
+    state.set_minimum(3)
+    state.flush_accounts()
+    second = _register(state, 1, 200)
+    state.elect(limit=1)
+    assert state.get_validator_id() == {second}
+    assert state.get_minimum() == 3
+
+    state.revert(inner)
+    # _VALIDATORS
+    assert state.get_validator_id() == {first}
+    # _PENDING over a pending value
+    assert state.get_minimum() == 2
+    # _FLUSH, then _ACCOUNT with the previous dirty flag
+    assert state.get_balance(a) == 5
+    assert state.get_balance(b) == 0
+    assert state._dirty == {a}
+    assert state._trie.root == committed
+
+    state.revert(outer)
+    # _PENDING over a committed value
+    assert state.get_minimum() == 1
+    assert state.get_balance(a) == 0
+    assert not state._dirty
+    assert not state._journal
+    assert state.cache_trie_root == committed
+
+
+def test_revert_after_flush_restores_root_and_dirty(tmp_path):
+    state = _state(tmp_path)
+    a, b = make_address(1), make_address(2)
+    state.set_balance(a, 5)
+    before = state._trie.root
+
+    snapshot_id = state.snapshot()
+    state.set_balance(b, 6)
+    state.set_balance(a, 7)
+    flushed = state.cache_trie_root
+    assert flushed != before
+    assert not state._dirty
+
+    state.revert(snapshot_id)
+    assert state._trie.root == before
+    assert state._dirty == {a}
+    assert state.get_balance(a) == 5
+    assert state.get_balance(b) == 0
+
+    other = DBContext(tmp_path / 'other').state
+    other.set_root(NONE_ROOT)
+    other.set_minimum(1)
+    other.set_balance(make_address(0), 10)
+    other.set_balance(a, 5)
+    assert state.cache_trie_root == other.cache_trie_root
+
+
+def test_discard_outer_snapshot_clears_journal(tmp_path):
+    state = _state(tmp_path)
+    a = make_address(1)
+
+    outer = state.snapshot()
+    state.set_balance(a, 5)
+    inner = state.snapshot()
+    state.set_balance(a, 6)
+    state.set_minimum(2)
+
+    state.discard(inner)
+    assert state._journal
+    assert len(state._snapshots) == 1
+
+    state.discard(outer)
+    assert not state._journal
+    assert not state._snapshots
+    assert state.get_balance(a) == 6
+    assert state.get_minimum() == 2
+    # no snapshot open, nothing is journaled
+    state.set_balance(a, 7)
+    assert not state._journal
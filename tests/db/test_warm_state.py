@@ -0,0 +1,41 @@
+from factory import DBContext, make_address
+
+from utils.trie.util import NONE_ROOT
+
+
+def _balance(state, address):
+    state.account_loads = 0
+    balance = state.get_balance(address)
+    return balance, state.account_loads
+
+
+def test_warm_accounts_follow_the_committed_root(tmp_path):
+    state = DBContext(tmp_path).state
+    a, b = make_address(1), make_address(2)
+    state.set_root(NONE_ROOT)
+    state.set_balance(a, 1)
+    state.set_balance(b, 2)
+    state.commit()
+    first = state.state_root
+
+    # next block on the committed root, warm accounts are reused
+    state.set_root(first)
+    assert _balance(state, a) == (1, 0)
+    state.set_balance(a, 3)
+    state.commit()
+    second = state.state_root
+    assert len(state._warm) == 2
+
+    # reorg back to the parent, the warm a=3 must not leak in
+    state.set_root(first)
+    assert len(state._warm) == 0
+    assert _balance(state, a) == (1, 1)
+
+    state.set_balance(b, 4)
+    state.commit()
+    assert state.state_root not in (first, second)
+    # any root other than the committed one drops the warm cache
+    state.set_root(second)
+    assert len(state._warm) == 0
+    assert _balance(state, a) == (3, 1)
+    assert _balance(state, b) == (2, 1)
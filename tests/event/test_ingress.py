@@ -0,0 +1,47 @@
+import asyncio
+
+from event.manager.ingress import IngressPipeline
+
+
+def _run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_worker_survives_admit_error():
+    seen = []
+
+    async def admit(tag, result, error):
+        if tag == 0:
+            raise RuntimeError("channel closed")
+        seen.append(tag)
+
+    async def scenario():
+        pipeline = IngressPipeline(decode=lambda payload: payload,
+                                   admit=admit, concurrency=1, queue_size=8)
+        pipeline.start()
+        for tag in range(3):
+            assert pipeline.offer(b'payload', tag)
+        await pipeline._queue.join()
+        pipeline.stop()
+        return pipeline
+
+    pipeline = _run(scenario())
+    assert seen == [1, 2]
+    assert pipeline.failed == 1
+    assert pipeline.in_flight == 0
+
+
+def test_offer_sheds_when_full():
+    async def admit(tag, result, error):
+        pass
+
+    async def scenario():
+        pipeline = IngressPipeline(decode=lambda payload: payload,
+                                   admit=admit, concurrency=1, queue_size=2)
+        # workers not started, nothing drains the queue
+        pipeline._queue = asyncio.Queue(maxsize=2)
+        return [pipeline.offer(b'payload', tag) for tag in range(3)], pipeline
+
+    offered, pipeline = _run(scenario())
+    assert offered == [True, True, False]
+    assert pipeline.shed == 1
@@ -0,0 +1,160 @@
+import hashlib
+
+from utils.trie.prepare import make_hash_root
+from utils.trie.util import NONE_ROOT
+
+from gbrick.types.prepare import prepare_block, prepare_header, prepare_transaction, prepare_vote
+
+
+def make_hash(i):
+    return hashlib.sha3_256(str(i).encode()).hexdigest().encode()
+
+
+def make_address(i):
+    return b'gBx' + make_hash(i)[:40]
+
+
+def make_transaction(i, sender=None, recipient=None, value=None, fee=10 ** 6):
+    return prepare_transaction(num_version=1,
+                               type_transaction='transfer',
+                               address_sender=sender or make_address(i),
+                               address_recipient=recipient or make_address(-i),
+                               amount_value=i * 10 ** 8 if value is None else value,
+                               amount_fee=fee,
+                               message={},
+                               timestamp=1550000000.123 + i,
+                               tx_hash=make_hash(('tx', i)),
+                               signature=make_hash(i) + make_hash(i + 1) + b'1b')
+
+
+def make_vote(i, height=5, candidate=None):
+    return prepare_vote(num_version=1,
+                        num_block_height=height,
+                        hash_candidate_block=candidate or make_hash(1),
+                        address_creator=make_address(i),
+                        vote_hash=make_hash(('vote', i)),
+                        signature=make_hash(i) + make_hash(2))
+
+
+def make_block(height=5, transactions=(), votes=(), prev_hash=None):
+    header = prepare_header(hash_prev_block=prev_hash or make_hash(0),
+                            num_height=height,
+                            address_creator=make_address(9),
+                            num_version=1,
+                            chain_id=1,
+                            hash_transaction_root=make_hash(3),
+                            timestamp=1550000000.5,
+                            signature=make_hash(4) + make_hash(5))
+    header = header.copy(hash_block=header.hash)
+    return prepare_block(header=header, list_transactions=list(transactions), list_vote=list(votes))
+
+
+class DBContext:
+    """ memory backed chain / state dbs, no freezer
+    """
+
+    def __init__(self, path, buffered=False):
+        from gbrick.db.aio import AsyncChainDB, AsyncStateDB
+        from gbrick.db.backend import MEMORY
+        from gbrick.db.base import DB
+        from gbrick.db.buffered import BufferedDB
+        from gbrick.db.chain import ChainDB
+        from gbrick.db.state import StateDB
+        from utils.metrics import LoopLagMonitor
+
+        chain_db = DB(str(path) + '/chain', backend=MEMORY)
+        state_db = DB(str(path) + '/state', backend=MEMORY)
+        if buffered:
+            chain_db, state_db = BufferedDB(chain_db), BufferedDB(state_db)
+        self.chain = ChainDB(chain_db)
+        self.state = StateDB(state_db)
+        self.async_chain = AsyncChainDB(self.chain)
+        self.async_state = AsyncStateDB(self.state)
+        self.loop_lag = LoopLagMonitor()
+
+    def flush(self, sync=False):
+        for db in (self.state.db, self.chain.db):
+            if hasattr(db, 'flush'):
+                db.flush(sync)
+
+
+class GenesisConstant:
+    """ genesis of generated chains, three validators with the minimum stake
+    """
+    height = 0
+    constant_ver = 1
+    constant_id = 1
+    minimum = 10 ** 18
+    published_balance = 10 ** 24
+    creator = make_address('creator')
+    none_root = NONE_ROOT
+    constant_validator = [(make_address(('validator', i)),
+                           make_address(('node', i)),
+                           make_hash(('node-signature', i)))
+                          for i in range(3)]
+
+
+def prepare_test_chain(context):
+    """ Chain is a singleton, point it at context and seal the genesis
+    :return: Chain
+    """
+    import datetime
+    from gbrick.chains.chain import Chain
+    from gbrick.wagon.wagon import Wagon
+
+    chain = Chain()
+    chain._db_context = context
+    chain._signer = lambda hash_data: make_hash(hash_data) + make_hash(b'signature')
+    chain._node_base = make_address('proposer')
+    chain._start_at = datetime.datetime.now()
+    chain._loop = None
+
+    header = prepare_header(hash_prev_block=b'',
+                            num_height=GenesisConstant.height,
+                            address_creator=b'',
+                            num_version=GenesisConstant.constant_ver,
+                            chain_id=GenesisConstant.constant_id)
+    block = prepare_block(header=header, list_vote=[], list_transactions=[])
+    block = Wagon(context, None).genesis_declare(block, GenesisConstant)
+    context.chain.commit(block.copy(header=block.header.seal()))
+    return chain
+
+
+def make_transfer(i, value=10 ** 8, fee=10 ** 15, sender=None):
+    transaction = make_transaction(i,
+                                   sender=sender or GenesisConstant.creator,
+                                   recipient=make_address(('recipient', i)),
+                                   value=value,
+                                   fee=fee)
+    return transaction.copy(hash_transaction=transaction.hash)
+
+
+def make_test_votes(header, node_ids=None):
+    """ votes on the candidate header, by every genesis validator if node_ids is None
+    """
+    if node_ids is None:
+        node_ids = [node_id for _, node_id, _ in GenesisConstant.constant_validator]
+    votes = []
+    for node_id in node_ids:
+        vote = prepare_vote(num_version=1,
+                            num_block_height=header.num_height,
+                            hash_candidate_block=header.hash_candidate_block,
+                            address_creator=node_id,
+                            signature=make_hash(node_id) + make_hash(2))
+        votes.append(vote.copy(hash_vote=vote.hash))
+    return votes
+
+
+async def extend_test_chain(chain, transactions=()):
+    """ propose, vote (every validator) and finalize the next block.
+    signatures are not real, stub utils.crypto verification.
+    :return: finalized block
+    """
+    head = chain.get_header_from_height(chain.height)
+    candidate = chain.prepare_candidate_from_header(head)
+    header = candidate.header.propose(make_hash_root(list(transactions)).root,
+                                      head.timestamp + 1)
+    block = await chain.make_finalize_from_confirm(
+        candidate.copy(header=header, list_transactions=list(transactions)), make_test_votes(header))
+    await chain.finalize(block)
+    return block
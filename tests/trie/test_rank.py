@@ -0,0 +1,89 @@
+import pickle
+import random
+
+import pytest
+
+from utils.exceptions import SerializeError
+from utils.trie.rank import RankTree
+from utils.trie.util import NONE_ROOT
+
+
+class _Batch:
+    def __init__(self, data):
+        self.data = data
+
+    def put(self, key, value):
+        self.data[key] = value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _DB:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data[key]
+
+    def write_batch(self):
+        return _Batch(self.data)
+
+
+def _rep(i):
+    return {'node_id': 'node{}'.format(i), 'account': 'gBx{:040x}'.format(i), 'delegate': i}
+
+
+def _key(i):
+    return (1000 - i).to_bytes(32, byteorder='big') + 'node{}'.format(i).encode()
+
+
+def _tree(order, db=None):
+    tree = RankTree(NONE_ROOT, db)
+    for i in order:
+        tree.put(_key(i), _rep(i))
+    return tree
+
+
+def test_root_is_order_independent():
+    order = list(range(40))
+    first = _tree(order).root
+    random.Random(7).shuffle(order)
+    assert _tree(order).root == first
+
+
+def test_top_and_remove():
+    tree = _tree(range(20))
+    assert [v['delegate'] for _, v in tree.top(5)] == [19, 18, 17, 16, 15]
+    tree.remove(_key(19))
+    assert [v['delegate'] for _, v in tree.top(2)] == [18, 17]
+    assert tree.root == _tree(range(19)).root
+    with pytest.raises(KeyError):
+        tree.remove(_key(19))
+
+
+def test_stored_nodes_are_not_pickle():
+    db = _DB()
+    tree = _tree(range(10), db)
+    tree.commit()
+    reloaded = RankTree(tree.root, db)
+    assert reloaded.get(_key(3)) == _rep(3)
+    assert [k for k, _ in reloaded.top()] == [k for k, _ in tree.top()]
+    for raw in db.data.values():
+        assert raw[0] == 0x01
+        with pytest.raises(Exception):
+            pickle.loads(raw)
+
+
+def test_unknown_node_is_rejected():
+    tree = RankTree(NONE_ROOT, _DB())
+    node = [_key(1), _rep(1), NONE_ROOT, NONE_ROOT]
+    raw = tree.serialize(node)
+    assert tree.deserialize(raw) == node
+    with pytest.raises(SerializeError):
+        tree.deserialize(pickle.dumps(node))
+    with pytest.raises(SerializeError):
+        tree.deserialize(raw[:-1])
@@ -0,0 +1,100 @@
+import hashlib
+import json
+
+import pytest
+
+from gbrick.types import wire
+from gbrick.types.prepare import prepare_block, prepare_header, prepare_transaction, prepare_vote
+from utils.exceptions import SerializeError
+
+
+def _hash(i):
+    return hashlib.sha3_256(str(i).encode()).hexdigest().encode()
+
+
+def _transaction(i):
+    return prepare_transaction(num_version=1,
+                               type_transaction='transfer',
+                               address_sender=b'gBx' + _hash(i)[:40],
+                               address_recipient=b'gBx' + _hash(-i)[:40],
+                               amount_value=i * 10 ** 18,
+                               amount_fee=10 ** 6,
+                               message={'memo': 'tx {}'.format(i)},
+                               timestamp=1550000000.123 + i,
+                               tx_hash=_hash(i),
+                               signature=_hash(i) + _hash(i + 1) + b'1b')
+
+
+def _vote(i):
+    return prepare_vote(num_version=1,
+                        num_block_height=5,
+                        hash_candidate_block=_hash(1),
+                        address_creator=b'gBx' + _hash(i)[:40],
+                        vote_hash=_hash(i),
+                        signature=_hash(i) + _hash(2))
+
+
+def _block(transactions, votes):
+    header = prepare_header(hash_prev_block=_hash(0),
+                            num_height=5,
+                            address_creator=b'gBx' + _hash(9)[:40],
+                            num_version=1,
+                            chain_id=1,
+                            hash_transaction_root=_hash(3),
+                            timestamp=1550000000.5,
+                            signature=_hash(4) + _hash(5))
+    return prepare_block(header=header, list_transactions=transactions, list_vote=votes)
+
+
+@pytest.mark.parametrize('fmt', [wire.JSON, wire.BINARY])
+@pytest.mark.parametrize('kind, obj', [
+    (wire.TRANSACTION, _transaction(7)),
+    (wire.VOTE, _vote(3)),
+    (wire.BLOCK, _block([_transaction(i) for i in range(50)], [_vote(i) for i in range(4)])),
+    (wire.BLOCK, _block([], [])),
+    (wire.CONFIRM, ['5', 'gBx' + 'a' * 40, 'f' * 64, 'ab' * 65]),
+])
+def test_round_trip(fmt, kind, obj):
+    body = wire.dumps(obj, kind, fmt)
+    expected = obj.to_dict() if hasattr(obj, 'to_dict') else obj
+    assert wire.loads(body) == expected
+
+
+def test_binary_keeps_non_canonical_hex():
+    # upper case, odd length and mixed widths do not survive bytes.hex,
+    # such columns are sent as json
+    values = ['ABCD', 'abc', 'gBx' + 'A' * 40, '', 'ab' * 32]
+    assert wire.loads(wire.dumps(values, wire.CONFIRM, wire.BINARY)) == values
+
+    transactions = [_transaction(1), _transaction(2).copy(tx_hash=b'0' * 62)]
+    block = _block(transactions, [])
+    assert wire.loads(wire.dumps(block, wire.BLOCK, wire.BINARY)) == block.to_dict()
+
+
+def test_binary_is_smaller():
+    block = _block([_transaction(i) for i in range(100)], [])
+    binary = wire.dumps(block, wire.BLOCK, wire.BINARY)
+    assert len(binary) < len(wire.dumps(block, wire.BLOCK, wire.JSON)) * 0.5
+
+
+def test_json_body_bytes():
+    body = wire.dumps(_vote(1), wire.VOTE).encode()
+    assert wire.loads(body) == json.loads(body)
+
+
+@pytest.mark.parametrize('cut', [1, 3, 40, -1])
+def test_truncated_binary(cut):
+    body = wire.dumps(_block([_transaction(1)], [_vote(1)]), wire.BLOCK, wire.BINARY)
+    with pytest.raises(SerializeError):
+        wire.loads(body[:cut])
+
+
+def test_trailing_bytes():
+    body = wire.dumps(_vote(1), wire.VOTE, wire.BINARY)
+    with pytest.raises(SerializeError):
+        wire.loads(body + b'\x00')
+
+
+def test_unknown_format_byte():
+    with pytest.raises(SerializeError):
+        wire.loads(b'\x01\x01\x00')
@@ -0,0 +1,64 @@
+from utils.cache import SizedLRUCache
+
+
+def test_eviction_skips_pinned_keys():
+    cache = SizedLRUCache(30, max_pinned=2)
+    cache.put('a', b'a' * 10)
+    cache.pin('a')
+    cache.put('b', b'b' * 10)
+    cache.put('c', b'c' * 10)
+    cache.put('d', b'd' * 10)
+    # 'a' is the oldest but pinned, 'b' goes
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.bytes == 30
+    assert cache.evictions == 1
+
+    cache.put('e', b'e' * 10)
+    assert 'a' in cache and 'c' not in cache
+
+
+def test_oldest_pin_is_released_past_max_pinned():
+    cache = SizedLRUCache(30, max_pinned=2)
+    for key in 'abc':
+        cache.put(key, key.encode() * 10)
+        cache.pin(key)
+    assert cache.stats()['pinned'] == 2
+    # 'a' lost its pin to 'c' and is the first to go
+    cache.put('d', b'd' * 10)
+    assert 'a' not in cache
+    assert all(key in cache for key in 'bcd')
+
+    # every cached key is pinned, nothing can be evicted
+    cache.pin('d')
+    cache.put('e', b'e' * 10)
+    assert 'e' in cache and 'b' not in cache
+
+
+def test_blob_over_the_budget_is_cached_only_when_pinned():
+    cache = SizedLRUCache(30, max_pinned=2)
+    cache.put('a', b'a' * 10)
+    cache.put('big', b'x' * 31)
+    assert 'big' not in cache
+    assert 'a' in cache
+    assert cache.bytes == 10
+
+    cache.pin('big')
+    cache.put('big', b'x' * 31)
+    assert cache.get('big') == b'x' * 31
+    # over budget with only the pinned blob left
+    assert 'a' not in cache
+    assert cache.bytes == 31
+
+    cache.unpin('big')
+    assert 'big' not in cache
+    assert cache.bytes == 0
+
+
+def test_replacing_a_value_keeps_the_byte_count():
+    cache = SizedLRUCache(30)
+    cache.put('a', b'a' * 10)
+    cache.put('a', b'a' * 20)
+    assert cache.bytes == 20
+    cache.delete('a')
+    assert cache.bytes == 0
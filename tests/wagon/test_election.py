@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from factory import (
+    DBContext, GenesisConstant, extend_test_chain, make_address, make_hash,
+    make_test_votes, prepare_test_chain
+)
+
+import gbrick.chains.chain as chain_module
+import gbrick.db.state as state_module
+import gbrick.validation as validation
+from gbrick.types.prepare import prepare_block
+from utils.trie.prepare import make_hash_root
+from utils.trie.util import NONE_ROOT
+
+GENESIS_NODES = {node_id for _, node_id, _ in GenesisConstant.constant_validator}
+
+
+async def _verified(msg_hash, sig, sender):
+    pass
+
+
+def _register(state, i, stake):
+    address = make_address(('candidate', i))
+    state.set_balance(address, stake)
+    state.set_delegated(address, address, stake)
+    state.register_validator(address, make_address(('candidate-node', i)), make_hash(i))
+    return make_address(('candidate-node', i))
+
+
+def test_validator_set_is_frozen_between_elections(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_module, 'ELECTION_EPOCH', 10)
+    state = DBContext(tmp_path).state
+    state.set_root(NONE_ROOT)
+    state.set_minimum(1)
+    first = _register(state, 0, 100)
+    # no election yet, the live ranking
+    assert state.get_validator_id() == {first}
+    assert state.election_due(3)
+
+    state.elect(limit=1)
+    assert not state.election_due(3)
+    assert state.election_due(10)
+    second = _register(state, 1, 200)
+    state.commit()
+    assert state.get_validator_id() == {first}
+
+    state.elect(limit=1)
+    assert state.get_validator_id() == {second}
+    assert state.get_validator(first) is None
+
+
+@pytest.fixture
+def chain(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    monkeypatch.setattr(chain_module, 'verify', _verified)
+    return prepare_test_chain(DBContext(tmp_path))
+
+
+def test_first_block_freezes_the_genesis_set(chain):
+    state = chain._db_context.state
+    assert state.election_due(1)
+    asyncio.run(extend_test_chain(chain))
+    assert not state.election_due(2)
+    assert state.get_validator_id() == GENESIS_NODES
+
+
+def test_votes_outside_the_validator_set_earn_nothing(chain):
+    head = chain.get_header_from_height(0)
+    header = chain.prepare_candidate_from_header(head).header.propose(
+        make_hash_root([]).root, head.timestamp + 1)
+    stranger = make_address('stranger')
+    votes = make_test_votes(header, [stranger] + sorted(GENESIS_NODES))
+    wagon = chain.get_wagon()
+    wagon._total_paid = 10
+
+    voters = wagon.rewarded_voters(prepare_block(header=header, list_transactions=[], list_vote=votes))
+    assert [voter.node_id for voter in voters] == sorted(GENESIS_NODES)
+
+    asyncio.run(wagon.execute_transactions(1, prepare_block(header=header, list_transactions=[],
+                                                            list_vote=votes)))
+    state = wagon.state.state_db
+    rewards = [state.get_balance(voter.address_account) for voter in voters]
+    assert rewards == [4, 3, 3]
+    assert state.get_balance(stranger) == 0
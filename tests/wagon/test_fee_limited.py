@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from factory import (
+    DBContext, GenesisConstant, extend_test_chain, make_address, make_transfer,
+    prepare_test_chain
+)
+
+import gbrick.chains.chain as chain_module
+import gbrick.validation as validation
+from gbrick.wagon.execute_context import Fee
+from utils.trie.prepare import prepare_trie
+
+FUNDED = make_address('funded')
+
+
+async def _verified(msg_hash, sig, sender):
+    pass
+
+
+@pytest.fixture
+def chain(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, 'verify_signature', lambda *args: None)
+    monkeypatch.setattr(chain_module, 'verify', _verified)
+    chain = prepare_test_chain(DBContext(tmp_path))
+    funding = make_transfer(0, value=10 ** 18).copy(address_recipient=FUNDED)
+    asyncio.run(extend_test_chain(chain, [funding.copy(hash_transaction=funding.hash)]))
+    return chain
+
+
+def _total_balance(chain, height):
+    root = chain.get_header_from_height(height).hash_state_root
+    accounts = prepare_trie(root, chain._db_context.state.db).search_all()
+    return sum(account['balance'] for account in accounts)
+
+
+def _nonce(chain, address):
+    state = chain._db_context.state
+    state.set_root(chain.get_header_from_height(chain.height).hash_state_root)
+    return state.get_nonce(address)
+
+
+def test_fee_limited_failure_conserves_balance(chain):
+    limited = Fee.execute // 2
+    transactions = [make_transfer(1), make_transfer(2, fee=limited, sender=FUNDED)]
+    before = _total_balance(chain, 1)
+    creator_nonce, funded_nonce = _nonce(chain, GenesisConstant.creator), _nonce(chain, FUNDED)
+
+    asyncio.run(extend_test_chain(chain, transactions))
+
+    assert _total_balance(chain, 2) == before
+    success, failure = (chain.get_receipt(tx.hash) for tx in transactions)
+    assert (success['status'], success['paid_fee']) == ('completed', Fee.execute)
+    assert (failure['status'], failure['paid_fee']) == ('cancel', limited)
+    state = chain._db_context.state
+    assert state.get_balance(FUNDED) == 10 ** 18 - limited
+    assert state.get_balance(transactions[1].address_recipient) == 0
+
+    # a successful transfer consumes two nonces, a failed one after the fee was charged one
+    assert _nonce(chain, GenesisConstant.creator) == creator_nonce + 2
+    assert _nonce(chain, FUNDED) == funded_nonce + 1
@@ -0,0 +1,148 @@
+import threading
+
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """ thread-safe LRU cache with hit/miss stats
+    """
+
+    def __init__(self, size=256):
+        if size <= 0:
+            raise ValueError('cache size must be positive: {}'.format(size))
+        self._size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'capacity': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate
+        }
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SizedLRUCache(LRUCache):
+    """ thread-safe LRU bounded by total value size in bytes.
+    pinned keys are skipped by eviction, at most max_pinned keys are pinned,
+    pinning one more unpins the oldest.
+    """
+
+    def __init__(self, max_bytes, max_pinned=64, sizeof=len):
+        super().__init__(max_bytes)
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._max_pinned = max_pinned
+        self._pinned = OrderedDict()
+        self.evictions = 0
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizeof(self._data.pop(key))
+            if size > self._size and key not in self._pinned:
+                # never fits, caching it would only flush everything else
+                return
+            self._data[key] = value
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self._size:
+            # oldest unpinned key, at most max_pinned keys are skipped
+            for key in self._data:
+                if key not in self._pinned:
+                    break
+            else:
+                return
+            self._bytes -= self._sizeof(self._data.pop(key))
+            self.evictions += 1
+
+    def pin(self, key):
+        """ keep key cached while it is one of the last max_pinned pins
+        """
+        with self._lock:
+            self._pinned[key] = None
+            self._pinned.move_to_end(key)
+            while len(self._pinned) > self._max_pinned:
+                self._pinned.popitem(last=False)
+            self._evict()
+
+    def unpin(self, key):
+        with self._lock:
+            self._pinned.pop(key, None)
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizeof(self._data.pop(key))
+            self._pinned.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pinned.clear()
+            self._bytes = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            'bytes': self._bytes,
+            'pinned': len(self._pinned),
+            'evictions': self.evictions
+        })
+        return stats
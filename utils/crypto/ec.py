@@ -124,7 +124,7 @@ def sign(msg_hash, pk, k):
     return sig.hex() + v
 
 
-async def recover(msg_hash, sig):
+def recover_public_key(msg_hash, sig):
     r, s, v = parse_curve(sig)
     x = r
     a = ((x * x * x) + (CURVE.a * x) + CURVE.b) % CURVE.p
@@ -141,6 +141,10 @@ async def recover(msg_hash, sig):
     return int_to_bytes32(p) + int_to_bytes32(q)
 
 
+async def recover(msg_hash, sig):
+    return recover_public_key(msg_hash, sig)
+
+
 class ECSigner:
     __slots__ = '_ephem_keystore'
 
@@ -162,10 +166,14 @@ class ECSigner:
         return self.make_signature(obj_hash)
 
 
-async def verify(msg_hash, sig, sender):
+def verify_signature(msg_hash, sig, sender):
+    """ synchronous signature verification,
+    safe to run on a worker thread or process
+    :raise: ValidationError
+    """
     signature = binascii.unhexlify(sig)
     msg_hash = binascii.unhexlify(msg_hash)
-    public_key = await recover(msg_hash, signature)
+    public_key = recover_public_key(msg_hash, signature)
 
     if isinstance(sender, str):
         sender = sender.encode()
@@ -179,5 +187,5 @@ async def verify(msg_hash, sig, sender):
         )
 
 
-
-
+async def verify(msg_hash, sig, sender):
+    verify_signature(msg_hash, sig, sender)
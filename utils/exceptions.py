@@ -30,6 +30,11 @@ class SerializeError(Exception):
     pass
 
 
+class FreezerError(Exception):
+    # ancient store error
+    pass
+
+
 class GenesisError(Exception):
     pass
 
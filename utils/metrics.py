@@ -0,0 +1,118 @@
+import time
+import asyncio
+
+from collections import deque
+
+
+class LatencyMeter:
+    """ latency meter, keeps totals and a window of recent samples
+    """
+
+    def __init__(self, window=256):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def observe(self, elapsed):
+        """
+        :param float elapsed: seconds
+        """
+        self._samples.append(elapsed)
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def time(self):
+        return _Timing(self)
+
+    def _percentile(self, ratio):
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * ratio))
+        return ordered[index]
+
+    def stats(self):
+        """ milliseconds
+        """
+        avg = self.total / self.count if self.count else 0.0
+        return {
+            'count': self.count,
+            'last_ms': self.last * 1000,
+            'avg_ms': avg * 1000,
+            'max_ms': self.max * 1000,
+            'p50_ms': self._percentile(0.5) * 1000,
+            'p99_ms': self._percentile(0.99) * 1000
+        }
+
+
+class _Timing:
+    __slots__ = ('_meter', '_start')
+
+    def __init__(self, meter):
+        self._meter = meter
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self._meter.observe(time.perf_counter() - self._start)
+
+
+class LoopLagMonitor:
+    """ event loop lag, time a sleep overshoots its deadline.
+    anything holding the loop (sync db calls, cpu work) shows up here.
+    """
+
+    def __init__(self, interval=0.1, window=256):
+        self._interval = interval
+        self.lag = LatencyMeter(window)
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            self.lag.observe(max(0.0, time.perf_counter() - start - self._interval))
+
+    def stats(self):
+        return self.lag.stats()
+
+
+class CoverageMeter:
+    """ prefetch coverage, share of the accounts a block touched
+    that were already loaded when execution started
+    """
+
+    def __init__(self):
+        self.blocks = 0
+        self.prefetched = 0
+        self.missed = 0
+        self.last = 0.0
+
+    def observe(self, prefetched, missed):
+        """
+        :param int prefetched: accounts loaded before execution
+        :param int missed: accounts execution had to load itself
+        """
+        self.blocks += 1
+        self.prefetched += prefetched
+        self.missed += missed
+        touched = prefetched + missed
+        self.last = prefetched / touched if touched else 1.0
+
+    def stats(self):
+        total = self.prefetched + self.missed
+        return {
+            'blocks': self.blocks,
+            'prefetched': self.prefetched,
+            'missed': self.missed,
+            'last_coverage': self.last,
+            'coverage': self.prefetched / total if total else 1.0
+        }
@@ -0,0 +1,292 @@
+import struct
+
+from utils.exceptions import SerializeError
+
+# tagged binary packer
+# value :: [tag][body]
+# int -> zigzag varint, str/bytes that are lowercase hex -> raw bytes
+
+NONE = 0x00
+FALSE = 0x01
+TRUE = 0x02
+INT = 0x03
+FLOAT = 0x04
+STR = 0x05
+BYTES = 0x06
+HEX = 0x07
+PREFIX_HEX = 0x08
+LIST = 0x09
+DICT = 0x0a
+HEX_BYTES = 0x0b
+PREFIX_HEX_BYTES = 0x0c
+
+PREFIX_SIZE = 3
+
+_DOUBLE = struct.Struct('>d')
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset: int) -> (int, int):
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[offset]
+        except IndexError:
+            raise SerializeError('pack: truncated varint')
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _read(data, offset, size):
+    end = offset + size
+    raw = data[offset:end]
+    if len(raw) != size:
+        raise SerializeError('pack: truncated value')
+    return raw, end
+
+
+_HEX_DIGITS = b'0123456789abcdef'
+
+
+def _hex_bytes(value: bytes):
+    # lowercase, even length hex only, so that raw.hex() == value
+    if not value or len(value) & 1 or value.translate(None, _HEX_DIGITS):
+        return None
+    return bytes.fromhex(value.decode())
+
+
+def _pack_hex(out, value: bytes, tags):
+    # tags :: (hex, prefix hex)
+    raw = _hex_bytes(value)
+    if raw is not None:
+        out.append(tags[0])
+        write_varint(out, len(raw))
+        out += raw
+        return True
+    if len(value) >= PREFIX_SIZE + 16:
+        raw = _hex_bytes(value[PREFIX_SIZE:])
+        if raw is not None:
+            out.append(tags[1])
+            out += value[:PREFIX_SIZE]
+            write_varint(out, len(raw))
+            out += raw
+            return True
+    return False
+
+
+def _pack_str(out, value):
+    raw = value.encode()
+    if len(raw) == len(value) and _pack_hex(out, raw, (HEX, PREFIX_HEX)):
+        return
+    out.append(STR)
+    write_varint(out, len(raw))
+    out += raw
+
+
+def _pack_int(out, value):
+    out.append(INT)
+    value = (value << 1) if value >= 0 else ((-value << 1) - 1)
+    if value < 0x80:
+        out.append(value)
+    else:
+        write_varint(out, value)
+
+
+def _pack_float(out, value):
+    out.append(FLOAT)
+    out += _DOUBLE.pack(value)
+
+
+def _pack_bytes(out, value):
+    if type(value) is bytes and len(value) <= 1024:
+        if _pack_hex(out, value, (HEX_BYTES, PREFIX_HEX_BYTES)):
+            return
+    out.append(BYTES)
+    write_varint(out, len(value))
+    out += value
+
+
+def _pack_list(out, value):
+    out.append(LIST)
+    write_varint(out, len(value))
+    for item in value:
+        pack_into(out, item)
+
+
+def _pack_dict(out, value):
+    out.append(DICT)
+    write_varint(out, len(value))
+    for k, v in value.items():
+        pack_into(out, k)
+        pack_into(out, v)
+
+
+def _pack_const(tag):
+    def _pack(out, value):
+        out.append(tag)
+    return _pack
+
+
+_PACKERS = {
+    type(None): _pack_const(NONE),
+    bool: lambda out, value: out.append(TRUE if value else FALSE),
+    int: _pack_int,
+    float: _pack_float,
+    str: _pack_str,
+    bytes: _pack_bytes,
+    bytearray: _pack_bytes,
+    memoryview: _pack_bytes,
+    list: _pack_list,
+    tuple: _pack_list,
+    dict: _pack_dict
+}
+
+
+def pack_into(out: bytearray, value) -> None:
+    """ append tagged value
+    :param bytearray out: output buffer
+    :param value: None, bool, int, float, str, bytes, list, tuple, dict
+    """
+    try:
+        packer = _PACKERS[type(value)]
+    except KeyError:
+        for base, packer in _PACKERS.items():
+            if base is not bool and isinstance(value, base):
+                break
+        else:
+            raise SerializeError('pack: unsupported type {}'.format(type(value).__name__))
+    packer(out, value)
+
+
+def _size(data, offset):
+    size = data[offset]
+    if size < 0x80:
+        return size, offset + 1
+    return read_varint(data, offset)
+
+
+def _unpack_int(data, offset):
+    value = data[offset]
+    if value < 0x80:
+        offset += 1
+    else:
+        value, offset = read_varint(data, offset)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), offset
+
+
+def _unpack_hex(data, offset):
+    size, offset = _size(data, offset)
+    raw, offset = _read(data, offset, size)
+    return raw.hex(), offset
+
+
+def _unpack_prefix_hex(data, offset):
+    prefix, offset = _read(data, offset, PREFIX_SIZE)
+    size, offset = _size(data, offset)
+    raw, offset = _read(data, offset, size)
+    return prefix.decode() + raw.hex(), offset
+
+
+def _unpack_hex_bytes(data, offset):
+    size, offset = _size(data, offset)
+    raw, offset = _read(data, offset, size)
+    return raw.hex().encode(), offset
+
+
+def _unpack_prefix_hex_bytes(data, offset):
+    prefix, offset = _read(data, offset, PREFIX_SIZE)
+    size, offset = _size(data, offset)
+    raw, offset = _read(data, offset, size)
+    return prefix + raw.hex().encode(), offset
+
+
+def _unpack_str(data, offset):
+    size, offset = _size(data, offset)
+    raw, offset = _read(data, offset, size)
+    return raw.decode(), offset
+
+
+def _unpack_bytes(data, offset):
+    size, offset = _size(data, offset)
+    return _read(data, offset, size)
+
+
+def _unpack_list(data, offset):
+    size, offset = _size(data, offset)
+    items = []
+    append = items.append
+    unpackers = _UNPACKERS
+    for _ in range(size):
+        item, offset = unpackers[data[offset]](data, offset + 1)
+        append(item)
+    return items, offset
+
+
+def _unpack_dict(data, offset):
+    size, offset = _size(data, offset)
+    items = {}
+    unpackers = _UNPACKERS
+    for _ in range(size):
+        k, offset = unpackers[data[offset]](data, offset + 1)
+        v, offset = unpackers[data[offset]](data, offset + 1)
+        items[k] = v
+    return items, offset
+
+
+def _unpack_float(data, offset):
+    raw, offset = _read(data, offset, 8)
+    return _DOUBLE.unpack(raw)[0], offset
+
+
+_UNPACKERS = {
+    NONE: lambda data, offset: (None, offset),
+    FALSE: lambda data, offset: (False, offset),
+    TRUE: lambda data, offset: (True, offset),
+    INT: _unpack_int,
+    FLOAT: _unpack_float,
+    STR: _unpack_str,
+    BYTES: _unpack_bytes,
+    HEX: _unpack_hex,
+    PREFIX_HEX: _unpack_prefix_hex,
+    LIST: _unpack_list,
+    DICT: _unpack_dict,
+    HEX_BYTES: _unpack_hex_bytes,
+    PREFIX_HEX_BYTES: _unpack_prefix_hex_bytes
+}
+
+
+def unpack_from(data, offset: int = 0):
+    """ read tagged value
+    :param bytes data: packed data
+    :param int offset: start offset
+    :return: (value, next offset)
+    """
+    try:
+        return _UNPACKERS[data[offset]](data, offset + 1)
+    except IndexError:
+        raise SerializeError('pack: truncated value')
+    except KeyError as err:
+        raise SerializeError('pack: unknown tag {}'.format(err))
+
+
+def pack(value) -> bytes:
+    out = bytearray()
+    pack_into(out, value)
+    return bytes(out)
+
+
+def unpack(data):
+    value, offset = unpack_from(data, 0)
+    if offset != len(data):
+        raise SerializeError('pack: {} trailing bytes'.format(len(data) - offset))
+    return value
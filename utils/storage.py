@@ -1,5 +1,4 @@
 
-import copy
 from collections import OrderedDict
 from utils.logger import getLogger
 
@@ -19,17 +18,17 @@ class Storage:
 
     @property
     def cache(self):
-        return copy.deepcopy(self._cache)
+        return list(self._cache)
 
     def items(self):
-        storage = copy.deepcopy(self._storage)
-        return storage.items()
+        # snapshot, stored values are immutable and shared.
+        return list(self._storage.items())
 
     def cache_clear(self):
         self._cache.clear()
 
     def get(self, key):
-        return copy.deepcopy(self._storage.get(key))
+        return self._storage.get(key)
 
     def range(self, *args):
         if len(args) == 1:
@@ -22,7 +22,7 @@ class BaseTrie(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def commit(self):
+    def commit(self, batch=None):
         raise NotImplementedError
 
     @abstractmethod
@@ -8,8 +8,8 @@ def prepare_single_trie() -> Trie:
     return Trie(root=NONE_ROOT)
 
 
-def prepare_trie(state_root, db) -> Trie:
-    return Trie(state_root, db)
+def prepare_trie(state_root, db, nodes=None) -> Trie:
+    return Trie(state_root, db, nodes)
 
 
 def make_hash_root(list_obj):
@@ -0,0 +1,151 @@
+
+from utils.crypto.hash import sha3_hex
+from utils.exceptions import SerializeError
+from utils.pack import pack, unpack
+from .base import BaseTrie
+from .util import NONE_ROOT
+
+
+# ordered index over byte keys, nodes are content addressed like trie nodes.
+# node :: [key, value, left node hash, right node hash], '' for no child
+# shape is a treap with priority sha3(key): the same key set always
+# gives the same tree, so the root does not depend on insert/remove order.
+# put / remove / top(k) walk one path, O(log n) expected.
+# stored node :: [version 0x01][packed [key, value, left, right]] (utils.pack),
+#                plain values only, nothing is resolved on load.
+
+_NODE_VERSION = 0x01
+
+
+def _priority(key: bytes):
+    return sha3_hex(key)
+
+
+class RankTree(BaseTrie):
+
+    def __init__(self, root, db=None):
+        self.db = db
+        self.root = root
+        self.cache = {}
+
+    def serialize(self, value) -> bytes:
+        return bytes((_NODE_VERSION,)) + pack(list(value))
+
+    def deserialize(self, value):
+        if not value or value[0] != _NODE_VERSION:
+            raise SerializeError('rank: unknown node version')
+        node = unpack(bytes(value[1:]))
+        if not isinstance(node, list) or len(node) != 4:
+            raise SerializeError('rank: malformed node')
+        return node
+
+    def _set_node(self, node):
+        raw_node = self.serialize(node)
+        key = sha3_hex(raw_node)
+        self.cache[key] = raw_node
+        return key
+
+    def _get_node(self, key):
+        if key in self.cache:
+            return self.deserialize(self.cache[key])
+        raw_node = self.db.get(key)
+        self.cache[key] = raw_node
+        return self.deserialize(raw_node)
+
+    def get(self, key: bytes):
+        ref = self.root
+        while ref:
+            node_key, value, left, right = self._get_node(ref)
+            if key == node_key:
+                return value
+            ref = left if key < node_key else right
+        raise KeyError(str(key))
+
+    def put(self, key: bytes, value):
+        node = self._put(self.root, key, value)
+        self.root = self._set_node(node)
+        return self.root
+
+    def _put(self, ref, key, value):
+        if not ref:
+            return [key, value, NONE_ROOT, NONE_ROOT]
+        node_key, node_value, left, right = self._get_node(ref)
+        if key == node_key:
+            return [key, value, left, right]
+        if key < node_key:
+            child = self._put(left, key, value)
+            if _priority(child[0]) > _priority(node_key):
+                # rotate right
+                return [child[0], child[1], child[2],
+                        self._set_node([node_key, node_value, child[3], right])]
+            return [node_key, node_value, self._set_node(child), right]
+        child = self._put(right, key, value)
+        if _priority(child[0]) > _priority(node_key):
+            # rotate left
+            return [child[0], child[1],
+                    self._set_node([node_key, node_value, left, child[2]]), child[3]]
+        return [node_key, node_value, left, self._set_node(child)]
+
+    def remove(self, key: bytes):
+        """
+        :raise KeyError: key is not in the tree
+        """
+        self.root = self._remove(self.root, key)
+        return self.root
+
+    def _remove(self, ref, key):
+        if not ref:
+            raise KeyError(str(key))
+        node_key, node_value, left, right = self._get_node(ref)
+        if key < node_key:
+            return self._set_node([node_key, node_value, self._remove(left, key), right])
+        if key > node_key:
+            return self._set_node([node_key, node_value, left, self._remove(right, key)])
+        return self._merge(left, right)
+
+    def _merge(self, left, right):
+        # every key under left is smaller than every key under right
+        if not left:
+            return right
+        if not right:
+            return left
+        left_node = self._get_node(left)
+        right_node = self._get_node(right)
+        if _priority(left_node[0]) > _priority(right_node[0]):
+            return self._set_node(left_node[:3] + [self._merge(left_node[3], right)])
+        return self._set_node([right_node[0], right_node[1],
+                               self._merge(left, right_node[2]), right_node[3]])
+
+    def top(self, limit=None):
+        """ (key, value) in ascending key order
+        :param int limit: stop after limit items, all when None
+        """
+        stack = []
+        ref = self.root
+        count = 0
+        while stack or ref:
+            while ref:
+                node = self._get_node(ref)
+                stack.append(node)
+                ref = node[2]
+            node_key, value, _, right = stack.pop()
+            if limit is not None and count >= limit:
+                return
+            yield node_key, value
+            count += 1
+            ref = right
+
+    def commit(self, batch=None):
+        if batch is not None:
+            for k, v in self.cache.items():
+                batch.put(k, v)
+            return self.root
+        if self.db is None:
+            raise ValueError("is not state")
+        with self.db.write_batch() as batch:
+            for k, v in self.cache.items():
+                batch.put(k, v)
+        return self.root
+
+    def clear(self):
+        self.cache.clear()
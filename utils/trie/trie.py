@@ -15,10 +15,17 @@ from .util import (
 class Trie(BaseTrie):
     types = NodeType
 
-    def __init__(self, root, db=None):
+    def __init__(self, root, db=None, nodes=None):
+        """
+        :param root: root node hash
+        :param db: node store
+        :param LRUCache nodes: decoded nodes by hash, shared between tries.
+                               nodes are content addressed, entries never go stale.
+        """
         self.db = db
         self.root = root
         self.cache = {}
+        self.nodes = nodes
         if self.root == NONE_ROOT:
             self.cache[self.root] = self.serialize(self.types.none)
 
@@ -35,16 +42,16 @@ class Trie(BaseTrie):
         return self._set_root(next_node)
 
     def _set_root(self, node):
-        raw_node = self.serialize(node)
-        key = sha3_hex(raw_node)
-        self.cache[key] = raw_node
-        self.root = key
-        return key
+        self.root = self._set_node(node)
+        return self.root
 
     def _set_node(self, node):
         raw_node = self.serialize(node)
         key = sha3_hex(raw_node)
         self.cache[key] = raw_node
+        if self.nodes is not None:
+            # the next block walks the paths this one wrote
+            self.nodes.put(key, list(node))
         return key
 
     def add(self, node, key, value):
@@ -136,16 +143,38 @@ class Trie(BaseTrie):
     def _get_node(self, key):
         if key == '':
             return self.types.none
+        if self.nodes is not None:
+            node = self.nodes.get(key)
+            if node is not None:
+                # add() rewrites branch slots in place, callers get their own list
+                return list(node)
         if key in self.cache:
-            return self.deserialize(self.cache[key])
-        try:
-            raw_node = self.db.get(key)
-            node = self.deserialize(raw_node)   # db.get
-            self.cache[key] = raw_node
-        except KeyError:
-            node = self.types.none
+            node = self.deserialize(self.cache[key])
+        else:
+            try:
+                raw_node = self.db.get(key)
+                node = self.deserialize(raw_node)   # db.get
+                self.cache[key] = raw_node
+            except KeyError:
+                return self.types.none
+        if self.nodes is not None and isinstance(node, list):
+            self.nodes.put(key, list(node))
         return node
 
+    def reader(self):
+        """ read-only view for pool threads, see TrieReader
+        """
+        return TrieReader(self)
+
+    def merge(self, loaded):
+        """ add nodes a TrieReader read from the db
+        :param dict loaded: node hash -> (raw node, decoded node)
+        """
+        for key, (raw_node, node) in loaded.items():
+            self.cache.setdefault(key, raw_node)
+            if self.nodes is not None and isinstance(node, list):
+                self.nodes.put(key, list(node))
+
     def get(self, key):
         key = hex_to_nibbles(key)
         node = self._get_node(self.root)
@@ -222,7 +251,11 @@ class Trie(BaseTrie):
     def remove(self, key):
         pass
 
-    def commit(self):
+    def commit(self, batch=None):
+        if batch is not None:
+            for k, v in self.cache.items():
+                batch.put(k, v)
+            return self.root
         if self.db is None:
             raise ValueError("is not state")
         with self.db.write_batch() as batch:
@@ -233,3 +266,38 @@ class Trie(BaseTrie):
     def clear(self):
         self.cache.clear()
 
+
+
+class TrieReader(Trie):
+    """ read-only view of a trie at its current root.
+    nodes read from the db are kept in loaded, the trie itself and
+    the shared nodes are never written, several readers may run on
+    pool threads. Trie.merge adds loaded on the owner's thread.
+    """
+
+    def __init__(self, trie):
+        super().__init__(trie.root, trie.db, trie.nodes)
+        self.cache = trie.cache
+        self.loaded = {}
+
+    def _get_node(self, key):
+        if key == '':
+            return self.types.none
+        if self.nodes is not None:
+            node = self.nodes.get(key)
+            if node is not None:
+                return node
+        if key in self.cache:
+            return self.deserialize(self.cache[key])
+        if key in self.loaded:
+            return self.loaded[key][1]
+        try:
+            raw_node = self.db.get(key)
+        except KeyError:
+            return self.types.none
+        node = self.deserialize(raw_node)
+        self.loaded[key] = raw_node, node
+        return node
+
+    def put(self, key: str, value):
+        raise TypeError('trie reader is read-only')